@@ -219,11 +219,22 @@ class BiosMailBox():
             out['MICROCODE_VER_HEX'] = f'0x{ver:X}'
         return out
 
-    def read_full_info(self):
+    # microcode version is not changed while machine is running
+    # return None if microcode version cannot be readed (result must not be cached)
+    def read_static_info(self):
+        self.acquire()
+        try:
+            out = self._read_common_info()
+        finally:
+            self.release()
+        return out if 'MICROCODE_VER' in out else None
+
+    # static_info: result of read_static_info (cached by caller)
+    def read_full_info(self, static_info = None):
         out = { }
         self.acquire()
         try:
-            out.update( self._read_common_info() )
+            out.update( self._read_common_info() if static_info is None else static_info )
             out.update( self._read_base_info() )
         finally:
             self.release()
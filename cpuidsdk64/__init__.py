@@ -15,11 +15,10 @@ from ctypes import CFUNCTYPE
 __author__ = 'remittor'
 
 from .win32 import *
+from .bitfield import *
 
 _sdk_base_dir = os.path.dirname(os.path.abspath(__file__))
 _sdk_dll_path = os.path.join(_sdk_base_dir, 'cpuidsdk64.dll')
-if not os.path.exists(_sdk_dll_path):
-    raise RuntimeError(f'File "{_sdk_dll_path}" not found!')
 
 def get_pe_version(filename):
    info = get_file_version_info(filename)
@@ -27,12 +26,20 @@ def get_pe_version(filename):
 
 supported_version = (1, 2, 7, 9)
 
-dll_ver = get_pe_version(_sdk_dll_path)
-if dll_ver != supported_version:
-    raise RuntimeError(f'Currently support only CPUIDSDK ver {".".join(map(str, supported_version))}')
+if os.name != 'nt':
+    # CPUIDSDK and driver cpuz.sys is not available (use set_backend() for hardware access)
+    cpuidsdk64 = None
+    OleAut32 = None
+else:
+    if not os.path.exists(_sdk_dll_path):
+        raise RuntimeError(f'File "{_sdk_dll_path}" not found!')
 
-cpuidsdk64 = ctypes.WinDLL(_sdk_dll_path)
-OleAut32 = ctypes.WinDLL('OleAut32.dll')
+    dll_ver = get_pe_version(_sdk_dll_path)
+    if dll_ver != supported_version:
+        raise RuntimeError(f'Currently support only CPUIDSDK ver {".".join(map(str, supported_version))}')
+
+    cpuidsdk64 = ctypes.WinDLL(_sdk_dll_path)
+    OleAut32 = ctypes.WinDLL('OleAut32.dll')
 
 def __DllFunc(name, ret, args, dll = None):
     func = cpuidsdk64[name] if dll is None else dll[name]
@@ -43,11 +50,27 @@ def __DllFunc(name, ret, args, dll = None):
 from .common import *
 from .common import _sdk_func_table
 
-QueryInterface = __DllFunc("QueryInterface", LPVOID, (DWORD))
-SysFreeString = __DllFunc("SysFreeString", None, (LPSTR), OleAut32)
+# Table of bound SDK functions (filled by _init_sdk_dll):  _sdk.GetNbProcessors(objptr)
+class SdkFuncTable():
+    def __getattr__(self, name):
+        finfo = get_sdkfunc(name)
+        if not finfo:
+            raise ValueError(f'Function "{name}" not found')
+        raise RuntimeError(f'Function "{name}" is not initialized')
+
+_sdk = SdkFuncTable()
+
+if cpuidsdk64:
+    QueryInterface = __DllFunc("QueryInterface", LPVOID, (DWORD))
+    SysFreeString = __DllFunc("SysFreeString", None, (LPSTR), OleAut32)
+else:
+    QueryInterface = None
+    SysFreeString = None
 
 def _init_sdk_dll(verbose = 0):
     global _sdk_func_table
+    if not cpuidsdk64:
+        raise RuntimeError(f'CPUIDSDK is only available on Windows')
     qi_addr = ctypes.cast(QueryInterface, ctypes.c_void_p).value
     qia = qi_addr - cpuidsdk64._handle + 0x180000000
     if verbose >= 2:
@@ -84,7 +107,20 @@ def _init_sdk_dll(verbose = 0):
             fname = func['name']
         if fname and verbose >= 2:
             print(f'0x{fid:08X} : 0x{func_addr:012X}  0x{func_ADDR:012X}  {fname}')
-        
+    _bind_sdk_funcs()
+
+def _bind_sdk_funcs():
+    global _sdk_func_table, _sdk
+    for finfo in _sdk_func_table:
+        if not finfo['fid'] or not finfo['ftype']:
+            continue
+        func_addr = QueryInterface(finfo['fid'])
+        if not func_addr:
+            raise RuntimeError(f'Used incorrect fid for function "{finfo["name"]}"')
+        finfo['addr'] = func_addr
+        finfo['func'] = finfo['ftype'](func_addr)
+        setattr(_sdk, finfo['name'], finfo['func'])
+
 def get_sdk_func(fname, ftype = None):
     finfo = get_sdkfunc(fname)
     if not finfo:
@@ -99,6 +135,8 @@ def get_sdk_func(fname, ftype = None):
         raise RuntimeError('Used incorrect fid')
     #if not finfo['addr']:
     finfo['addr'] = func_addr
+    if not ftype:
+        ftype = finfo['ftype']
     if not ftype:
         raise ValueError('Function type must be specified')
     func_type = ftype
@@ -129,6 +167,22 @@ def _set_drv(drv):
     global _drv
     _drv = drv
 
+# current hardware access backend (see backend.py)
+def get_backend():
+    return _get_drv(check = False)
+
+def set_backend(backend):
+    pci_ecam_close()
+    phymem_windows_close()
+    _set_drv(backend)
+    pci_cfg_cache_clear()
+    pci_index_clear()
+    hw_cache_clear()
+    return backend
+
+from .backend import *
 from .functions import *
 from .drvfunc import *
+from .pcienum import *
+from .hwcache import *
 
@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import struct
+
+__author__ = 'remittor'
+
+# Hardware access backend interface.
+# All public functions from drvfunc.py (port_read, pci_cfg_read, msr_read, phymem_read, smbus_read_u1, ...)
+# are dispatched to the backend object selected by set_backend() or SdkInit().
+# The argument lists and return values of the methods are the same as for the drvfunc.py functions,
+# but without size='N' / out_decimal conversions: pci_cfg_read / phymem_read return bytes,
+# port_read, msr_read, msr_oc_mailbox and others return int or tuple as the drvfunc.py wrappers do.
+
+class HwBackend():
+    name = 'abstract'
+    offline = False    # True for backends over dump files (no real hardware)
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}:{self.name}>'
+
+    # return tuple (eax, ebx, ecx, edx) or None for using native CPUID instruction
+    def cpuid(self, leaf, subleaf = 0):
+        return None
+
+    #######################################################
+    #  I/O ports
+    #######################################################
+
+    def port_read(self, port, size):
+        raise NotImplementedError(f'{self.name}: port_read')
+
+    def port_write(self, port, value, size):
+        raise NotImplementedError(f'{self.name}: port_write')
+
+    #######################################################
+    #  PCI config space
+    #######################################################
+
+    def pci_cfg_read(self, bus, dev, fun, offset, size):
+        raise NotImplementedError(f'{self.name}: pci_cfg_read')
+
+    # full config space of function by one request (None = not supported, see PciCfgCache)
+    def pci_cfg_read_all(self, bus, dev, fun):
+        return None
+
+    def pci_cfg_write(self, bus, dev, fun, offset, data):
+        raise NotImplementedError(f'{self.name}: pci_cfg_write')
+
+    def pci_cfg_cmd(self, cfg_addr, value):
+        raise NotImplementedError(f'{self.name}: pci_cfg_cmd')
+
+    #######################################################
+    #  SMBus (Intel i801 host controller)
+    #######################################################
+
+    def smbus_read_u1(self, port, dev, command, status = 0xBF):
+        raise NotImplementedError(f'{self.name}: smbus_read_u1')
+
+    def smbus_write_u1(self, port, dev, command, value, status = 0xBF):
+        raise NotImplementedError(f'{self.name}: smbus_write_u1')
+
+    def smbus_pcall(self, port, dev, command, value, status = 0xBF):
+        raise NotImplementedError(f'{self.name}: smbus_pcall')
+
+    def smbus_read_X(self, port, dev, command):
+        raise NotImplementedError(f'{self.name}: smbus_read_X')
+
+    #######################################################
+    #  MSR
+    #######################################################
+
+    def msr_read(self, reg):
+        raise NotImplementedError(f'{self.name}: msr_read')
+
+    def msr_write(self, reg, val_HI, val_LO):
+        raise NotImplementedError(f'{self.name}: msr_write')
+
+    def msr_oc_mailbox(self, cmd, data):
+        raise NotImplementedError(f'{self.name}: msr_oc_mailbox')
+
+    def msr_get_ticks(self, reg):
+        raise NotImplementedError(f'{self.name}: msr_get_ticks')
+
+    # return dict { cpu: { reg: value } }
+    def msr_read_all(self, regs, cpus = None):
+        raise NotImplementedError(f'{self.name}: msr_read_all')
+
+    #######################################################
+    #  PHYS MEMORY
+    #######################################################
+
+    def phymem_read(self, addr, size):
+        raise NotImplementedError(f'{self.name}: phymem_read')
+
+    def phymem_write(self, addr, data):
+        raise NotImplementedError(f'{self.name}: phymem_write')
+
+    # mem_addr = (pci_cfg[bus:dev:fun][offset] & addr_mask) + addr_offset
+    def _pc_addr(self, bus, dev, fun, offset, addr_mask, addr_offset):
+        base = self.pci_cfg_read(bus, dev, fun, offset, 8)
+        if not base:
+            return None
+        base = int.from_bytes(base, 'little') & addr_mask
+        if not base:
+            return None
+        return base + addr_offset
+
+    def phymem_pc_read64(self, bus, dev, fun, offset, addr_mask, addr_offset):
+        addr = self._pc_addr(bus, dev, fun, offset, addr_mask, addr_offset)
+        if addr is None:
+            return None
+        data = self.phymem_read(addr, 8)
+        if not data:
+            return None
+        return int.from_bytes(data, 'little')
+
+    def phymem_pc_write32(self, bus, dev, fun, offset, addr_mask, addr_offset, value):
+        addr = self._pc_addr(bus, dev, fun, offset, addr_mask, addr_offset)
+        if addr is None:
+            return False
+        return self.phymem_write(addr, struct.pack('<I', value & 0xFFFFFFFF))
+
+    def phymem_map(self, phy_addr, size):
+        raise NotImplementedError(f'{self.name}: phymem_map')
+
+    def phymem_unmap(self, phy_addr, size):
+        raise NotImplementedError(f'{self.name}: phymem_unmap')
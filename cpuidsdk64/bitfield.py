@@ -0,0 +1,126 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+
+__author__ = 'remittor'
+
+# Declarative layout of registers (replacement of get_bits calls for a whole register block).
+# The list of fields is compiled once: every register is converted to int only once per decode,
+# and fields are extracted by precomputed shift and mask.
+# Usage:
+#   IMC_CR_TC_CAS = RegLayout([
+#       ( 'tCL',  0x070, 16, 22 ),      # ( name, offset, first_bit, last_bit )
+#       ( 'tCWL', 0x070, 24, 31 ),
+#       ( 'GEAR2', 0x088, 31 ),         # single bit
+#   ])
+#   tm = IMC_CR_TC_CAS.decode(data)    # data: bytes of register block (or int for single register)
+
+class RegLayout():
+    def __init__(self, fields = None):
+        self.regs = [ ]      # [ ( offset, size ) ]
+        self.fields = [ ]    # [ ( name, reg_index, shift, mask ) ]  in declaration order
+        self.spec = [ ]
+        if fields:
+            self.add(fields)
+
+    def __repr__(self):
+        return f'<RegLayout: regs = {len(self.regs)}, fields = {len(self.fields)}>'
+
+    def __len__(self):
+        return len(self.fields)
+
+    def add(self, fields):
+        for field in fields:
+            name, offset, first_bit = field[0:3]
+            last_bit = field[3] if len(field) > 3 and field[3] is not None else first_bit
+            if last_bit < first_bit:
+                first_bit, last_bit = last_bit, first_bit    # swap values (same as get_bits)
+            self.spec.append( ( name, offset, first_bit, last_bit ) )
+        self.compile()
+        return self
+
+    def compile(self):
+        reg_size = { }    # offset => size in bytes
+        for name, offset, first_bit, last_bit in self.spec:
+            reg_size[offset] = max(reg_size.get(offset, 0), (last_bit // 8) + 1)
+        self.regs = list(reg_size.items())
+        reg_index = { offset: idx for idx, (offset, size) in enumerate(self.regs) }
+        self.fields = [ ]
+        for name, offset, first_bit, last_bit in self.spec:
+            mask = (1 << (last_bit - first_bit + 1)) - 1
+            self.fields.append( ( name, reg_index[offset], first_bit, mask ) )
+
+    # return list of raw register values
+    def read_regs(self, buf, base = 0):
+        if isinstance(buf, int):
+            return [ (buf >> ((base + offset) * 8)) & ((1 << (size * 8)) - 1) for offset, size in self.regs ]
+        view = memoryview(buf)
+        return [ int.from_bytes(view[base+offset:base+offset+size], 'little') for offset, size in self.regs ]
+
+    def decode(self, buf, base = 0, out = None):
+        vals = self.read_regs(buf, base)
+        if out is None:
+            out = { }
+        for name, idx, shift, mask in self.fields:
+            out[name] = (vals[idx] >> shift) & mask
+        return out
+
+# Decoder of small field (register byte, enum value) replaced by lookup table built once at import.
+# Table items are shared, so dict / list results are returned as copy (caller may modify it).
+# Usage:
+#   @lut_decoder(256)
+#   def DDR5_MR0_decode(value):
+#       ...
+def _lut_copy(res):
+    if isinstance(res, dict):
+        return { key: _lut_copy(val) for key, val in res.items() }
+    if isinstance(res, list):
+        return [ _lut_copy(val) for val in res ]
+    return res
+
+def lut_decoder(size = 256):
+    def wrap(func):
+        table = tuple( func(value) for value in range(size) )
+        def decode(value):
+            if 0 <= value < size:
+                return _lut_copy(table[value])
+            return func(value)
+        decode.__name__ = func.__name__
+        decode.__doc__ = func.__doc__
+        decode.table = table
+        return decode
+    return wrap
+
+
+if __name__ == "__main__":
+    # benchmark: per-field get_bits vs compiled layout over the channel window of MCHBAR (0x800 bytes)
+    import time
+    import random
+    from cpuidsdk64.win32 import get_bits
+    random.seed(1)
+    data = bytes(random.getrandbits(8) for _ in range(0x800))
+    spec = [ ]
+    for reg in range(0, 0x500, 8):
+        for bit in range(0, 64, 8):
+            spec.append( ( f'F_{reg:03X}_{bit}', reg, bit, bit + random.randint(0, 7) ) )
+    spec = spec[:200]
+    layout = RegLayout(spec)
+    out = layout.decode(data)
+    for name, offset, first_bit, last_bit in spec:
+        assert out[name] == get_bits(data, offset, first_bit, last_bit)
+    count = 1000
+    t0 = time.perf_counter()
+    for i in range(count):
+        res = { }
+        for name, offset, first_bit, last_bit in spec:
+            res[name] = get_bits(data, offset, first_bit, last_bit)
+    t1 = time.perf_counter()
+    for i in range(count):
+        res = layout.decode(data)
+    t2 = time.perf_counter()
+    print(f'{len(spec)} fields in {len(layout.regs)} registers')
+    print(f'get_bits:  {(t1 - t0) * 1000000 / count:8.1f} us per block')
+    print(f'RegLayout: {(t2 - t1) * 1000000 / count:8.1f} us per block')
@@ -53,79 +53,79 @@ CPUIDSDK_CONFIG_USE_EVERYTHING     = 0x7FFFFFFF
 #   Function table
 #####################################/
 
-_sdk_func_table = [ ]
+_sdk_func_table = [ ]   # order of items is the same as in QueryInterface function
+_sdk_func_dict = { }
 
-def _afunc(name):
-    func = { 'name': name, 'fid': None, 'addr': None, 'func': None }
+# ftype: prototype of function (first arg is objptr)
+def _afunc(name, ftype = None):
+    func = { 'name': name, 'fid': None, 'addr': None, 'func': None, 'ftype': ftype }
     _sdk_func_table.append( func )
+    _sdk_func_dict[name] = func
 
 def get_sdkfunc(name):
-    for func in _sdk_func_table:
-        if func['name'] == name:
-            return func
-    return None
-
-_afunc('CreateInstance')
-_afunc('DestroyInstance')
-_afunc('SdkInit')
-_afunc('SdkClose')
-_afunc('RefreshInformation')
-_afunc('GetDLLVersion')
-
-_afunc('GetNbProcessors')
-_afunc('GetProcessorFamily')
-_afunc('GetProcessorExtendedFamily')
-_afunc('GetProcessorModel')
-_afunc('GetProcessorExtendedModel')
-_afunc('GetProcessorSteppingID')
+    return _sdk_func_dict.get(name, None)
+
+_afunc('CreateInstance', CFUNCTYPE(LPVOID))
+_afunc('DestroyInstance', CFUNCTYPE(None, LPVOID))
+_afunc('SdkInit', CFUNCTYPE(BOOL, LPVOID, LPCSTR, LPCSTR, INT, LPINT, LPINT))
+_afunc('SdkClose', CFUNCTYPE(None, LPVOID))
+_afunc('RefreshInformation', CFUNCTYPE(INT, LPVOID))
+_afunc('GetDLLVersion', CFUNCTYPE(None, LPVOID, LPINT))
+
+_afunc('GetNbProcessors', CFUNCTYPE(INT, LPVOID))
+_afunc('GetProcessorFamily', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorExtendedFamily', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorModel', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorExtendedModel', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorSteppingID', CFUNCTYPE(INT, LPVOID, INT))
 _afunc('proc_C16F82DF')
 _afunc('proc_5CFCB9F9')
-_afunc('GetProcessorCoreCount')
-_afunc('GetProcessorThreadCount')
-_afunc('GetProcessorCoreThreadCount')
-_afunc('GetProcessorThreadAPICID')
-_afunc('GetProcessorName')
-_afunc('GetProcessorCodeName')
-_afunc('GetProcessorSpecification')
-_afunc('GetProcessorPackage')
-_afunc('GetProcessorStepping')
-_afunc('GetProcessorTDP')
-_afunc('proc_EA5DD4BB') # _afunc('GetProcessorManufacturingProcess')
-_afunc('proc_D3B9A773')
-_afunc('IsProcessorInstructionSetAvailable')
-_afunc('proc_71CAE395') # _afunc('GetProcessorStockClockFrequency')
-_afunc('proc_09141228') # _afunc('GetProcessorStockBusFrequency')
-_afunc('proc_7862F0C5') # _afunc('GetProcessorCoreClockFrequency')
-_afunc('proc_D15DA2BB') # _afunc('GetProcessorCoreClockMultiplier')
-_afunc('proc_D1FBA3F7') 
-_afunc('proc_B85B70B6') # _afunc('GetProcessorCoreTemperature')
-_afunc('proc_578EAF1D')
-_afunc('GetProcessorMaxCacheLevel')
-_afunc('GetProcessorCacheParameters')
-_afunc('GetProcessorExtendedCacheParameters')
-_afunc('GetHyperThreadingStatus')
-_afunc('GetVirtualTechnologyStatus')
-_afunc('GetProcessorID')
-_afunc('GetProcessorVoltage')
-_afunc('GetNorthBridgeVendor')
+_afunc('GetProcessorCoreCount', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorThreadCount', CFUNCTYPE(INT, LPVOID, INT))
+_afunc('GetProcessorCoreThreadCount', CFUNCTYPE(INT, LPVOID, INT, INT))
+_afunc('GetProcessorThreadAPICID', CFUNCTYPE(INT, LPVOID, INT, INT, INT))
+_afunc('GetProcessorName', CFUNCTYPE(LPSTR, LPVOID, INT))
+_afunc('GetProcessorCodeName', CFUNCTYPE(LPSTR, LPVOID, INT))
+_afunc('GetProcessorSpecification', CFUNCTYPE(LPSTR, LPVOID, INT))
+_afunc('GetProcessorPackage', CFUNCTYPE(LPSTR, LPVOID, INT))
+_afunc('GetProcessorStepping', CFUNCTYPE(LPSTR, LPVOID, INT))
+_afunc('GetProcessorTDP', CFUNCTYPE(FLOAT, LPVOID, INT))
+_afunc('proc_EA5DD4BB', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorManufacturingProcess')
+_afunc('proc_D3B9A773', CFUNCTYPE(FLOAT, LPVOID, INT))
+_afunc('IsProcessorInstructionSetAvailable', CFUNCTYPE(UINT64, LPVOID, INT, INT))
+_afunc('proc_71CAE395', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorStockClockFrequency')
+_afunc('proc_09141228', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorStockBusFrequency')
+_afunc('proc_7862F0C5', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorCoreClockFrequency')
+_afunc('proc_D15DA2BB', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorCoreClockMultiplier')
+_afunc('proc_D1FBA3F7', CFUNCTYPE(FLOAT, LPVOID, INT))
+_afunc('proc_B85B70B6', CFUNCTYPE(FLOAT, LPVOID, INT)) # _afunc('GetProcessorCoreTemperature')
+_afunc('proc_578EAF1D', CFUNCTYPE(UINT64, LPVOID, INT))
+_afunc('GetProcessorMaxCacheLevel', CFUNCTYPE(UINT64, LPVOID, INT))
+_afunc('GetProcessorCacheParameters', CFUNCTYPE(None, LPVOID, INT, INT, INT, LPINT, LPINT))
+_afunc('GetProcessorExtendedCacheParameters', CFUNCTYPE(None, LPVOID, INT, INT, INT, LPINT, LPINT))
+_afunc('GetHyperThreadingStatus', CFUNCTYPE(None, LPVOID, INT, LPINT, LPINT))
+_afunc('GetVirtualTechnologyStatus', CFUNCTYPE(None, LPVOID, INT, LPINT, LPINT))
+_afunc('GetProcessorID', CFUNCTYPE(UINT64, LPVOID, INT))
+_afunc('GetProcessorVoltage', CFUNCTYPE(FLOAT, LPVOID, INT))
+_afunc('GetNorthBridgeVendor', CFUNCTYPE(LPSTR, LPVOID))
 _afunc('GetNorthBridgeModel')
 _afunc('GetNorthBridgeRevision')
 _afunc('GetSouthBridgeVendor')
 _afunc('GetSouthBridgeModel')
 _afunc('GetSouthBridgeRevision')
 _afunc('proc_AA???')
-_afunc('GetMemoryType')
-_afunc('GetMemorySize')
-_afunc('GetMemoryNumberOfChannels')
-_afunc('GetMemoryClockFrequency')
-_afunc('GetMemoryCASLatency')
-_afunc('GetMemoryRAStoCASDelay')
-_afunc('GetMemoryRASPrecharge')
-_afunc('GetMemoryTRAS')
-_afunc('GetMemoryTRC')
-_afunc('GetMemoryCommandRate')
-_afunc('ComputeMemoryFrequency')
-_afunc('GetBIOSVendor')
+_afunc('GetMemoryType', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemorySize', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemoryNumberOfChannels', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemoryClockFrequency', CFUNCTYPE(FLOAT, LPVOID))
+_afunc('GetMemoryCASLatency', CFUNCTYPE(FLOAT, LPVOID))
+_afunc('GetMemoryRAStoCASDelay', CFUNCTYPE(FLOAT, LPVOID))
+_afunc('GetMemoryRASPrecharge', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemoryTRAS', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemoryTRC', CFUNCTYPE(INT, LPVOID))
+_afunc('GetMemoryCommandRate', CFUNCTYPE(INT, LPVOID))
+_afunc('ComputeMemoryFrequency', CFUNCTYPE(FLOAT, LPVOID))
+_afunc('GetBIOSVendor', CFUNCTYPE(LPSTR, LPVOID))
 
 #####################################/
 #   DRIVER codes
@@ -167,3 +167,5 @@ CPUZ_MSR_CMD           = 0x912
 
 CPUZ_MSR_GET_TICKS     = 0x982
 
+
+CPUZ_FUNC_NAME = { value: name for name, value in globals().copy().items() if name.startswith('CPUZ_') and name != 'CPUZ_DEVICE_TYPE' }
@@ -33,27 +33,315 @@ def ioctl_decode(ioctl, ret_dict = False):
     else:
         return f'DeviceType: 0x{DeviceType:X}, Access: 0x{Access:X}, Function: 0x{Function:X}, Method: 0x{Method:X}'
 
-# ioctl: 9C402480 , 9C402484, 0x9C402488
+def CFG_ADDR(bus, dev, fun, reg):
+    bus = SETDIM(bus, 15)
+    dev = SETDIM(dev, 5)
+    fun = SETDIM(fun, 3)
+    reg = SETDIM(reg, 8)
+    return 0x80000000 | (bus << 16) | (dev << 11) | (fun << 8) | reg
+
+CFG_ADDR_PORT = 0xCF8
+CFG_DATA_PORT = 0xCFC
+
+def CFG_ADDR_EX(bus, dev, fun, off):
+    bus = SETDIM(bus, 12)
+    dev = SETDIM(dev, 5)
+    fun = SETDIM(fun, 3)
+    off = SETDIM(off, 12)
+    return (bus << 20) | (dev << 15) | (fun << 12) | off
+
+#######################################################
+#  Backend for driver cpuz154.sys (CPUIDSDK)
+#######################################################
+
+# precompiled request layout of IOCTL
+class IoctlLayout():
+    def __init__(self, func_num, in_fmt, out_fmt):
+        self.func_num = func_num
+        self.ioctl = IOCTL(func_num)
+        self.inp = struct.Struct(in_fmt)
+        self.out = struct.Struct(out_fmt)
+
+    def __repr__(self):
+        return f'<IoctlLayout:0x{self.ioctl:08X}:{self.inp.format}:{self.out.format}>'
+
+_L_PORT_READ = {
+    1: IoctlLayout(CPUZ_PORT_READ_1, '<I', '<II'),
+    2: IoctlLayout(CPUZ_PORT_READ_2, '<I', '<II'),
+    4: IoctlLayout(CPUZ_PORT_READ_4, '<I', '<II'),
+}
+_L_PORT_WRITE = {
+    1: IoctlLayout(CPUZ_PORT_WRITE_1, '<II', '<II'),
+    2: IoctlLayout(CPUZ_PORT_WRITE_2, '<II', '<II'),
+    4: IoctlLayout(CPUZ_PORT_WRITE_4, '<II', '<II'),
+}
+_L_PCI_CFG_READ       = IoctlLayout(CPUZ_PCI_CFG_READ,      '<IIIIIII', '<i')
+_L_PCI_CFG_WRITE      = IoctlLayout(CPUZ_PCI_CFG_WRITE,     '<IIIIIII', '<i')
+_L_PCI_CFG_CMD        = IoctlLayout(CPUZ_PCI_CFG_CMD,       '<II', '<I')
+_L_SMBUS_READ_1       = IoctlLayout(CPUZ_SMBUS_READ_1,      '<IIII', '<IIII')
+_L_SMBUS_WRITE_1      = IoctlLayout(CPUZ_SMBUS_WRITE_1,     '<IIIII', '<II')
+_L_SMBUS_PCALL        = IoctlLayout(CPUZ_SMBUS_PCALL,       '<IIIIII', '<IIII')
+_L_SMBUS_READ_X       = IoctlLayout(CPUZ_SMBUS_READ_X,      '<III', '<IIII')
+_L_MSR_READ           = IoctlLayout(CPUZ_MSR_READ,          '<I', '<II')
+_L_MSR_WRITE          = IoctlLayout(CPUZ_MSR_WRITE,         '<III', '<II')
+_L_MSR_CMD            = IoctlLayout(CPUZ_MSR_CMD,           '<II', '<II')
+_L_MSR_GET_TICKS      = IoctlLayout(CPUZ_MSR_GET_TICKS,     '<I', '<II')
+_L_PHYMEM_READ        = IoctlLayout(CPUZ_PHYMEM_READ,       '<IIIII', '<II')
+_L_PHYMEM_PC_READ64   = IoctlLayout(CPUZ_PHYMEM_PC_READ64,  '<BBBBIII', '<Q')
+_L_PHYMEM_PC_WRITE32  = IoctlLayout(CPUZ_PHYMEM_PC_WRITE32, '<BBBBIIII', '<I')
+_L_PHYMEM_MAP         = IoctlLayout(CPUZ_PHYMEM_MAP,        '<III', '<Q')
+_L_PHYMEM_UNMAP       = IoctlLayout(CPUZ_PHYMEM_UNMAP,      '<III', '<II')
+
+class CpuzBackend(HwBackend):
+    name = 'cpuz'
+
+    def __init__(self, drv):
+        self.drv = drv    # Win32FileHandle
+        self.chan = DeviceIoChannel(drv) if drv else None
+
+    def close(self):
+        if self.drv:
+            self.drv.close()
+        self.drv = None
+        self.chan = None
+
+    # xbuf: data buffer, the address of which is passed into inbuf
+    def ioctl(self, func_num, inbuf, outsize, xbuf = None):
+        return DeviceIoControl(self.drv, IOCTL(func_num), inbuf, outsize, xbuf)
+
+    # xsize: size of data in chan.data (the address of which is passed into inbuf)
+    # return: unpacked tuple or None on failure
+    def request(self, layout, args, xsize = 0):
+        chan = self.chan
+        layout.inp.pack_into(chan.inbuf, 0, *args)
+        out = chan.call(layout.ioctl, layout.inp.size, layout.out.size, xsize)
+        if not out or len(out) != layout.out.size:
+            return None
+        return layout.out.unpack_from(out)
+
+    # ioctl: 9C402480 , 9C402484, 0x9C402488
+    def port_read(self, port, size):
+        layout = _L_PORT_READ.get(size, None)
+        if not layout:
+            raise ValueError()
+        res = self.request(layout, ( port, ))
+        if not res or res[1] != 0x87654321:
+            raise RuntimeError(f'ERROR: port_read: cannot read data from port = 0x{port:04X}')
+        val = res[0]
+        if size == 1:
+            return val & 0xFF
+        if size == 2:
+            return val & 0xFFFF
+        return val
+
+    # ioctl: 9C4024C0 , 9C4024C4 , 9C4024C8
+    def port_write(self, port, value, size):
+        layout = _L_PORT_WRITE.get(size, None)
+        if not layout:
+            raise ValueError()
+        rc = self.request(layout, ( port, value ))
+        if not rc:
+            return False
+        return True if rc[0] == 0x87654321 and rc[1] == 0x87654321 else False
+
+    # ioctl: 9C402700
+    def pci_cfg_read(self, bus, dev, fun, offset, size):
+        data_addr = self.chan.get_data(size) if size > 0 else 0
+        # BusDataType = PCIConfiguration  # 4
+        # BusNumber = bus
+        # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
+        # Buffer = HIDWORD(data_addr) << 32 + LODWORD(data_addr)
+        # Offset = offset
+        # Length = size 
+        # ULONG HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
+        res = self.request(_L_PCI_CFG_READ, ( bus, dev, fun, offset, size, HIDWORD(data_addr), LODWORD(data_addr) ), size)
+        if not res:
+            raise RuntimeError(f'DeviceIoControl failed') # GetLastError
+        sz = res[0]
+        if sz == 2:
+            #if size > 0:
+            #    data = b'\xFF\xFF\xFF\xFF' * ((size - 1) // 4 + 1)
+            if size > 2:
+                return bytes(self.chan.dataview[:2]) + bytes(size - 2)
+            return bytes(self.chan.dataview[:size])
+        if sz == size:
+            return bytes(self.chan.dataview[:size])
+        return None
+
+    # ioctl: 9C402704
+    def pci_cfg_write(self, bus, dev, fun, offset, data):
+        size = len(data)
+        data_addr = self.chan.get_data(size)
+        self.chan.dataview[:size] = data
+        # ULONG HalSetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
+        res = self.request(_L_PCI_CFG_WRITE, ( bus, dev, fun, offset, size, HIDWORD(data_addr), LODWORD(data_addr) ), size)
+        if not res:
+            raise RuntimeError(f'DeviceIoControl failed')
+        return True if res[0] != 0 else False
+
+    # ioctl: 9C402708
+    def pci_cfg_cmd(self, cfg_addr, value):
+        res = self.request(_L_PCI_CFG_CMD, ( cfg_addr, value ))
+        if not res:
+            raise RuntimeError(f'DeviceIoControl failed')
+        return res[0]
+
+    # ioctl: 0x9C402680     # for SPD addr = 0x50...0x53
+    def smbus_read_u1(self, port, dev, command, status = 0xBF):
+        # port_write_u1(port + SMBHSTSTS, status);
+        # port_write_u1(port + SMBHSTADD, (dev << 1) | I2C_READ);
+        # port_write_u1(port + SMBHSTCMD, command);
+        ok, val, status, rc = self.request(_L_SMBUS_READ_1, ( port, dev, command, status ))
+        if ok == 1:
+            return val & 0xFF
+        if rc == 0xBB:  # Timed out (1000*10*20 ticks)
+            print(f'ERROR: smbus_read_u1: timed out')
+            return None
+        if (status & SMBHSTSTS_INUSE_STS) != 0:
+            print('ERROR: smbus_read_u1: status = IN_USE')
+        return None
+
+    # ioctl: 0x9C402690
+    def smbus_write_u1(self, port, dev, command, value, status = 0xBF):
+        # port_write_u1(port, status);
+        # port_write_u1(port + 4, dev << 1);
+        # port_write_u1(port + 3, command);
+        # port_write_u1(port + 5, value);
+        ok, rc = self.request(_L_SMBUS_WRITE_1, ( port, dev, command, status, value ))
+        if ok == 1:
+            return True
+        if rc == 0x22222222:  # Timed out (1000*10*20 ticks)
+            print(f'ERROR: smbus_write_u1: timed out')
+            return False
+        if rc == 0x33333333:  # DERR or BERR or FAIL
+            print(f'ERROR: smbus_write_u1: DERR or BERR or FAIL')
+            return False
+        return False
+
+    # ioctl: 0x9C40269C    SMBHSTCNT_PROC_CALL    I2C_SMBUS_PROC_CALL
+    def smbus_pcall(self, port, dev, command, value, status = 0xBF):
+        val_LO = value & 0xFF
+        val_HI = (value >> 8) & 0xFF
+        ok, status, vLO, vHI = self.request(_L_SMBUS_PCALL, ( port, dev, command, status, val_LO, val_HI ))
+        if ok == 1:
+            return (vHI << 8) + vLO
+        if vLO == 0 and vHI == 0:  # Timed out (400*10*20 ticks)
+            print(f'ERROR: smbus_pcall: timed out')
+            return None
+        if vLO == 1 and vHI == 0:  # DERR or BERR or FAIL
+            print(f'ERROR: smbus_pcall: DERR or BERR or FAIL')
+            return None
+        return None
+
+    # ioctl: 0x9C402688
+    def smbus_read_X(self, port, dev, command):
+        ok, val, xxx, ticks = self.request(_L_SMBUS_READ_X, ( port, dev, command ))
+        if ok == 1:
+            return val
+        return None
+
+    # ioctl: 9C402440
+    def msr_read(self, reg):
+        res = self.request(_L_MSR_READ, ( reg, ))
+        if not res:
+            return None
+        val_LO, val_HI = res
+        if val_LO == 0xFFFFFFFF and val_HI == 0xFFFFFFFF:
+            return None
+        return (val_HI << 32) + val_LO
+
+    # ioctl: 9C402444
+    def msr_write(self, reg, val_HI, val_LO):
+        res = self.request(_L_MSR_WRITE, ( reg, val_HI, val_LO ))
+        if not res:
+            return False
+        vLO, vHI = res
+        if vLO != 0xAAAAAAAA or vHI != 0xBBBBBBBB:
+            return False
+        return True
+
+    # ioctl: 9C402448
+    def msr_oc_mailbox(self, cmd, data):
+        status, value = self.request(_L_MSR_CMD, ( cmd, data ))
+        #if val_LO == 0 and val_HI == 0:
+        #    return None
+        return status, value
+
+    # ioctl: 0x9C402608   msr_read
+    def msr_get_ticks(self, reg):
+        ticks_HI, ticks_LO = self.request(_L_MSR_GET_TICKS, ( reg, ))
+        ticks = (ticks_HI << 32) + ticks_LO
+        return ticks / 1000000
+
+    # ioctl: 9C402540
+    def phymem_read(self, addr, size):
+        addr_HI = SETDIM(addr >> 32, 32)
+        addr_LO = SETDIM(addr, 32)
+        data_addr = self.chan.get_data(size)
+        rc, data_addr_LO = self.request(_L_PHYMEM_READ, ( addr_HI, addr_LO, size, HIDWORD(data_addr), LODWORD(data_addr) ), size)
+        if rc == 0x11111111 or rc == 0x22222222 or rc == 0x33333333:
+            return bytes(self.chan.dataview[:size])
+        return None
+
+    # ioctl: 9C402544
+    def phymem_pc_read64(self, bus, dev, fun, offset, addr_mask, addr_offset):
+        dev_fun = (SETDIM(dev, 5) << 3) | SETDIM(fun, 3)
+        # BusDataType = PCIConfiguration = 4
+        # BusNumber = bus
+        # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
+        # Offset = offset
+        # Length = 8
+        # mem_addr = HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
+        # mem_addr = mem_addr & addr_mask
+        # mem_addr += addr_offset
+        # value = *mem_addr
+        (value, ) = self.request(_L_PHYMEM_PC_READ64, ( 0, dev_fun, bus, 0, offset, addr_mask, addr_offset ))
+        if value == 0xBBBBBBBBAAAAAAAA or value == 0xDDDDDDDDCCCCCCCC:
+            return None
+        return value
+
+    # ioctl: 9C402560
+    def phymem_pc_write32(self, bus, dev, fun, offset, addr_mask, addr_offset, value):
+        dev_fun = (SETDIM(dev, 5) << 3) | SETDIM(fun, 3)
+        # BusDataType = PCIConfiguration = 4
+        # BusNumber = bus
+        # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
+        # Offset = offset
+        # Length = 8
+        # mem_addr = HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
+        # mem_addr = mem_addr & addr_mask
+        # mem_addr += addr_offset
+        # *mem_addr = value 
+        (rc, ) = self.request(_L_PHYMEM_PC_WRITE32, ( 0, dev_fun, bus, 0, offset, addr_mask, addr_offset, value ))
+        if rc == 0xAAAAAAAA or rc == 0xCCCCCCCC:
+            return False
+        return True
+
+    # ioctl: 9C402550
+    def phymem_map(self, phy_addr, size):
+        addr_HI = SETDIM(phy_addr >> 32, 32)
+        addr_LO = SETDIM(phy_addr, 32)
+        (map_addr, ) = self.request(_L_PHYMEM_MAP, ( addr_HI, addr_LO, size ))
+        if map_addr == 0:
+            return None
+        return map_addr
+
+    # ioctl: 9C402554
+    def phymem_unmap(self, phy_addr, size):
+        addr_HI = SETDIM(phy_addr >> 32, 32)
+        addr_LO = SETDIM(phy_addr, 32)
+        (rc0, rc1) = self.request(_L_PHYMEM_UNMAP, ( addr_HI, addr_LO, size ))
+        if rc0 == 0x12345678 and rc1 == 0x87654321:
+            return True
+        return False
+
+#######################################################
+#  PORTS
+#######################################################
+
 def port_read(port, size):
     _drv = _get_drv()
-    if size == 1:
-        func_num = CPUZ_PORT_READ_1
-    elif size == 2:
-        func_num = CPUZ_PORT_READ_2
-    elif size == 4:
-        func_num = CPUZ_PORT_READ_4
-    else:
-        raise ValueError()
-    inbuf = struct.pack('<I', port)
-    buf = DeviceIoControl(_drv, IOCTL(func_num), inbuf, 8, None)
-    val, rc = struct.unpack("<II", buf)
-    if rc != 0x87654321:
-        raise RuntimeError(f'ERROR: port_read: cannot read data from port = 0x{port:04X}')
-    if size == 1:
-        return val & 0xFF
-    if size == 2:
-        return val & 0xFFFF
-    return val
+    return _drv.port_read(port, size)
 
 def port_read_u1(port):
     return port_read(port, 1)
@@ -61,7 +349,6 @@ def port_read_u1(port):
 def port_read_u4(port):
     return port_read(port, 4)
 
-# ioctl: 9C4024C0 , 9C4024C4 , 9C4024C8
 def port_write(port, value, size = None):
     _drv = _get_drv()
     if isinstance(value, bytes):
@@ -69,18 +356,7 @@ def port_write(port, value, size = None):
             raise ValueError()
         size = len(value)
         value = int.from_bytes(value, 'little', signed = False)
-    if size == 1:
-        func_num = CPUZ_PORT_WRITE_1
-    elif size == 2:
-        func_num = CPUZ_PORT_WRITE_2
-    elif size == 4:
-        func_num = CPUZ_PORT_WRITE_4
-    else:
-        raise ValueError()
-    inbuf = struct.pack('<II', port, value)
-    buf = DeviceIoControl(_drv, IOCTL(func_num), inbuf, 8, None)
-    rc = struct.unpack("<II", buf)
-    return True if rc[0] == 0x87654321 and rc[1] == 0x87654321 else False
+    return _drv.port_write(port, value, size)
 
 def port_write_u1(port, value):
     return port_write(port, value & 0xFF, 1)
@@ -88,19 +364,135 @@ def port_write_u1(port, value):
 def port_write_u4(port, value):
     return port_write(port, value & 0xFFFFFFFF, 4)
 
+#######################################################
+#  PCI config space
+#######################################################
 
-def CFG_ADDR(bus, dev, fun, reg):
-    bus = SETDIM(bus, 15)
-    dev = SETDIM(dev, 5)
-    fun = SETDIM(fun, 3)
-    reg = SETDIM(reg, 8)
-    return 0x80000000 | (bus << 16) | (dev << 11) | (fun << 8) | reg
+PCI_CFG_DRIVER = 1    # HalGetBusDataByOffset (IOCTL CPUZ_PCI_CFG_READ / CPUZ_PCI_CFG_WRITE)
+PCI_CFG_PORTS  = 2    # ports 0xCF8 / 0xCFC
+PCI_CFG_ECAM   = 3    # memory mapped config space (PCIe ECAM)
+
+_pci_cfg_method = PCI_CFG_DRIVER
+
+def get_pci_cfg_method():
+    return _pci_cfg_method
+
+def set_pci_cfg_method(method):
+    global _pci_cfg_method
+    prev = _pci_cfg_method
+    _pci_cfg_method = method
+    return prev
+
+# PCIe Enhanced Configuration Access Mechanism:  cfg_addr = ECAM_BASE + (bus << 20 | dev << 15 | fun << 12 | offset)
+# 4KB window of each function is mapped once by phymem_map and then accessed as plain memory.
+class PciEcam():
+    def __init__(self, base, bus_count = 256):
+        self.base = base
+        self.bus_count = bus_count
+        self.windows = { }    # (bus, dev, fun) => ( PhyMemWindow, ctypes array of 1024 dwords )
+
+    def __repr__(self):
+        return f'<PciEcam:0x{self.base:X}:{self.bus_count}>'
+
+    def window(self, bus, dev, fun):
+        key = (bus, dev, fun)
+        win = self.windows.get(key, None)
+        if win is False:
+            return None
+        if win is None or win[0].closed:
+            if bus >= self.bus_count:
+                return None
+            mem = phymem_map_window(self.base + CFG_ADDR_EX(bus, dev, fun, 0), 0x1000)
+            if not mem:
+                if _phymem_windows_enabled:
+                    self.windows[key] = False
+                return None
+            win = ( mem, (ctypes.c_uint32 * 0x400).from_address(mem.addr) )
+            self.windows[key] = win
+        return win[1]
+
+    def read(self, bus, dev, fun, offset, size):
+        if offset < 0 or offset + size > 0x1000:
+            raise ValueError(f'Incorrect offset or size argument')
+        win = self.window(bus, dev, fun)
+        if win is None:
+            return None
+        pos = offset & ~3
+        end = ROUNDUP(offset + size, 4)
+        buf = struct.pack(f'<{(end - pos) // 4}I', *win[pos // 4 : end // 4])
+        return buf[offset - pos : offset - pos + size]
+
+    def write(self, bus, dev, fun, offset, data):
+        if (offset & 3) != 0 or (len(data) & 3) != 0 or offset + len(data) > 0x1000:
+            raise ValueError(f'Incorrect offset or data argument')
+        win = self.window(bus, dev, fun)
+        if win is None:
+            return False
+        for idx, value in enumerate(struct.unpack(f'<{len(data) // 4}I', data)):
+            win[offset // 4 + idx] = value
+        return True
 
-CFG_ADDR_PORT = 0xCF8
-CFG_DATA_PORT = 0xCFC
+    def close(self):
+        for win in self.windows.values():
+            if win:
+                win[0].close()
+        self.windows = { }
+
+# return (ecam_base, bus_count) or None
+def pci_find_ecam_base():
+    vid = pci_cfg_read(0, 0, 0, 0, '2', method = PCI_CFG_DRIVER)
+    if vid == 0x8086:
+        # ref: Intel 12th Gen Core Datasheet Vol2:  PCI Express Base Address (PCIEXBAR)—Offset 60h
+        val = pci_cfg_read(0, 0, 0, 0x60, '8', method = PCI_CFG_DRIVER)
+        if not val or (val & 1) == 0:
+            return None
+        length = get_bits(val, 0, 1, 3)
+        addr_bit = { 0: 28, 1: 27, 2: 26 }.get(length, 28)   # 256MB / 128MB / 64MB
+        base = val & MASK(42) & ~MASK(addr_bit)
+        return base, 1 << (addr_bit - 20)
+    if vid == 0x1022:
+        # ref: AMD PPR:  MSRC001_0058 [MMIO Configuration Base Address]
+        val = msr_read(0xC0010058)
+        if not val or (val & 1) == 0:
+            return None
+        bus_range = get_bits(val, 0, 2, 5)
+        base = val & MASK(48) & ~MASK(20)
+        return base, min(1 << bus_range, 256)
+    return None
+
+_pci_ecam = None
+
+def get_pci_ecam():
+    return _pci_ecam
+
+# enable = True : ECAM is used as default access method for pci_cfg_read / pci_cfg_write
+def pci_ecam_init(base = None, bus_count = 256, enable = True):
+    global _pci_ecam
+    pci_ecam_close()
+    if base is None:
+        res = pci_find_ecam_base()
+        if not res:
+            return None
+        base, bus_count = res
+    _pci_ecam = PciEcam(base, bus_count)
+    if enable:
+        set_pci_cfg_method(PCI_CFG_ECAM)
+    return _pci_ecam
+
+def pci_ecam_close():
+    global _pci_ecam
+    if _pci_ecam:
+        if _pci_cfg_method == PCI_CFG_ECAM:
+            set_pci_cfg_method(PCI_CFG_DRIVER)
+        try:
+            _pci_ecam.close()
+        except Exception:
+            pass
+    _pci_ecam = None
+
+atexit.register(pci_ecam_close)
 
-# ioctl: 9C402700
-def pci_cfg_read(bus, dev, fun, offset, size, method = 1):
+def pci_cfg_read(bus, dev, fun, offset, size, method = None):
     _drv = _get_drv()
     out_decimal = False
     if isinstance(size, str):
@@ -108,30 +500,18 @@ def pci_cfg_read(bus, dev, fun, offset, size, method = 1):
         size = int(size)
     if size < 0:
         raise ValueError(f'Incorrect size argument')
-    if method == 1:
-        data_addr = 0
-        if size > 0:
-            data = bytearray(size)
-            data_addr = get_bytes_addr(data)
-        inbuf = struct.pack('<IIIIIII', bus, dev, fun, offset, size, HIDWORD(data_addr), LODWORD(data_addr))
-        # BusDataType = PCIConfiguration  # 4
-        # BusNumber = bus
-        # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
-        # Buffer = HIDWORD(data_addr) << 32 + LODWORD(data_addr)
-        # Offset = offset
-        # Length = size 
-        # ULONG HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
-        buf = DeviceIoControl(_drv, IOCTL(CPUZ_PCI_CFG_READ), inbuf, 4, None)
-        if not buf or len(buf) != 4:
-            raise RuntimeError(f'DeviceIoControl failed') # GetLastError
-        sz = int.from_bytes(buf, 'little', signed = True)
-        if sz == 2:
-            #if size > 0:
-            #    data = b'\xFF\xFF\xFF\xFF' * ((size - 1) // 4 + 1)
-            return bytes(data) if not out_decimal else int.from_bytes(data, 'little')
-        if sz == size:
-            return bytes(data) if not out_decimal else int.from_bytes(data, 'little')
-        return None
+    if method is None:
+        method = _pci_cfg_method
+    if method == PCI_CFG_ECAM and _pci_ecam:
+        data = _pci_ecam.read(bus, dev, fun, offset, size)
+        if data is not None:
+            return data if not out_decimal else int.from_bytes(data, 'little')
+        method = PCI_CFG_DRIVER    # window cannot be mapped
+    if method != PCI_CFG_PORTS:
+        data = _drv.pci_cfg_read(bus, dev, fun, offset, size)
+        if data is None:
+            return None
+        return data if not out_decimal else int.from_bytes(data, 'little')
     if size == 0:
         raise ValueError(f'Incorrect size argument')
     buf = b''
@@ -147,8 +527,7 @@ def pci_cfg_read(bus, dev, fun, offset, size, method = 1):
         buf += struct.pack('<I', value)
     return buf if not out_decimal else int.from_bytes(buf, 'little')
 
-# ioctl: 9C402704
-def pci_cfg_write(bus, dev, fun, offset, data, method = 1):
+def pci_cfg_write(bus, dev, fun, offset, data, method = None):
     _drv = _get_drv()
     if isinstance(data, int):
         data_size = 4 if data <= 0xFFFFFFFF else 8
@@ -157,16 +536,17 @@ def pci_cfg_write(bus, dev, fun, offset, data, method = 1):
         raise ValueError(f'Incorrect data argument')
     if (len(data) & 3) != 0:
         raise ValueError(f'Incorrect data argument')
-    if method == 1:
-        size = len(data)
-        data_addr = get_bytes_addr(data)
-        inbuf = struct.pack('<IIIIIII', bus, dev, fun, offset, size, HIDWORD(data_addr), LODWORD(data_addr))
-        # ULONG HalSetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
-        buf = DeviceIoControl(_drv, IOCTL(CPUZ_PCI_CFG_WRITE), inbuf, 4, None)
-        if not buf or len(buf) != 4:
-            raise RuntimeError(f'DeviceIoControl failed')
-        rc = int.from_bytes(buf, 'little', signed = True)
-        return True if rc != 0 else False
+    pci_cfg_cache.invalidate(bus, dev, fun)
+    if method is None:
+        method = _pci_cfg_method
+    if method == PCI_CFG_ECAM and _pci_ecam:
+        if _pci_ecam.write(bus, dev, fun, offset, bytes(data)):
+            return True
+        method = PCI_CFG_DRIVER    # window cannot be mapped
+    if method != PCI_CFG_PORTS:
+        if isinstance(data, bytes):
+            data = bytearray(data)
+        return _drv.pci_cfg_write(bus, dev, fun, offset, data)
     pos = 0
     while pos < len(data):
         addr = CFG_ADDR(bus, dev, fun, offset + pos)
@@ -181,21 +561,66 @@ def pci_cfg_write(bus, dev, fun, offset, data, method = 1):
         pos += 4
     return True
 
-def CFG_ADDR_EX(bus, dev, fun, off):
-    bus = SETDIM(bus, 12)
-    dev = SETDIM(dev, 5)
-    fun = SETDIM(fun, 3)
-    off = SETDIM(off, 12)
-    return (bus << 20) | (dev << 15) | (fun << 12) | off
+# Snapshot cache of PCI config space: full header of function is readed by one request,
+# then all field reads are served from memory.
+class PciCfgCache():
+    def __init__(self, size = 0x100):
+        self.size = size      # 0x100 = PCI header,  0x1000 = PCIe extended config space
+        self.cache = { }      # (bus, dev, fun) => bytes
+
+    def snapshot(self, bus, dev, fun, size = None):
+        size = size if size else self.size
+        key = (bus, dev, fun)
+        data = self.cache.get(key, None)
+        if data is None or len(data) < size:
+            data = None
+            _drv = _get_drv(check = False)
+            if _drv and _pci_cfg_method == PCI_CFG_DRIVER:
+                data = _drv.pci_cfg_read_all(bus, dev, fun)    # whole config space by one request
+                if data is not None and len(data) < size:
+                    data = None    # extended config space is not available
+            if data is None:
+                data = pci_cfg_read(bus, dev, fun, 0, size)
+            if data is None:
+                return None
+            self.cache[key] = data
+        return data
+
+    # volatile = True : read-through mode (value is readed from device and snapshot is not used)
+    def read(self, bus, dev, fun, offset, size, volatile = False):
+        out_decimal = False
+        if isinstance(size, str):
+            out_decimal = True
+            size = int(size)
+        if volatile or offset + size > 0x1000:
+            data = pci_cfg_read(bus, dev, fun, offset, size)
+        else:
+            data = self.snapshot(bus, dev, fun, self.size if offset + size <= self.size else 0x1000)
+            if data is not None:
+                data = data[offset:offset+size]
+        if data is None:
+            return None
+        return data if not out_decimal else int.from_bytes(data, 'little')
+
+    def invalidate(self, bus = None, dev = None, fun = None):
+        if bus is None:
+            self.cache.clear()
+            return
+        for key in list(self.cache.keys()):
+            if key[0] == bus and (dev is None or key[1] == dev) and (fun is None or key[2] == fun):
+                del self.cache[key]
+
+pci_cfg_cache = PciCfgCache()
+
+def pci_cfg_read_cached(bus, dev, fun, offset, size, volatile = False):
+    return pci_cfg_cache.read(bus, dev, fun, offset, size, volatile)
+
+def pci_cfg_cache_clear():
+    pci_cfg_cache.invalidate()
 
-# ioctl: 9C402708
 def pci_cfg_cmd(cfg_addr, value):
     _drv = _get_drv()
-    inbuf = struct.pack('<II', cfg_addr, value)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PCI_CFG_CMD), inbuf, 4, None)
-    if not buf or len(buf) != 4:
-        raise RuntimeError(f'DeviceIoControl failed')
-    return int.from_bytes(buf, 'little', signed = False)
+    return _drv.pci_cfg_cmd(cfg_addr, value)
 
 # pci_cfg_read_ex    
 def pci_cfg_command(bus, dev, fun, offset):
@@ -207,111 +632,43 @@ def pci_cfg_command(bus, dev, fun, offset):
     resp = pci_cfg_cmd(addr, val)
     return resp >> (8 * (addr & 3))
 
-# ioctl: 0x9C402680     # for SPD addr = 0x50...0x53
+#######################################################
+#  SMBus
+#######################################################
+
 def smbus_read_u1(port, dev, command, status = 0xBF):
     _drv = _get_drv()
-    inbuf = struct.pack('<IIII', port, dev, command, status)
-    # port_write_u1(port + SMBHSTSTS, status);
-    # port_write_u1(port + SMBHSTADD, (dev << 1) | I2C_READ);
-    # port_write_u1(port + SMBHSTCMD, command);
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_SMBUS_READ_1), inbuf, 16, None)
-    ok, val, status, rc = struct.unpack('<IIII', buf)
-    if ok == 1:
-        return val & 0xFF
-    if rc == 0xBB:  # Timed out (1000*10*20 ticks)
-        print(f'ERROR: smbus_read_u1: timed out')
-        return None
-    if (status & SMBHSTSTS_INUSE_STS) != 0:
-        print('ERROR: smbus_read_u1: status = IN_USE')
-    return None
+    return _drv.smbus_read_u1(port, dev, command, status)
 
-# ioctl: 0x9C402690
 def smbus_write_u1(port, dev, command, value, status = 0xBF):
     _drv = _get_drv()
-    inbuf = struct.pack('<IIIII', port, dev, command, status, value)
-    # port_write_u1(port, status);
-    # port_write_u1(port + 4, dev << 1);
-    # port_write_u1(port + 3, command);
-    # port_write_u1(port + 5, value);
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_SMBUS_WRITE_1), inbuf, 8, None)
-    ok, rc = struct.unpack('<II', buf)
-    if ok == 1:
-        return True
-    if rc == 0x22222222:  # Timed out (1000*10*20 ticks)
-        print(f'ERROR: smbus_write_u1: timed out')
-        return False
-    if rc == 0x33333333:  # DERR or BERR or FAIL
-        print(f'ERROR: smbus_write_u1: DERR or BERR or FAIL')
-        return False
-    return False
+    return _drv.smbus_write_u1(port, dev, command, value, status)
 
-# ioctl: 0x9C40269C    SMBHSTCNT_PROC_CALL    I2C_SMBUS_PROC_CALL
 def smbus_pcall(port, dev, command, value, status = 0xBF):
     _drv = _get_drv()
-    val_LO = value & 0xFF
-    val_HI = (value >> 8) & 0xFF
-    inbuf = struct.pack('<IIIIII', port, dev, command, status, val_LO, val_HI)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_SMBUS_PCALL), inbuf, 16, None)
-    ok, status, vLO, vHI = struct.unpack('<IIII', buf)
-    if ok == 1:
-        return (vHI << 8) + vLO
-    if vLO == 0 and vHI == 0:  # Timed out (400*10*20 ticks)
-        print(f'ERROR: smbus_pcall: timed out')
-        return None
-    if vLO == 1 and vHI == 0:  # DERR or BERR or FAIL
-        print(f'ERROR: smbus_pcall: DERR or BERR or FAIL')
-        return None
-    return None
+    return _drv.smbus_pcall(port, dev, command, value, status)
 
-# ioctl: 0x9C402688
 def smbus_read_X(port, dev, command):
     _drv = _get_drv()
-    inbuf = struct.pack('<III', port, dev, command)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_SMBUS_READ_X), inbuf, 16, None)
-    ok, val, xxx, ticks = struct.unpack('<IIII', buf)
-    if ok == 1:
-        return val
-    return None
+    return _drv.smbus_read_X(port, dev, command)
     
 #######################################################
 #  MSR
 #######################################################    
     
-# ioctl: 9C402440
 def msr_read(reg):
     _drv = _get_drv()
-    inbuf = struct.pack('<I', reg)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_MSR_READ), inbuf, 8, None)
-    if not buf:
-        return None
-    val_LO, val_HI = struct.unpack('<II', buf)
-    if val_LO == 0xFFFFFFFF and val_HI == 0xFFFFFFFF:
-        return None
-    return (val_HI << 32) + val_LO
+    return _drv.msr_read(reg)
 
-# ioctl: 9C402444
 def msr_write(reg, val_HI, val_LO):
     _drv = _get_drv()
-    inbuf = struct.pack('<III', reg, val_HI, val_LO)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_MSR_WRITE), inbuf, 8, None)
-    if not buf:
-        return False
-    vLO, vHI = struct.unpack('<II', buf)
-    if vLO != 0xAAAAAAAA or vHI != 0xBBBBBBBB:
-        return False
-    return True
+    return _drv.msr_write(reg, val_HI, val_LO)
 
-# ioctl: 9C402448
 def msr_oc_mailbox(cmd, data, method = 1):
     _drv = _get_drv()
     reg = 0x150  # MSR_OC_MAILBOX
     if method == 1:
-        inbuf = struct.pack('<II', cmd, data)
-        buf = DeviceIoControl(_drv, IOCTL(CPUZ_MSR_CMD), inbuf, 8, None)
-        status, value = struct.unpack('<II', buf)
-        #if val_LO == 0 and val_HI == 0:
-        #    return None
-        return status, value
+        return _drv.msr_oc_mailbox(cmd, data)
     xvv = msr_read(reg)
     if xvv is not None:
         msr_write(reg, val_HI, val_LO)
@@ -323,99 +680,118 @@ def msr_oc_mailbox(cmd, data, method = 1):
                 return kv
     return None        
 
-# ioctl: 0x9C402608   msr_read
 def msr_get_ticks(reg):
     _drv = _get_drv()
-    inbuf = struct.pack('<I', reg)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_MSR_GET_TICKS), inbuf, 8, None)
-    ticks_HI, ticks_LO = struct.unpack('<II', buf)
-    ticks = (ticks_HI << 32) + ticks_LO
-    return ticks / 1000000
+    return _drv.msr_get_ticks(reg)
+
+# read list of MSRs on every CPU (cpus = None => all CPUs), return dict { cpu: { reg: value } }
+def msr_read_all(regs, cpus = None):
+    _drv = _get_drv()
+    return _drv.msr_read_all(regs, cpus)
     
 #######################################################
 #  PHYS MEMORY
 #######################################################    
     
-# ioctl: 9C402540
 def phymem_read(addr, size, out_decimal = False):
     _drv = _get_drv()
     if size <= 0:
         raise ValueError(f'Incorrect size argument')
     if not addr:
         raise ValueError()
-    addr_HI = SETDIM(addr >> 32, 32)
-    addr_LO = SETDIM(addr, 32)
-    data = bytearray(size)
-    data_addr = get_bytes_addr(data)
-    inbuf = struct.pack('<IIIII', addr_HI, addr_LO, size, HIDWORD(data_addr), LODWORD(data_addr))
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PHYMEM_READ), inbuf, 8, None)
-    rc, data_addr_LO = struct.unpack('<II', buf)
-    if rc == 0x11111111 or rc == 0x22222222 or rc == 0x33333333:
-        return bytes(data) if not out_decimal else int.from_bytes(data, 'little')
-    return None
+    data = _drv.phymem_read(addr, size)
+    if data is None:
+        return None
+    return data if not out_decimal else int.from_bytes(data, 'little')
 
-# ioctl: 9C402544
 def phymem_pc_read64(bus, dev, fun, offset, addr_mask, addr_offset):
     _drv = _get_drv()
-    dev_fun = (SETDIM(dev, 5) << 3) | SETDIM(fun, 3)
-    inbuf = struct.pack('<BBBBIII', 0, dev_fun, bus, 0, offset, addr_mask, addr_offset)
-    # BusDataType = PCIConfiguration = 4
-    # BusNumber = bus
-    # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
-    # Offset = offset
-    # Length = 8
-    # mem_addr = HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
-    # mem_addr = mem_addr & addr_mask
-    # mem_addr += addr_offset
-    # value = *mem_addr
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PHYMEM_PC_READ64), inbuf, 8, None)
-    (value, ) = struct.unpack('<Q', buf)
-    if value == 0xBBBBBBBBAAAAAAAA or value == 0xDDDDDDDDCCCCCCCC:
-        return None
-    return value
+    return _drv.phymem_pc_read64(bus, dev, fun, offset, addr_mask, addr_offset)
 
-# ioctl: 9C402560
 def phymem_pc_write32(bus, dev, fun, offset, addr_mask, addr_offset, value: int):
     _drv = _get_drv()
-    dev_fun = (SETDIM(dev, 5) << 3) | SETDIM(fun, 3)
-    inbuf = struct.pack('<BBBBIIII', 0, dev_fun, bus, 0, offset, addr_mask, addr_offset, value)
-    # BusDataType = PCIConfiguration = 4
-    # BusNumber = bus
-    # SlotNumber = (SETDIM(fun, 3) << 5) | SETDIM(dev, 5)
-    # Offset = offset
-    # Length = 8
-    # mem_addr = HalGetBusDataByOffset(BUS_DATA_TYPE BusDataType, ULONG BusNumber, ULONG SlotNumber, PVOID Buffer, ULONG Offset, ULONG Length);
-    # mem_addr = mem_addr & addr_mask
-    # mem_addr += addr_offset
-    # *mem_addr = value 
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PHYMEM_PC_WRITE32), inbuf, 4, None)
-    (rc, ) = struct.unpack('<I', buf)
-    if rc == 0xAAAAAAAA or rc == 0xCCCCCCCC:
-        return False
-    return True
+    return _drv.phymem_pc_write32(bus, dev, fun, offset, addr_mask, addr_offset, value)
 
-# ioctl: 9C402550
 def phymem_map(phy_addr, size):
     _drv = _get_drv()
-    addr_HI = SETDIM(phy_addr >> 32, 32)
-    addr_LO = SETDIM(phy_addr, 32)
-    inbuf = struct.pack('<III', addr_HI, addr_LO, size)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PHYMEM_MAP), inbuf, 8, None)
-    (map_addr, ) = struct.unpack('<Q', buf)
-    if map_addr == 0:
-        return None
-    return map_addr
+    return _drv.phymem_map(phy_addr, size)
 
-# ioctl: 9C402554
 def phymem_unmap(phy_addr, size):
     _drv = _get_drv()
-    addr_HI = SETDIM(phy_addr >> 32, 32)
-    addr_LO = SETDIM(phy_addr, 32)
-    inbuf = struct.pack('<III', addr_HI, addr_LO, size)
-    buf = DeviceIoControl(_drv, IOCTL(CPUZ_PHYMEM_UNMAP), inbuf, 8, None)
-    (rc0, rc1) = struct.unpack('<II', buf)
-    if rc0 == 0x12345678 and rc1 == 0x87654321:
+    return _drv.phymem_unmap(phy_addr, size)
+
+# Window of physical memory, that mapped once into process address space (MMIO registers without IOCTL per access).
+class PhyMemWindow():
+    def __init__(self, phy_addr, size):
+        self.phy_addr = phy_addr
+        self.size = size
+        self.addr = phymem_map(phy_addr, size)
+        if not self.addr:
+            raise RuntimeError(f'ERROR: cannot map phys memory 0x{phy_addr:X} (size = 0x{size:X})')
+        self.view = memoryview((ctypes.c_ubyte * size).from_address(self.addr)).cast('B')
+
+    def __repr__(self):
+        return f'<PhyMemWindow:0x{self.phy_addr:X}:0x{self.size:X}>'
+
+    @property
+    def closed(self):
+        return self.addr is None
+
+    def contains(self, phy_addr, size = 1):
+        return self.addr is not None and phy_addr >= self.phy_addr and phy_addr + size <= self.phy_addr + self.size
+
+    def read(self, offset, size):
+        return bytes(self.view[offset:offset+size])
+
+    def read_u4(self, offset):
+        return ctypes.c_uint32.from_address(self.addr + offset).value
+
+    def read_u8(self, offset):
+        return ctypes.c_uint64.from_address(self.addr + offset).value
+
+    def write_u4(self, offset, value):
+        ctypes.c_uint32.from_address(self.addr + offset).value = value & 0xFFFFFFFF
         return True
-    return False
 
-    
\ No newline at end of file
+    def close(self):
+        if self.addr is None:
+            return
+        self.view.release()
+        self.view = None
+        self.addr = None
+        phymem_unmap(self.phy_addr, self.size)
+
+_phymem_windows = [ ]
+_phymem_windows_enabled = True
+
+# disabled during IOCTL capture (memory accesses through window are not visible in trace)
+def set_phymem_windows_enabled(enabled):
+    global _phymem_windows_enabled
+    prev = _phymem_windows_enabled
+    _phymem_windows_enabled = enabled
+    return prev
+
+def is_phymem_windows_enabled():
+    return _phymem_windows_enabled
+
+# return PhyMemWindow or None (mapping is not supported by backend)
+def phymem_map_window(phy_addr, size):
+    if not _phymem_windows_enabled:
+        return None
+    try:
+        win = PhyMemWindow(phy_addr, size)
+    except (RuntimeError, NotImplementedError):
+        return None
+    _phymem_windows.append(win)
+    return win
+
+def phymem_windows_close():
+    global _phymem_windows
+    for win in _phymem_windows:
+        try:
+            win.close()
+        except Exception:
+            pass
+    _phymem_windows = [ ]
+
+atexit.register(phymem_windows_close)
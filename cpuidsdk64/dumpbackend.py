@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import json
+import mmap
+
+__author__ = 'remittor'
+
+from .win32 import *
+from .simbackend import SimBackend, SimPciDevice, SIM_MCHBAR_BASE
+
+# Offline backend: hardware state is taken from dump files, driver is not used at all.
+#   MCHBAR:      raw dump of MCHBAR (file is memory mapped, so only pages used by decoders are loaded)
+#   PCI config:  snapshot of config space  { "BB:DD.F": "hex" }  (host bridge 0:0.0 is created if absent)
+#   CPU:         cpu_id / stepping  (CPUID is emulated)
+# Dump set is described by JSON file (paths are relative to this file):
+#   { "cpu_id": "0x06B7", "stepping": 1, "mchbar": "pc1.dat", "mchbar_base": "0xFEDC0000", "pci": { "00:00.0": "8680..." } }
+# Usage:
+#   from cpuidsdk64.dumpbackend import iter_dump_sets
+#   for dump in iter_dump_sets([ 'dumps/' ]):      # dumps are opened one by one
+#       info = memory.get_mem_info_offline(dump)
+
+class DumpBackend(SimBackend):
+    name = 'dump'
+    offline = True
+
+    def __init__(self, mchbar, cpu_id, stepping = 0, cpu_name = None, pci = None, mchbar_base = None, board = None):
+        SimBackend.__init__(self, cpu_id, stepping, cpu_name, default = False)
+        self.mchbar_path = None
+        self.mchbar_file = None
+        if isinstance(mchbar, str):
+            self.mchbar_path = mchbar
+            self.mchbar_file = open(mchbar, 'rb')
+            self.mchbar = mmap.mmap(self.mchbar_file.fileno(), 0, access = mmap.ACCESS_READ)
+        else:
+            self.mchbar = mchbar
+        for addr, data in (pci or { }).items():
+            bus, dev, fun = parse_pci_addr(addr) if isinstance(addr, str) else addr
+            if isinstance(data, str):
+                data = bytes.fromhex(data)
+            pdev = SimPciDevice(0xFFFF, 0xFFFF, 0, 0, size = max(0x100, len(data)))
+            pdev.cfg[0:len(data)] = data
+            self.pci[(bus, dev, fun)] = pdev
+        host = self.pci.get((0, 0, 0), None)
+        if host is None:
+            host = self.pci[(0, 0, 0)] = SimPciDevice(0x8086, 0, 0x06, 0x00, size = 0x100)
+            host.set_u8(0x48, (mchbar_base if mchbar_base else SIM_MCHBAR_BASE) | 1)   # MCHBAR
+        if mchbar_base is None:
+            mchbar_base = int.from_bytes(host.read(0x48, 8), 'little') & ~1
+        self.mchbar_base = mchbar_base
+        self.mem.regions.append( [ mchbar_base, self.mchbar ] )
+        self.board = board if board else { 'manufacturer': '', 'product': '' }
+
+    def __repr__(self):
+        return f'<DumpBackend:{self.mchbar_path}:{self.cpu_id:04X}>'
+
+    def close(self):
+        self.mem.regions = [ ]
+        if self.mchbar_file:
+            self.mchbar.close()
+            self.mchbar_file.close()
+            self.mchbar_file = None
+        self.mchbar = None
+
+    # dumps are never modified (mailboxes are not available)
+    def phymem_write(self, addr, data):
+        return False
+
+    def phymem_map(self, phy_addr, size):
+        return None
+
+    def msr_write(self, reg, val_HI, val_LO):
+        return False
+
+    def msr_oc_mailbox(self, cmd, data):
+        return None
+
+def parse_pci_addr(addr):
+    bus, devfun = addr.split(':')[-2:]
+    dev, fun = devfun.split('.')
+    return int(bus, 16), int(dev, 16), int(fun, 16)
+
+def _to_int(value):
+    return int(value, 0) if isinstance(value, str) else value
+
+def load_dump_set(filename):
+    with open(filename, 'r', encoding = 'utf-8') as file:
+        desc = json.load(file)
+    mchbar = os.path.join(os.path.dirname(os.path.abspath(filename)), desc['mchbar'])
+    mchbar_base = _to_int(desc.get('mchbar_base', None))
+    return DumpBackend(mchbar, _to_int(desc['cpu_id']), _to_int(desc.get('stepping', 0)), desc.get('cpu_name', None),
+                       pci = desc.get('pci', None), mchbar_base = mchbar_base, board = desc.get('board', None))
+
+def save_dump_set(filename, mchbar, cpu_id, stepping = 0, cpu_name = None, pci = None, mchbar_base = None, board = None):
+    desc = { }
+    desc['cpu_id'] = f'0x{cpu_id:04X}'
+    desc['stepping'] = stepping
+    if cpu_name:
+        desc['cpu_name'] = cpu_name
+    desc['mchbar'] = os.path.relpath(mchbar, os.path.dirname(os.path.abspath(filename)))
+    if mchbar_base is not None:
+        desc['mchbar_base'] = f'0x{mchbar_base:X}'
+    desc['pci'] = { }
+    for addr, data in (pci or { }).items():
+        if not isinstance(addr, str):
+            addr = '%02X:%02X.%X' % addr
+        desc['pci'][addr] = bytes(data).hex()
+    if board:
+        desc['board'] = board
+    with open(filename, 'w', encoding = 'utf-8') as file:
+        json.dump(desc, file, indent = 4)
+    return desc
+
+# generator of paths of dump set JSON files for list of files and/or directories
+def find_dump_sets(paths):
+    if isinstance(paths, str):
+        paths = [ paths ]
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted([ os.path.join(path, fn) for fn in os.listdir(path) if fn.lower().endswith('.json') ])
+        else:
+            yield path
+
+# generator of DumpBackend objects for list of JSON files and/or directories (each dump is closed after use)
+def iter_dump_sets(paths):
+    for fn in find_dump_sets(paths):
+        dump = load_dump_set(fn)
+        try:
+            yield dump
+        finally:
+            dump.close()
@@ -15,7 +15,7 @@ from ctypes import CFUNCTYPE
 __author__ = 'remittor'
 
 from cpuidsdk64 import *
-from cpuidsdk64 import get_objptr, _set_objptr
+from cpuidsdk64 import get_objptr, _set_objptr, _sdk
 from cpuidsdk64 import _get_drv, _set_drv
 from cpuidsdk64 import _init_sdk_dll
 
@@ -32,8 +32,7 @@ def CreateInstance(verbose = 0):
     func_get_ver = get_sdkfunc('GetDLLVersion')
     if not func_get_ver['addr']:
         _init_sdk_dll(verbose)
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPVOID))
+    func = _sdk.CreateInstance
     ptr = func()
     if not ptr:
         raise RuntimeError(f'Cannot create CPUIDSDK object')
@@ -44,18 +43,23 @@ def CreateInstance(verbose = 0):
 
 def DestroyInstance():
     objptr = get_objptr(check = False)
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID))
+    func = _sdk.DestroyInstance
     objptr = get_objptr()
     func(objptr)
     _set_objptr(None)
 
 def SdkInit(cfg = None, verbose = 0):
     global _sdk_base_dir
+    if os.name != 'nt':
+        # CPUIDSDK is not available, hardware is accessed through Linux kernel interfaces
+        from .linuxbackend import LinuxBackend
+        drv = LinuxBackend()
+        _set_drv(drv)
+        return drv
     objptr = get_objptr(check = False)
     if not objptr:
         CreateInstance(verbose = verbose)
-    func = get_sdk_func('SdkInit', CFUNCTYPE(BOOL, LPVOID, LPCSTR, LPCSTR, INT, LPINT, LPINT))
+    func = _sdk.SdkInit
     objptr = get_objptr()
     szDllPath = None  # for using current directory
     szDllFilename = b'cpuidsdk64.dll\0'
@@ -83,7 +87,16 @@ def SdkInit(cfg = None, verbose = 0):
     drv = CreateFileA(drv_obj_path, GENERIC_READ, FILE_SHARE_READ, OPEN_EXISTING, 0)    
     if verbose:
         print(f'driver handle =', drv)
-    _set_drv(drv)
+    from .drvfunc import CpuzBackend
+    _set_drv(CpuzBackend(drv))
+    trace_fn = os.environ.get('CPUIDSDK_TRACE', None)
+    if trace_fn:
+        from .iotrace import start_capture
+        start_capture(trace_fn)
+    stats_fn = os.environ.get('CPUIDSDK_STATS', None)
+    if stats_fn:
+        from .iostats import enable_stats
+        enable_stats(dump_at_exit = True if stats_fn == '1' else stats_fn)
     return drv
 
 def SdkClose():
@@ -94,19 +107,17 @@ def SdkClose():
         except Exception:
             pass
         _set_drv(None)
-    func = get_sdk_func('SdkClose', CFUNCTYPE(None, LPVOID))
+    func = _sdk.SdkClose
     objptr = get_objptr()
     func(objptr)
 
 def RefreshInformation():
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.RefreshInformation
     objptr = get_objptr()
     return func(objptr)
 
 def GetDLLVersion():
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID, LPINT))
+    func = _sdk.GetDLLVersion
     objptr = get_objptr()
     version = INT(0)
     func(objptr, byref(version))
@@ -126,68 +137,57 @@ atexit.register(SdkCleanup)
 #################################################/
 
 def GetNbProcessors():
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetNbProcessors
     objptr = get_objptr()
     return func(objptr)
 
 def GetProcessorFamily(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorFamily
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorExtendedFamily(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorExtendedFamily
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorModel(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorModel
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorExtendedModel(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorExtendedModel
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorSteppingID(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorSteppingID
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorCoreCount(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorCoreCount
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorThreadCount(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT))
+    func = _sdk.GetProcessorThreadCount
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorCoreThreadCount(proc_index = 0, core_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT, INT))
+    func = _sdk.GetProcessorCoreThreadCount
     objptr = get_objptr()
     return func(objptr, proc_index, core_index)
 
 def GetProcessorThreadAPICID(proc_index = 0, core_index = 0, thread_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID, INT, INT, INT))
+    func = _sdk.GetProcessorThreadAPICID
     objptr = get_objptr()
     return func(objptr, proc_index, core_index, thread_index)
 
 def GetProcessorName(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID, INT))
+    func = _sdk.GetProcessorName
     objptr = get_objptr()
     buf = func(objptr, proc_index)
     if not buf:
@@ -197,8 +197,7 @@ def GetProcessorName(proc_index = 0):
     return pname
 
 def GetProcessorCodeName(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID, INT))
+    func = _sdk.GetProcessorCodeName
     objptr = get_objptr()
     buf = func(objptr, proc_index)
     if not buf:
@@ -208,8 +207,7 @@ def GetProcessorCodeName(proc_index = 0):
     return pname
 
 def GetProcessorPackage(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID, INT))
+    func = _sdk.GetProcessorPackage
     objptr = get_objptr()
     buf = func(objptr, proc_index)
     if not buf:
@@ -219,8 +217,7 @@ def GetProcessorPackage(proc_index = 0):
     return pname
 
 def GetProcessorSpecification(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID, INT))
+    func = _sdk.GetProcessorSpecification
     objptr = get_objptr()
     buf = func(objptr, proc_index)
     if not buf:
@@ -230,8 +227,7 @@ def GetProcessorSpecification(proc_index = 0):
     return pname
 
 def GetProcessorStepping(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID, INT))
+    func = _sdk.GetProcessorStepping
     objptr = get_objptr()
     buf = func(objptr, proc_index)
     if not buf:
@@ -241,72 +237,61 @@ def GetProcessorStepping(proc_index = 0):
     return pname
 
 def GetProcessorTDP(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.GetProcessorTDP
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_EA5DD4BB(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
-    #print('%08X' % get_sdkfunc(fname)['fid'])
+    func = _sdk.proc_EA5DD4BB
+    #print('%08X' % get_sdkfunc('proc_EA5DD4BB')['fid'])
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_D3B9A773(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_D3B9A773
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def IsProcessorInstructionSetAvailable(proc_index = 0, iset = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(UINT64, LPVOID, INT, INT))
+    func = _sdk.IsProcessorInstructionSetAvailable
     objptr = get_objptr()
     rc = func(objptr, proc_index, iset)
     #print('%X' % rc)
     return True if rc == 1 else False
 
 def proc_71CAE395(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_71CAE395
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_09141228(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_09141228
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_7862F0C5(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_7862F0C5
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_D15DA2BB(proc_index = 0):
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_D15DA2BB
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 # ?????????????
 def proc_D1FBA3F7(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_D1FBA3F7
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_B85B70B6(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.proc_B85B70B6
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def proc_578EAF1D(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(UINT64, LPVOID, INT))
+    func = _sdk.proc_578EAF1D
     objptr = get_objptr()
     rc = func(objptr, proc_index)
     return rc
@@ -350,15 +335,13 @@ def GetBusFrequency():
 '''
 
 def GetProcessorMaxCacheLevel(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(UINT64, LPVOID, INT))
+    func = _sdk.GetProcessorMaxCacheLevel
     objptr = get_objptr()
     rc = func(objptr, proc_index)
     return rc
 
 def GetProcessorCacheParameters(proc_index = 0, cache_level = 0, cache_type = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID, INT, INT, INT, LPINT, LPINT))
+    func = _sdk.GetProcessorCacheParameters
     objptr = get_objptr()
     NbCaches = INT(-1)
     size = INT(-1)
@@ -366,8 +349,7 @@ def GetProcessorCacheParameters(proc_index = 0, cache_level = 0, cache_type = 0)
     return (NbCaches.value, size.value)
 
 def GetProcessorExtendedCacheParameters(proc_index = 0, cache_level = 0, cache_type = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID, INT, INT, INT, LPINT, LPINT))
+    func = _sdk.GetProcessorExtendedCacheParameters
     objptr = get_objptr()
     associativity = INT(-1)
     line_size = INT(-1)
@@ -375,8 +357,7 @@ def GetProcessorExtendedCacheParameters(proc_index = 0, cache_level = 0, cache_t
     return (associativity.value, line_size.value)
 
 def GetHyperThreadingStatus(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID, INT, LPINT, LPINT))
+    func = _sdk.GetHyperThreadingStatus
     objptr = get_objptr()
     supported = INT(-1)
     enabled = INT(-1)
@@ -384,8 +365,7 @@ def GetHyperThreadingStatus(proc_index = 0):
     return (supported.value, enabled.value)
 
 def GetVirtualTechnologyStatus(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(None, LPVOID, INT, LPINT, LPINT))
+    func = _sdk.GetVirtualTechnologyStatus
     objptr = get_objptr()
     supported = INT(-1)
     enabled = INT(-1)
@@ -393,20 +373,17 @@ def GetVirtualTechnologyStatus(proc_index = 0):
     return (supported.value, enabled.value)
 
 def GetProcessorID(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(UINT64, LPVOID, INT))
+    func = _sdk.GetProcessorID
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetProcessorVoltage(proc_index = 0): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID, INT))
+    func = _sdk.GetProcessorVoltage
     objptr = get_objptr()
     return func(objptr, proc_index)
 
 def GetNorthBridgeVendor(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID))
+    func = _sdk.GetNorthBridgeVendor
     objptr = get_objptr()
     buf = func(objptr)
     if not buf:
@@ -416,74 +393,62 @@ def GetNorthBridgeVendor():
     return pname
 
 def GetMemoryType(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryType
     objptr = get_objptr()
     return func(objptr)
     
 def GetMemorySize(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemorySize
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryNumberOfChannels(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryNumberOfChannels
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryClockFrequency(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID))
+    func = _sdk.GetMemoryClockFrequency
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryCASLatency(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID))
+    func = _sdk.GetMemoryCASLatency
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryRAStoCASDelay(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID))
+    func = _sdk.GetMemoryRAStoCASDelay
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryRASPrecharge(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryRASPrecharge
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryTRAS(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryTRAS
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryTRC(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryTRC
     objptr = get_objptr()
     return func(objptr)
 
 def GetMemoryCommandRate(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+    func = _sdk.GetMemoryCommandRate
     objptr = get_objptr()
     return func(objptr)
 
 def ComputeMemoryFrequency(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(FLOAT, LPVOID))
+    func = _sdk.ComputeMemoryFrequency
     objptr = get_objptr()
     return func(objptr)
 
 def GetBIOSVendor(): 
-    fname = inspect.currentframe().f_code.co_name
-    func = get_sdk_func(fname, CFUNCTYPE(LPSTR, LPVOID))
+    func = _sdk.GetBIOSVendor
     objptr = get_objptr()
     buf = func(objptr)
     if not buf:
@@ -492,3 +457,36 @@ def GetBIOSVendor():
     SysFreeString(buf)
     return pname
 
+
+# micro-benchmark of SDK call dispatching (SDK function is replaced with stub):
+#   python -m cpuidsdk64.functions
+if __name__ == "__main__":
+    import time
+    from cpuidsdk64.common import _sdk_func_table
+
+    def _stub(objptr):
+        return 0
+
+    def _old_get_sdk_func(fname, ftype):
+        for finfo in _sdk_func_table:
+            if finfo['name'] == fname:
+                return finfo['func']
+
+    def GetMemoryCommandRate_old():
+        fname = inspect.currentframe().f_code.co_name[:-4]
+        func = _old_get_sdk_func(fname, CFUNCTYPE(INT, LPVOID))
+        objptr = get_objptr()
+        return func(objptr)
+
+    prev_objptr = get_objptr(check = False)
+    _set_objptr(1)
+    get_sdkfunc('GetMemoryCommandRate')['func'] = _stub
+    setattr(_sdk, 'GetMemoryCommandRate', _stub)
+    count = 100000
+    for name, func in [ ('old', GetMemoryCommandRate_old), ('new', GetMemoryCommandRate) ]:
+        start_time = time.perf_counter()
+        for i in range(count):
+            func()
+        elapsed = time.perf_counter() - start_time
+        print(f'{name}: {elapsed * 1000000000 / count:8.1f} ns per call')
+    _set_objptr(prev_objptr)
@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import copy
+
+__author__ = 'remittor'
+
+# Tiered cache of hardware data (used by memory.get_mem_info, memspd.get_mem_spd_all):
+#   HW_STATIC : not changed while machine is running (CPUID, board name, microcode, VR topology, IccMax, SPD EEPROM)
+#   HW_SEMI   : changed only by BIOS or OC tools (MC timings, MRS), re-read on demand: hw_cache_clear(HW_SEMI)
+#   volatile data (temperatures, voltages, energy counters, BCLK) is never cached
+# hw_cache_clear() drops all tiers (and snapshot of PCI config), so next request re-reads everything.
+# Cache is cleared by set_backend().
+# Modules with own caches of static data (e.g. opened files of sysfs) register function by hw_cache_add_hook.
+
+HW_STATIC = 'static'
+HW_SEMI   = 'semi'
+
+class HwDataCache():
+    def __init__(self):
+        self.cache = { HW_STATIC: { }, HW_SEMI: { } }    # tier => { key => value }
+
+    # func = None : return cached value or None  (result of func is not cached if it is None)
+    def get(self, tier, key, func = None, *args, **kwargs):
+        tcache = self.cache[tier]
+        if key not in tcache:
+            if func is None:
+                return None
+            value = func(*args, **kwargs)
+            if value is None:
+                return None
+            tcache[key] = value
+        return copy.deepcopy(tcache[key])    # callers are free to modify result
+
+    def set(self, tier, key, value):
+        self.cache[tier][key] = copy.deepcopy(value)
+
+    def invalidate(self, tier = None):
+        for name, tcache in self.cache.items():
+            if tier is None or name == tier:
+                tcache.clear()
+
+hw_cache = HwDataCache()
+hw_cache_hooks = [ ]   # functions called by hw_cache_clear() for static tier
+
+def hw_cache_get(tier, key, func = None, *args, **kwargs):
+    return hw_cache.get(tier, key, func, *args, **kwargs)
+
+def hw_cache_set(tier, key, value):
+    hw_cache.set(tier, key, value)
+
+def hw_cache_add_hook(func):
+    if func not in hw_cache_hooks:
+        hw_cache_hooks.append(func)
+
+def hw_cache_clear(tier = None):
+    from .drvfunc import pci_cfg_cache_clear
+    hw_cache.invalidate(tier)
+    if tier is None or tier == HW_STATIC:
+        pci_cfg_cache_clear()
+        for func in hw_cache_hooks:
+            func()
@@ -0,0 +1,131 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import json
+import atexit
+
+__author__ = 'remittor'
+
+from .common import *
+from .win32 import *
+
+# Statistics of driver IOCTL traffic: call counts, latency histograms and bytes moved per IOCTL function.
+# Usage:
+#   iostats.enable_stats()          # or set env var CPUIDSDK_STATS=1 (or =filename.json) before SdkInit()
+#   ...
+#   print(iostats.get_stats())
+#   iostats.dump_stats()
+
+HIST_SIZE = 32    # bucket N contains latencies in range [ 2^(N-1) ... 2^N ) ns
+
+# IOCTLs that send data from user buffer into driver (the rest of them fill user buffer)
+_xbuf_input = { CPUZ_PCI_CFG_WRITE }
+
+class IoctlStats():
+    __slots__ = ( 'ioctl', 'count', 'failed', 'elapsed_ns', 'max_ns', 'bytes_in', 'bytes_out', 'hist' )
+
+    def __init__(self, ioctl):
+        self.ioctl = ioctl
+        self.count = 0
+        self.failed = 0
+        self.elapsed_ns = 0
+        self.max_ns = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.hist = [ 0 ] * HIST_SIZE
+
+    @property
+    def name(self):
+        func_num = (self.ioctl >> 2) & 0xFFF
+        return CPUZ_FUNC_NAME.get(func_num, f'0x{func_num:03X}')
+
+    def as_dict(self):
+        hist = { }
+        for idx, cnt in enumerate(self.hist):
+            if cnt:
+                hist[1 << idx] = cnt    # upper bound of bucket in ns
+        return {
+            'count': self.count,
+            'failed': self.failed,
+            'elapsed_ns': self.elapsed_ns,
+            'avg_ns': self.elapsed_ns // self.count if self.count else 0,
+            'max_ns': self.max_ns,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'hist': hist,
+        }
+
+_stats = { }    # ioctl => IoctlStats
+_enabled = False
+_dump_fn = None
+
+def _stats_hook(ioctl, inbuf, outbuf, xbuf, elapsed_ns):
+    st = _stats.get(ioctl, None)
+    if st is None:
+        st = IoctlStats(ioctl)
+        _stats[ioctl] = st
+    st.count += 1
+    st.elapsed_ns += elapsed_ns
+    if elapsed_ns > st.max_ns:
+        st.max_ns = elapsed_ns
+    st.hist[min(elapsed_ns.bit_length(), HIST_SIZE - 1)] += 1
+    if inbuf:
+        st.bytes_in += len(inbuf)
+    if outbuf is False or outbuf is None:
+        st.failed += 1
+    else:
+        st.bytes_out += len(outbuf)
+    if xbuf:
+        if ((ioctl >> 2) & 0xFFF) in _xbuf_input:
+            st.bytes_in += len(xbuf)
+        else:
+            st.bytes_out += len(xbuf)
+
+def enable_stats(dump_at_exit = False):
+    global _enabled, _dump_fn
+    add_ioctl_hook(_stats_hook)
+    _enabled = True
+    if dump_at_exit:
+        _dump_fn = dump_at_exit if isinstance(dump_at_exit, str) else ''
+
+def disable_stats():
+    global _enabled
+    remove_ioctl_hook(_stats_hook)
+    _enabled = False
+
+def is_stats_enabled():
+    return _enabled
+
+def reset_stats():
+    _stats.clear()
+
+def get_stats():
+    out = { }
+    for st in sorted(_stats.values(), key = lambda x: -x.elapsed_ns):
+        out[st.name] = st.as_dict()
+    return out
+
+def dump_stats(filename = None, file = None):
+    stats = get_stats()
+    if filename:
+        with open(filename, 'w') as fp:
+            json.dump(stats, fp, indent = 2)
+        return
+    file = file if file else sys.stdout
+    total_ns = 0
+    for name, item in stats.items():
+        total_ns += item['elapsed_ns']
+        print(f'{name:24} count = {item["count"]:7}  time = {item["elapsed_ns"] / 1000000:10.3f} ms  '
+              f'avg = {item["avg_ns"] / 1000:8.2f} us  max = {item["max_ns"] / 1000:8.2f} us  '
+              f'in = {item["bytes_in"]:8}  out = {item["bytes_out"]:8}', file = file)
+    print(f'total time = {total_ns / 1000000:.3f} ms', file = file)
+
+def _dump_at_exit():
+    if _dump_fn is None or not _stats:
+        return
+    dump_stats(_dump_fn if _dump_fn else None)
+
+atexit.register(_dump_at_exit)
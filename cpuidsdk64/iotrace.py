@@ -0,0 +1,315 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import time
+import json
+import atexit
+import struct
+
+__author__ = 'remittor'
+
+from .common import *
+from .win32 import *
+from .drvfunc import IOCTL, CpuzBackend, set_phymem_windows_enabled
+
+# Capture of driver IOCTL traffic into binary trace file and replay of it without driver.
+# Capture:
+#   iotrace.start_capture('refresh.trace')     # or set env var CPUIDSDK_TRACE=refresh.trace before SdkInit()
+# Replay:
+#   cpuidsdk64.set_backend(iotrace.ReplayBackend('refresh.trace'))   # before import of cpuinfo / memory
+# Summary:
+#   python -m cpuidsdk64.iotrace refresh.trace
+
+TRACE_MAGIC   = b'PYHWTRC\0'
+TRACE_VERSION = 1
+
+REC_IOCTL = 1
+REC_META  = 2   # json dict
+REC_CPUID = 3   # leaf, subleaf, eax, ebx, ecx, edx
+
+REC_FLAG_FAILED = 0x01   # DeviceIoControl returned False
+
+_hdr_fmt = struct.Struct('<8sI')
+_rec_fmt = struct.Struct('<BBIHHHQ')   # type, flags, ioctl, inbuf_len, outbuf_len, xbuf_len, elapsed_ns
+_cpuid_fmt = struct.Struct('<IIIIII')
+
+# position of data pointer (8 bytes) inside inbuf
+_ptr_offset = {
+    CPUZ_PCI_CFG_READ:  20,
+    CPUZ_PCI_CFG_WRITE: 20,
+    CPUZ_PHYMEM_READ:   12,
+}
+
+CPUID_LEAVES = [ 0, 1, 0x80000000, 0x80000002, 0x80000003, 0x80000004 ]
+
+def ioctl_func_num(ioctl):
+    return (ioctl >> 2) & 0xFFF
+
+def ioctl_func_name(ioctl):
+    func_num = ioctl_func_num(ioctl)
+    return CPUZ_FUNC_NAME.get(func_num, f'0x{func_num:03X}')
+
+# pointers are different on every run, so they are replaced with zeros
+def mask_inbuf(ioctl, inbuf):
+    if not inbuf:
+        return b''
+    pos = _ptr_offset.get(ioctl_func_num(ioctl), None)
+    if pos is None or len(inbuf) < pos + 8:
+        return bytes(inbuf)
+    return bytes(inbuf[:pos]) + b'\0' * 8 + bytes(inbuf[pos+8:])
+
+class TraceRecord():
+    __slots__ = ( 'ioctl', 'flags', 'inbuf', 'outbuf', 'xbuf', 'elapsed_ns' )
+
+    def __init__(self, ioctl, flags, inbuf, outbuf, xbuf, elapsed_ns):
+        self.ioctl = ioctl
+        self.flags = flags
+        self.inbuf = inbuf
+        self.outbuf = outbuf
+        self.xbuf = xbuf
+        self.elapsed_ns = elapsed_ns
+
+    @property
+    def key(self):
+        return (self.ioctl, self.inbuf)
+
+    def __repr__(self):
+        return f'<{ioctl_func_name(self.ioctl)}: in={self.inbuf.hex()} out={self.outbuf.hex()} x={len(self.xbuf)} {self.elapsed_ns}ns>'
+
+class TraceWriter():
+    def __init__(self, filename):
+        self.filename = filename
+        self.count = 0
+        self.file = open(filename, 'wb')
+        self.file.write(_hdr_fmt.pack(TRACE_MAGIC, TRACE_VERSION))
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        self.file = None
+
+    def _write(self, rtype, flags, ioctl, inbuf, outbuf, xbuf, elapsed_ns):
+        self.file.write(_rec_fmt.pack(rtype, flags, ioctl, len(inbuf), len(outbuf), len(xbuf), elapsed_ns))
+        self.file.write(inbuf)
+        self.file.write(outbuf)
+        self.file.write(xbuf)
+
+    def write_meta(self, meta: dict):
+        data = json.dumps(meta).encode('utf-8')
+        self._write(REC_META, 0, 0, data, b'', b'', 0)
+
+    def write_cpuid(self, leaf, subleaf, regs):
+        data = _cpuid_fmt.pack(leaf, subleaf, *regs)
+        self._write(REC_CPUID, 0, 0, data, b'', b'', 0)
+
+    def write_ioctl(self, ioctl, inbuf, outbuf, xbuf, elapsed_ns):
+        if not self.file:
+            return
+        flags = 0
+        if outbuf is False or outbuf is None:
+            flags |= REC_FLAG_FAILED
+            outbuf = b''
+        inbuf = mask_inbuf(ioctl, inbuf)
+        xbuf = bytes(xbuf) if xbuf else b''
+        self._write(REC_IOCTL, flags, ioctl, inbuf, bytes(outbuf), xbuf, elapsed_ns)
+        self.count += 1
+
+def read_trace(filename):
+    with open(filename, 'rb') as file:
+        magic, version = _hdr_fmt.unpack(file.read(_hdr_fmt.size))
+        if magic != TRACE_MAGIC:
+            raise RuntimeError(f'ERROR: File "{filename}" is not IOCTL trace')
+        if version != TRACE_VERSION:
+            raise RuntimeError(f'ERROR: IOCTL trace version {version} not supported')
+        while True:
+            hdr = file.read(_rec_fmt.size)
+            if len(hdr) < _rec_fmt.size:
+                break
+            rtype, flags, ioctl, inlen, outlen, xlen, elapsed_ns = _rec_fmt.unpack(hdr)
+            inbuf = file.read(inlen)
+            outbuf = file.read(outlen)
+            xbuf = file.read(xlen)
+            if rtype == REC_IOCTL:
+                yield TraceRecord(ioctl, flags, inbuf, outbuf, xbuf, elapsed_ns)
+            elif rtype == REC_META:
+                yield json.loads(inbuf.decode('utf-8'))
+            elif rtype == REC_CPUID:
+                yield _cpuid_fmt.unpack(inbuf)
+
+class TraceReader():
+    def __init__(self, filename):
+        self.filename = filename
+        self.meta = { }
+        self.cpuid = { }    # (leaf, subleaf) => (eax, ebx, ecx, edx)
+        self.records = [ ]
+        for rec in read_trace(filename):
+            if isinstance(rec, TraceRecord):
+                self.records.append(rec)
+            elif isinstance(rec, dict):
+                self.meta.update(rec)
+            else:
+                self.cpuid[(rec[0], rec[1])] = tuple(rec[2:])
+
+    def summary(self):
+        out = { }
+        for rec in self.records:
+            name = ioctl_func_name(rec.ioctl)
+            if name not in out:
+                out[name] = { 'count': 0, 'elapsed_ns': 0, 'bytes_in': 0, 'bytes_out': 0 }
+            item = out[name]
+            item['count'] += 1
+            item['elapsed_ns'] += rec.elapsed_ns
+            item['bytes_in'] += len(rec.inbuf)
+            item['bytes_out'] += len(rec.outbuf) + len(rec.xbuf)
+        return out
+
+#######################################################
+#  Capture
+#######################################################
+
+_writer = None
+_windows_enabled = True
+
+def _native_cpuid():
+    try:
+        from cpuid import CPUID
+        return CPUID()
+    except Exception:
+        return None
+
+def start_capture(filename, cpuid_func = None, meta = None):
+    global _writer, _windows_enabled
+    stop_capture()
+    writer = TraceWriter(filename)
+    info = { 'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'platform': sys.platform }
+    if meta:
+        info.update(meta)
+    writer.write_meta(info)
+    if cpuid_func is None:
+        cpuid_func = _native_cpuid()
+    if cpuid_func:
+        for leaf in CPUID_LEAVES:
+            writer.write_cpuid(leaf, 0, tuple(cpuid_func(leaf, 0)))
+    _writer = writer
+    _windows_enabled = set_phymem_windows_enabled(False)   # all memory reads must be visible in trace
+    add_ioctl_hook(writer.write_ioctl)
+    return writer
+
+def stop_capture():
+    global _writer
+    if not _writer:
+        return 0
+    remove_ioctl_hook(_writer.write_ioctl)
+    set_phymem_windows_enabled(_windows_enabled)
+    count = _writer.count
+    _writer.close()
+    _writer = None
+    return count
+
+atexit.register(stop_capture)
+
+#######################################################
+#  Replay
+#######################################################
+
+# channel without driver: responses are taken from trace
+class ReplayChannel(DeviceIoChannel):
+    def __init__(self, backend):
+        super().__init__(None)
+        self.backend = backend
+
+    def call(self, ioctl, insize, outsize, xsize = 0):
+        rec = self.backend.replay(ioctl, self.inview[:insize])
+        if rec.xbuf and xsize > 0:
+            self.dataview[:len(rec.xbuf)] = rec.xbuf
+        if rec.flags & REC_FLAG_FAILED:
+            return False
+        return memoryview(rec.outbuf)
+
+class ReplayBackend(CpuzBackend):
+    name = 'replay'
+
+    # mode = 'order' : records are served strictly in the captured order
+    # mode = 'key'   : records are served by (ioctl, inbuf), the last response is repeated for polling loops
+    # latency = True : emulate the captured duration of every IOCTL
+    def __init__(self, filename, mode = 'order', latency = False):
+        super().__init__(None)
+        if mode not in [ 'order', 'key' ]:
+            raise ValueError(f'Incorrect replay mode "{mode}"')
+        trace = TraceReader(filename)
+        self.filename = filename
+        self.mode = mode
+        self.latency = latency
+        self.meta = trace.meta
+        self.cpuid_dict = trace.cpuid
+        self.records = trace.records
+        self.pos = 0
+        self.keyed = { }
+        for rec in self.records:
+            self.keyed.setdefault(rec.key, [ ]).append(rec)
+        self.keyed_pos = { }
+        self.count = 0
+        self.chan = ReplayChannel(self)
+
+    def cpuid(self, leaf, subleaf = 0):
+        return self.cpuid_dict.get((leaf, subleaf), None)
+
+    def rewind(self):
+        self.pos = 0
+        self.keyed_pos = { }
+        self.count = 0
+
+    def _next_record(self, ioctl, inbuf):
+        if self.mode == 'order':
+            if self.pos >= len(self.records):
+                raise RuntimeError(f'ERROR: replay: trace "{self.filename}" is over (record #{self.pos})')
+            rec = self.records[self.pos]
+            if rec.ioctl != ioctl or rec.inbuf != inbuf:
+                raise RuntimeError(f'ERROR: replay: unexpected {ioctl_func_name(ioctl)} (in = {inbuf.hex()}) at record #{self.pos}, expected {rec}')
+            self.pos += 1
+            return rec
+        key = (ioctl, inbuf)
+        rec_list = self.keyed.get(key, None)
+        if not rec_list:
+            raise RuntimeError(f'ERROR: replay: {ioctl_func_name(ioctl)} (in = {inbuf.hex()}) not found in trace')
+        idx = self.keyed_pos.get(key, 0)
+        self.keyed_pos[key] = idx + 1
+        return rec_list[min(idx, len(rec_list) - 1)]
+
+    # mapped address from trace is not valid for current process
+    def phymem_map(self, phy_addr, size):
+        return None
+
+    def phymem_unmap(self, phy_addr, size):
+        return False
+
+    def replay(self, ioctl, inbuf):
+        start_time = time.perf_counter_ns()
+        rec = self._next_record(ioctl, mask_inbuf(ioctl, inbuf))
+        self.count += 1
+        if self.latency:
+            while time.perf_counter_ns() - start_time < rec.elapsed_ns:
+                pass
+        return rec
+
+    def ioctl(self, func_num, inbuf, outsize, xbuf = None):
+        rec = self.replay(IOCTL(func_num), inbuf)
+        if rec.xbuf and xbuf is not None:
+            xbuf[0:len(rec.xbuf)] = rec.xbuf
+        if rec.flags & REC_FLAG_FAILED:
+            return False
+        return rec.outbuf
+
+
+if __name__ == "__main__":
+    trace = TraceReader(sys.argv[1])
+    print(f'meta = {trace.meta}')
+    print(f'records = {len(trace.records)}')
+    total_ns = 0
+    for name, item in sorted(trace.summary().items(), key = lambda x: -x[1]['elapsed_ns']):
+        total_ns += item['elapsed_ns']
+        print(f'{name:24} count = {item["count"]:7}  time = {item["elapsed_ns"] / 1000000:10.3f} ms  in = {item["bytes_in"]:8}  out = {item["bytes_out"]:8}')
+    print(f'total time = {total_ns / 1000000:.3f} ms')
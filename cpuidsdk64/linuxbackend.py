@@ -0,0 +1,341 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import stat
+import mmap
+import ctypes
+import concurrent.futures
+
+__author__ = 'remittor'
+
+from .win32 import *
+from .backend import HwBackend
+
+# Hardware access on Linux through kernel interfaces (root privileges required).
+#   PCI config space:  /sys/bus/pci/devices/DDDD:BB:DD.F/config
+#   Physical memory:   /dev/mem  (or dump file, that starts at physical address mem_base)
+#   MSR:               /dev/cpu/N/msr  (kernel module "msr")
+#   SMBus:             /dev/i2c-N  (kernel module "i2c-dev", adapters are listed in /sys/class/i2c-adapter)
+#   SPD EEPROM:        /sys/bus/i2c/devices/N-00AA/eeprom  (kernel drivers "spd5118" / "ee1004")
+#   DIMM temperature:  /sys/class/hwmon/hwmonN/temp1_input  (kernel driver "spd5118")
+# Usage:
+#   import cpuidsdk64
+#   from cpuidsdk64.linuxbackend import LinuxBackend
+#   cpuidsdk64.set_backend(LinuxBackend())       # or SdkInit() on Linux
+# All roots are configurable, so the backend can be used over a copy of the sysfs tree.
+
+SYSFS_PCI_ROOT = '/sys/bus/pci/devices'
+DEV_MEM_PATH = '/dev/mem'
+DEV_CPU_ROOT = '/dev/cpu'
+SYSFS_I2C_ROOT = '/sys/class/i2c-adapter'
+DEV_I2C_ROOT = '/dev'
+SYSFS_I2C_DEVICES_ROOT = '/sys/bus/i2c/devices'
+SYSFS_HWMON_ROOT = '/sys/class/hwmon'
+
+MEM_WINDOW_SIZE = 0x10000    # granularity of cached /dev/mem mappings (must be multiple of page size)
+
+class LinuxBackend(HwBackend):
+    name = 'linux'
+
+    def __init__(self, sysfs_pci_root = SYSFS_PCI_ROOT, pci_domain = 0, mem_path = DEV_MEM_PATH, mem_base = 0,
+                 msr_root = DEV_CPU_ROOT, msr_cpu = 0, i2c_sysfs_root = SYSFS_I2C_ROOT, i2c_dev_root = DEV_I2C_ROOT,
+                 spd_sysfs_root = SYSFS_I2C_DEVICES_ROOT, hwmon_root = SYSFS_HWMON_ROOT):
+        self.sysfs_pci_root = sysfs_pci_root
+        self.pci_domain = pci_domain
+        self.pci_fd = { }    # (bus, dev, fun) => fd  (None for absent device)
+        self.pci_bar = { }   # (bus, dev, fun, offset) => raw value of BAR register
+        self.mem_path = mem_path
+        self.mem_base = mem_base
+        self.mem_fd = None
+        self.mem_size = None     # size of dump file (None for /dev/mem)
+        self.mem_access = None
+        self.mem_win = { }       # (win_addr, win_size) => mmap
+        self.mem_maps = { }      # phy_addr => ( mmap, ctypes array ) created by phymem_map
+        self.msr_root = msr_root
+        self.msr_cpu = msr_cpu   # CPU for msr_read / msr_write
+        self.msr_fd = { }        # cpu => fd  (None if MSR is not accessible)
+        self.msr_pool = None
+        self.i2c_sysfs_root = i2c_sysfs_root   # used by smbus.I2cDev (see memspd.MemSmb)
+        self.i2c_dev_root = i2c_dev_root
+        self.spd_sysfs_root = spd_sysfs_root   # used by memspd.read_spd_sysfs
+        self.hwmon_root = hwmon_root           # used by memspd.get_dimm_temp
+
+    def close(self):
+        for fd in self.pci_fd.values():
+            if fd is not None:
+                os.close(fd)
+        self.pci_fd = { }
+        self.pci_bar = { }
+        for phy_addr in list(self.mem_maps.keys()):
+            self.phymem_unmap(phy_addr, 0)
+        for mm in self.mem_win.values():
+            try:
+                mm.close()
+            except BufferError:
+                pass    # memoryview returned by phymem_view is still alive
+        self.mem_win = { }
+        if self.mem_fd is not None:
+            os.close(self.mem_fd)
+            self.mem_fd = None
+        if self.msr_pool:
+            self.msr_pool.shutdown()
+            self.msr_pool = None
+        for fd in self.msr_fd.values():
+            if fd is not None:
+                os.close(fd)
+        self.msr_fd = { }
+
+    #######################################################
+    #  PCI config space
+    #######################################################
+
+    def pci_cfg_path(self, bus, dev, fun):
+        return os.path.join(self.sysfs_pci_root, f'{self.pci_domain:04x}:{bus:02x}:{dev:02x}.{fun:x}', 'config')
+
+    def _pci_open(self, bus, dev, fun):
+        key = (bus, dev, fun)
+        if key in self.pci_fd:
+            return self.pci_fd[key]
+        fn = self.pci_cfg_path(bus, dev, fun)
+        try:
+            fd = os.open(fn, os.O_RDWR)
+        except PermissionError:
+            fd = os.open(fn, os.O_RDONLY)
+        except FileNotFoundError:
+            fd = None
+        self.pci_fd[key] = fd
+        return fd
+
+    def pci_cfg_read(self, bus, dev, fun, offset, size):
+        fd = self._pci_open(bus, dev, fun)
+        if fd is None:
+            return b'\xFF' * size    # same as bus returns for absent device
+        data = os.pread(fd, size, offset)
+        if len(data) != size:
+            return None    # config space beyond 64 bytes is available only for root
+        return data
+
+    # return full config space (256 or 4096 bytes) by one syscall
+    def pci_cfg_read_all(self, bus, dev, fun):
+        fd = self._pci_open(bus, dev, fun)
+        if fd is None:
+            return None
+        return os.pread(fd, 0x1000, 0)
+
+    def pci_cfg_write(self, bus, dev, fun, offset, data):
+        fd = self._pci_open(bus, dev, fun)
+        if fd is None:
+            return False
+        self.pci_bar = { }
+        try:
+            return os.pwrite(fd, bytes(data), offset) == len(data)
+        except OSError:
+            return False
+
+    #######################################################
+    #  PHYS MEMORY
+    #######################################################
+
+    def _mem_open(self):
+        if self.mem_fd is not None:
+            return self.mem_fd
+        if stat.S_ISREG(os.stat(self.mem_path).st_mode):
+            # dump file is never modified, writes go to private copy-on-write pages
+            self.mem_fd = os.open(self.mem_path, os.O_RDONLY)
+            self.mem_size = os.fstat(self.mem_fd).st_size
+            self.mem_access = mmap.ACCESS_COPY
+            return self.mem_fd
+        try:
+            self.mem_fd = os.open(self.mem_path, os.O_RDWR | os.O_SYNC)
+            self.mem_access = mmap.ACCESS_WRITE
+        except PermissionError:
+            self.mem_fd = os.open(self.mem_path, os.O_RDONLY)
+            self.mem_access = mmap.ACCESS_READ
+        return self.mem_fd
+
+    # offset and size must be page aligned (offset is relative to mem_base)
+    def _mem_mmap(self, offset, size, access = None):
+        fd = self._mem_open()
+        if self.mem_size is not None:
+            if offset >= self.mem_size:
+                return None
+            size = min(size, self.mem_size - offset)
+        try:
+            return mmap.mmap(fd, size, access = access if access else self.mem_access, offset = offset)
+        except (OSError, ValueError):
+            return None
+
+    # return memoryview of physical memory (mapping is created once per aligned window)
+    def phymem_view(self, addr, size):
+        offset = addr - self.mem_base
+        if offset < 0:
+            return None
+        win_off = offset & ~(MEM_WINDOW_SIZE - 1)
+        win_end = (offset + size + MEM_WINDOW_SIZE - 1) & ~(MEM_WINDOW_SIZE - 1)
+        key = ( win_off, win_end - win_off )
+        mm = self.mem_win.get(key, None)
+        if mm is None:
+            mm = self._mem_mmap(win_off, win_end - win_off)
+            if mm is None:
+                return None
+            self.mem_win[key] = mm
+        pos = offset - win_off
+        if pos + size > len(mm):
+            return None
+        return memoryview(mm)[pos:pos+size]
+
+    def phymem_read(self, addr, size):
+        view = self.phymem_view(addr, size)
+        if view is None:
+            return None
+        return bytes(view)
+
+    def phymem_write(self, addr, data):
+        view = self.phymem_view(addr, len(data))
+        if view is None or view.readonly:
+            return False
+        view[:] = data
+        return True
+
+    def _pc_addr(self, bus, dev, fun, offset, addr_mask, addr_offset):
+        key = ( bus, dev, fun, offset )
+        base = self.pci_bar.get(key, None)
+        if base is None:
+            base = self.pci_cfg_read(bus, dev, fun, offset, 8)
+            if not base:
+                return None
+            base = int.from_bytes(base, 'little')
+            self.pci_bar[key] = base
+        base &= addr_mask
+        if not base:
+            return None
+        return base + addr_offset
+
+    def phymem_pc_read64(self, bus, dev, fun, offset, addr_mask, addr_offset):
+        addr = self._pc_addr(bus, dev, fun, offset, addr_mask, addr_offset)
+        if addr is None:
+            return None
+        view = self.phymem_view(addr, 8)
+        if view is None:
+            return None
+        if view.readonly:
+            return int.from_bytes(view, 'little')
+        return ctypes.c_uint64.from_buffer(view).value    # single 64-bit load
+
+    def phymem_pc_write32(self, bus, dev, fun, offset, addr_mask, addr_offset, value):
+        addr = self._pc_addr(bus, dev, fun, offset, addr_mask, addr_offset)
+        if addr is None:
+            return False
+        view = self.phymem_view(addr, 4)
+        if view is None or view.readonly:
+            return False
+        ctypes.c_uint32.from_buffer(view).value = value & 0xFFFFFFFF
+        return True
+
+    # return address of mapping in process address space (used by PhyMemWindow)
+    def phymem_map(self, phy_addr, size):
+        offset = phy_addr - self.mem_base
+        if offset < 0 or phy_addr in self.mem_maps:
+            return None
+        map_off = offset & ~(mmap.PAGESIZE - 1)
+        pos = offset - map_off
+        self._mem_open()
+        # ctypes can not refer to read-only mapping, so private copy-on-write pages are used for it
+        access = mmap.ACCESS_COPY if self.mem_access == mmap.ACCESS_READ else self.mem_access
+        mm = self._mem_mmap(map_off, (pos + size + mmap.PAGESIZE - 1) & ~(mmap.PAGESIZE - 1), access)
+        if mm is None:
+            return None
+        if pos + size > len(mm):
+            mm.close()
+            return None
+        buf = (ctypes.c_ubyte * len(mm)).from_buffer(mm)
+        self.mem_maps[phy_addr] = ( mm, buf )
+        return ctypes.addressof(buf) + pos
+
+    def phymem_unmap(self, phy_addr, size):
+        item = self.mem_maps.pop(phy_addr, None)
+        if item is None:
+            return False
+        mm, buf = item
+        del buf
+        mm.close()
+        return True
+
+    #######################################################
+    #  MSR
+    #######################################################
+
+    def cpu_list(self):
+        try:
+            names = os.listdir(self.msr_root)
+        except OSError:
+            return [ ]
+        return sorted([ int(name) for name in names if name.isdigit() ])
+
+    def _msr_open(self, cpu):
+        if cpu in self.msr_fd:
+            return self.msr_fd[cpu]
+        fn = os.path.join(self.msr_root, str(cpu), 'msr')
+        try:
+            fd = os.open(fn, os.O_RDWR)
+        except PermissionError:
+            fd = os.open(fn, os.O_RDONLY)
+        except FileNotFoundError:
+            fd = None
+        self.msr_fd[cpu] = fd
+        return fd
+
+    def msr_read_cpu(self, cpu, reg):
+        fd = self._msr_open(cpu)
+        if fd is None:
+            return None
+        try:
+            data = os.pread(fd, 8, reg)
+        except OSError:
+            return None    # EIO: MSR is not supported by CPU
+        if len(data) != 8:
+            return None
+        return int.from_bytes(data, 'little')
+
+    def msr_write_cpu(self, cpu, reg, value):
+        fd = self._msr_open(cpu)
+        if fd is None:
+            return False
+        try:
+            return os.pwrite(fd, value.to_bytes(8, 'little'), reg) == 8
+        except OSError:
+            return False
+
+    # return dict { cpu: { reg: value } } (every CPU is readed by separate thread)
+    def msr_read_all(self, regs, cpus = None):
+        cpus = self.cpu_list() if cpus is None else list(cpus)
+        regs = list(regs)
+        if not cpus:
+            return { }
+        if self.msr_pool is None:
+            self.msr_pool = concurrent.futures.ThreadPoolExecutor(max_workers = min(32, os.cpu_count() or 1))
+        def read_cpu(cpu):
+            return { reg: self.msr_read_cpu(cpu, reg) for reg in regs }
+        return dict(zip(cpus, self.msr_pool.map(read_cpu, cpus)))
+
+    def msr_read(self, reg):
+        return self.msr_read_cpu(self.msr_cpu, reg)
+
+    def msr_write(self, reg, val_HI, val_LO):
+        return self.msr_write_cpu(self.msr_cpu, reg, ((val_HI & 0xFFFFFFFF) << 32) | (val_LO & 0xFFFFFFFF))
+
+    # MSR_OC_MAILBOX: write { data, cmd } and wait for clearing of RUN_BUSY bit
+    def msr_oc_mailbox(self, cmd, data):
+        reg = 0x150
+        if not self.msr_write(reg, cmd, data):
+            return None
+        for tnum in range(0, 1000):
+            val = self.msr_read(reg)
+            if val is None:
+                return None
+            if (val & 0x8000000000000000) == 0:
+                return val >> 32, val & 0xFFFFFFFF
+        return None
@@ -0,0 +1,133 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+
+__author__ = 'remittor'
+
+from cpuidsdk64 import *
+from .drvfunc import pci_cfg_read, pci_cfg_cache
+
+# Enumeration of PCI topology.
+# For every slot only VID is readed, absent devices are skipped, functions 1..7 are probed only for multifunction devices.
+# Header of present function is readed by one request into pci_cfg_cache.
+# ref: https://wiki.osdev.org/PCI#Enumerating_PCI_Buses
+
+PCI_ROOT_BUSES = [ 0, 0x80 ]
+
+PCI_HEADER_TYPE_MASK  = 0x7F
+PCI_HEADER_TYPE_MFD   = 0x80    # multifunction device
+PCI_HEADER_TYPE_BRIDGE = 1
+
+class PciFunc():
+    __slots__ = ( 'bus', 'dev', 'fun', 'vid', 'did', 'class_code', 'subclass', 'prog_if', 'header_type' )
+
+    def __init__(self, bus, dev, fun, cfg):
+        self.bus = bus
+        self.dev = dev
+        self.fun = fun
+        self.vid = int.from_bytes(cfg[0:2], 'little')
+        self.did = int.from_bytes(cfg[2:4], 'little')
+        self.prog_if = cfg[0x09]
+        self.subclass = cfg[0x0A]
+        self.class_code = cfg[0x0B]
+        self.header_type = cfg[0x0E]
+
+    @property
+    def addr(self):
+        return ( self.bus, self.dev, self.fun )
+
+    def as_dict(self):
+        return { name: getattr(self, name) for name in self.__slots__ }
+
+    def __repr__(self):
+        return f'<PciFunc [{self.bus:02X}:{self.dev:02X}.{self.fun}] {self.vid:04X}:{self.did:04X} class={self.class_code:02X}{self.subclass:02X}{self.prog_if:02X}>'
+
+class PciIndex():
+    def __init__(self, buses = None):
+        self.buses = list(buses) if buses else list(PCI_ROOT_BUSES)
+        self.funcs = [ ]
+        self.by_addr = { }     # (bus, dev, fun) => PciFunc
+        self.by_class = { }    # (class_code, subclass) => [ PciFunc ]
+        self.by_id = { }       # (vid, did) => [ PciFunc ]
+        self.scan()
+
+    def _add(self, pf):
+        self.funcs.append(pf)
+        self.by_addr[pf.addr] = pf
+        self.by_class.setdefault((pf.class_code, pf.subclass), [ ]).append(pf)
+        self.by_id.setdefault((pf.vid, pf.did), [ ]).append(pf)
+
+    def _probe(self, bus, dev, fun):
+        vid = pci_cfg_read(bus, dev, fun, 0, '2')
+        if not vid or vid == 0xFFFF:
+            return None
+        cfg = pci_cfg_cache.snapshot(bus, dev, fun)
+        if not cfg:
+            return None
+        pf = PciFunc(bus, dev, fun, cfg)
+        self._add(pf)
+        return pf
+
+    def scan(self):
+        bus_list = list(self.buses)
+        scanned = set()
+        while bus_list:
+            bus = bus_list.pop(0)
+            if bus in scanned:
+                continue
+            scanned.add(bus)
+            for dev in range(0, 32):
+                for fun in range(0, 8):
+                    pf = self._probe(bus, dev, fun)
+                    if not pf:
+                        if fun == 0:
+                            break    # device is absent
+                        continue
+                    if (pf.header_type & PCI_HEADER_TYPE_MASK) == PCI_HEADER_TYPE_BRIDGE:
+                        secondary_bus = pci_cfg_cache.read(bus, dev, fun, 0x19, '1')
+                        if secondary_bus and secondary_bus not in scanned:
+                            bus_list.append(secondary_bus)
+                    if fun == 0 and (pf.header_type & PCI_HEADER_TYPE_MFD) == 0:
+                        break    # single function device
+        return len(self.funcs)
+
+    def get(self, bus, dev, fun):
+        return self.by_addr.get((bus, dev, fun), None)
+
+    def find(self, class_code = None, subclass = None, vid = None, did = None):
+        if class_code is not None and subclass is not None:
+            res = self.by_class.get((class_code, subclass), [ ])
+        elif vid is not None and did is not None:
+            res = self.by_id.get((vid, did), [ ])
+        else:
+            res = self.funcs
+        out = [ ]
+        for pf in res:
+            if class_code is not None and pf.class_code != class_code:
+                continue
+            if subclass is not None and pf.subclass != subclass:
+                continue
+            if vid is not None and pf.vid != vid:
+                continue
+            if did is not None and pf.did != did:
+                continue
+            out.append(pf)
+        return out
+
+_pci_index = None
+
+def get_pci_index(rescan = False):
+    global _pci_index
+    if _pci_index is None or rescan:
+        _pci_index = PciIndex()
+    return _pci_index
+
+def pci_find(class_code = None, subclass = None, vid = None, did = None):
+    return get_pci_index().find(class_code, subclass, vid, did)
+
+def pci_index_clear():
+    global _pci_index
+    _pci_index = None
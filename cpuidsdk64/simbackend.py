@@ -0,0 +1,575 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import struct
+
+__author__ = 'remittor'
+
+from .win32 import *
+from .backend import HwBackend
+
+# In-memory model of Intel platform (CPU + PCH) for running the decoders without driver.
+# Usage:
+#   import cpuidsdk64
+#   from cpuidsdk64.simbackend import SimBackend
+#   cpuidsdk64.set_backend(SimBackend())        # before import of cpuinfo / memory
+#   from memory import get_mem_info
+
+SIM_CPU_ID       = 0x06B7      # RAPTORLAKE
+SIM_MCHBAR_BASE  = 0xFEDC0000
+SIM_MCHBAR_SIZE  = 0x10000 * 3
+SIM_DMIBAR_BASE  = 0xFED18000
+SIM_ECAM_BASE    = 0xC0000000  # PCIEXBAR (256 buses)
+SIM_SMBUS_PORT   = 0xEFA0
+
+def set_bits(buf, offset, first_bit, last_bit, value):
+    size = (last_bit // 8) + 1
+    mask = MASK(last_bit - first_bit + 1) << first_bit
+    val = int.from_bytes(buf[offset:offset+size], 'little')
+    val = (val & ~mask) | ((value << first_bit) & mask)
+    buf[offset:offset+size] = val.to_bytes(size, 'little')
+
+#######################################################
+#  PCI
+#######################################################
+
+class SimPciDevice():
+    def __init__(self, vid, did, class_code, subclass, prog_if = 0, header_type = 0, size = 0x1000):
+        self.cfg = bytearray(size)
+        set_bits(self.cfg, 0x00, 0, 15, vid)
+        set_bits(self.cfg, 0x02, 0, 15, did)
+        self.cfg[0x09] = prog_if
+        self.cfg[0x0A] = subclass
+        self.cfg[0x0B] = class_code
+        self.cfg[0x0E] = header_type
+
+    def read(self, offset, size):
+        data = bytes(self.cfg[offset:offset+size])
+        if len(data) < size:
+            data += b'\xFF' * (size - len(data))
+        return data
+
+    def write(self, offset, data):
+        if offset + len(data) > len(self.cfg):
+            return False
+        self.cfg[offset:offset+len(data)] = data
+        return True
+
+    def set_u4(self, offset, value):
+        self.cfg[offset:offset+4] = struct.pack('<I', value & 0xFFFFFFFF)
+
+    def set_u8(self, offset, value):
+        self.cfg[offset:offset+8] = struct.pack('<Q', value)
+
+#######################################################
+#  SMBus devices
+#######################################################
+
+class SimSmbDevice():
+    def __init__(self, size = 0x100):
+        self.regs = bytearray(size)
+        self.ptr = 0
+
+    def recv_byte(self):
+        return self.regs[self.ptr]
+
+    def send_byte(self, value):
+        self.ptr = value
+        return True
+
+    def read_byte(self, command):
+        return self.regs[command]
+
+    def write_byte(self, command, value):
+        self.regs[command] = value & 0xFF
+        return True
+
+    def read_word(self, command):
+        return self.read_byte(command) + (self.read_byte((command + 1) & 0xFF) << 8)
+
+    def write_word(self, command, value):
+        self.write_byte(command, value & 0xFF)
+        return self.write_byte((command + 1) & 0xFF, (value >> 8) & 0xFF)
+
+    def proc_call(self, command, value):
+        self.write_byte(command, value & 0xFF)
+        return self.read_word(command)
+
+# ref: https://www.ablic.com/en/doc/datasheet/dimm_serial_eeprom_spd/S34HTS08AB_E.pdf
+class SimSpd5Hub(SimSmbDevice):
+    MR11 = 0x0B   # I2C Legacy Mode Device Configuration
+    MR49 = 0x31   # TS Current Sensed Temperature
+
+    def __init__(self, eeprom = None, vid = 0x0632, temp = 35.5):
+        super().__init__(0x80)
+        self.eeprom = bytearray(eeprom) if eeprom else bytearray(0x400)
+        if len(self.eeprom) < 0x400:
+            self.eeprom += bytearray(0x400 - len(self.eeprom))
+        self.regs[0] = 0x51     # Device Type: SPD5 Hub with TS
+        self.regs[1] = 0x18
+        self.regs[3] = 0x80 | ((vid >> 8) & 0x1F)
+        self.regs[4] = vid & 0x7F
+        self.set_temp(temp)
+
+    def set_temp(self, temp):
+        val = int(round(abs(temp) * 4)) & 0x3FF
+        if temp < 0:
+            val |= 0x400
+        set_bits(self.regs, self.MR49, 0, 15, val << 2)
+
+    def read_byte(self, command):
+        if command & 0x80:
+            page = self.regs[self.MR11] & 7
+            return self.eeprom[page * 0x80 + (command & 0x7F)]
+        return self.regs[command & 0x7F]
+
+    def write_byte(self, command, value):
+        if command & 0x80:
+            return False   # NVM write protected
+        self.regs[command & 0x7F] = value & 0xFF
+        return True
+
+    def proc_call(self, command, value):
+        self.write_byte(command, value & 0xFF)
+        return self.read_byte(command)
+
+# ref: https://www.richtek.com/assets/product_file/RTQ5119A/DSQ5119A-02.pdf
+class SimPmicRichtek(SimSmbDevice):
+    R30 = 0x30    # ADC Enable
+    R31 = 0x31    # ADC Read Out
+    ADC_VALUES = [ 1.1, 1.1, 1.1, 1.1, 0, 5.0, 3.3, 5.0, 1.8, 1.0 ]   # SWA, SWB, SWC, SWD, NULL, VIN_BULK, ...
+
+    def __init__(self, vdd = 1.1, vddq = 1.1):
+        super().__init__(0x100)
+        self.adc = list(self.ADC_VALUES)
+        self.adc[0] = self.adc[1] = vdd
+        self.adc[2] = vddq
+        self.regs[0x3B] = 0x12    # Revision ID
+        self.regs[0x3C] = 0x8A    # Vendor ID: Richtek
+        self.regs[0x3D] = 0x0C
+
+    def write_byte(self, command, value):
+        self.regs[command] = value & 0xFF
+        if command == self.R30:
+            adc_sel = (value >> 3) & 0xF
+            val = 0
+            if (value & 0x80) != 0 and adc_sel < len(self.adc):
+                mult = 0.070 if adc_sel == 5 else 0.015
+                val = min(int(round(self.adc[adc_sel] / mult)), 0xFF)
+            self.regs[self.R31] = val
+        return True
+
+# Intel i801 compatible SMBus host controller (I/O registers)
+# ref: io-controller-hub-9-datasheet.pdf   # section: 5.20 SMBus Controller (D31:F3)
+class SimSmbusHost():
+    def __init__(self, port):
+        self.port = port
+        self.regs = bytearray(0x20)
+        self.devices = { }    # I2C address => SimSmbDevice
+
+    def add_device(self, addr, device):
+        self.devices[addr] = device
+        return device
+
+    def io_read(self, reg):
+        val = self.regs[reg]
+        if reg == 0:   # SMBHSTSTS
+            self.regs[0] |= 0x40    # INUSE_STS: set on read
+        if reg == 2:   # SMBHSTCNT
+            val &= 0xBF
+        return val
+
+    def io_write(self, reg, value):
+        if reg == 0:   # SMBHSTSTS: write 1 to clear
+            self.regs[0] &= (value & 0xFE) ^ 0xFF
+            return
+        self.regs[reg] = value & 0xFF
+        if reg == 2:
+            if value & 0x02:   # KILL
+                self.regs[0] = (self.regs[0] & 0xFE) | 0x10
+            elif value & 0x40:   # START
+                self.execute(value & 0x1C)
+
+    def execute(self, xact):
+        addr = self.regs[4] >> 1
+        read = self.regs[4] & 1
+        cmd = self.regs[3]
+        dat = self.regs[5] + (self.regs[6] << 8)
+        dev = self.devices.get(addr, None)
+        val = None
+        if dev:
+            if xact == 0x00:    # QUICK
+                val = True
+            elif xact == 0x04:   # BYTE
+                val = dev.recv_byte() if read else dev.send_byte(cmd)
+            elif xact == 0x08:   # BYTE_DATA
+                val = dev.read_byte(cmd) if read else dev.write_byte(cmd, self.regs[5])
+            elif xact == 0x0C:   # WORD_DATA
+                val = dev.read_word(cmd) if read else dev.write_word(cmd, dat)
+            elif xact == 0x10:   # PROC_CALL
+                val = dev.proc_call(cmd, dat)
+        if val is None or val is False:
+            self.regs[0] |= 0x04 | 0x02    # DEV_ERR | INTR
+            return
+        if val is not True:
+            self.regs[5] = val & 0xFF
+            self.regs[6] = (val >> 8) & 0xFF
+        self.regs[0] |= 0x02    # INTR
+
+#######################################################
+#  MEMORY
+#######################################################
+
+class SimPhyMem():
+    def __init__(self):
+        self.regions = [ ]    # list of [ base, bytearray ]
+
+    def add_region(self, base, data):
+        if isinstance(data, int):
+            data = bytearray(data)
+        elif not isinstance(data, bytearray):
+            data = bytearray(data)
+        self.regions.append( [ base, data ] )
+        return data
+
+    def find(self, addr, size):
+        for base, data in self.regions:
+            if addr >= base and addr + size <= base + len(data):
+                return data, addr - base
+        return None, None
+
+    def read(self, addr, size):
+        data, pos = self.find(addr, size)
+        if data is None:
+            return b'\xFF' * size
+        return bytes(data[pos:pos+size])
+
+    def write(self, addr, buf):
+        data, pos = self.find(addr, len(buf))
+        if data is None:
+            return False
+        data[pos:pos+len(buf)] = buf
+        return True
+
+#######################################################
+#  Backend
+#######################################################
+
+class SimBackend(HwBackend):
+    name = 'sim'
+
+    def __init__(self, cpu_id = SIM_CPU_ID, stepping = 1, cpu_name = None, mchbar = None, default = True):
+        self.cpu_id = cpu_id
+        self.cpuid_dict = { }       # leaf or (leaf, subleaf) => (eax, ebx, ecx, edx)
+        self.pci = { }              # (bus, dev, fun) => SimPciDevice
+        self.ports = { }            # port => value
+        self.smbus = { }            # base port => SimSmbusHost
+        self.msr = { }              # reg => value
+        self.msr_default = 0
+        self.mem = SimPhyMem()
+        self.oc_mailbox = { }       # command (without RUN_BUSY) => data
+        self.vr_mailbox = { }       # command (without RUN_BUSY) => data
+        self.bios_mailbox = { }     # command (without RUN_BUSY) => data
+        self.mchbar = None
+        self.set_cpuid(cpu_id, stepping, cpu_name)
+        if default:
+            self.init_default_platform(mchbar)
+
+    def close(self):
+        pass
+
+    def cpuid(self, leaf, subleaf = 0):
+        regs = self.cpuid_dict.get((leaf, subleaf), None)
+        if regs is None:
+            regs = self.cpuid_dict.get(leaf, (0, 0, 0, 0))
+        return regs
+
+    def set_cpuid(self, cpu_id, stepping = 0, cpu_name = None, vendor = 'GenuineIntel'):
+        self.cpu_id = cpu_id
+        family = cpu_id >> 8
+        model = cpu_id & 0xFF
+        eax = (stepping & 0xF) | ((model & 0xF) << 4) | ((family & 0xF) << 8) | ((model >> 4) << 16)
+        ebx, edx, ecx = struct.unpack('<III', vendor.encode('latin-1')[:12].ljust(12, b'\0'))
+        self.cpuid_dict[0] = (0x20, ebx, ecx, edx)
+        self.cpuid_dict[1] = (eax, 0, 0, 0)
+        if cpu_name is None:
+            cpu_name = f'Intel(R) Core(TM) Simulated CPU {cpu_id:04X}'
+        name = cpu_name.encode('latin-1')[:47].ljust(48, b'\0')
+        self.cpuid_dict[0x80000000] = (0x80000008, 0, 0, 0)
+        for code in range(0, 3):
+            self.cpuid_dict[0x80000002 + code] = struct.unpack('<IIII', name[code*16:code*16+16])
+
+    def add_pci_device(self, bus, dev, fun, device):
+        self.pci[(bus, dev, fun)] = device
+        if len(device.cfg) == 0x1000:
+            # ECAM window shares config space with device
+            addr = (bus << 20) | (dev << 15) | (fun << 12)
+            self.mem.regions.append( [ SIM_ECAM_BASE + addr, device.cfg ] )
+        return device
+
+    def add_smbus_host(self, bus, dev, fun, port, did = 0x7A23, svid = 0x1043):
+        pdev = SimPciDevice(0x8086, did, 0x0C, 0x05)
+        pdev.set_u4(0x04, 0x02800003)          # CMD: IOSE + MSE
+        pdev.set_u4(0x10, 0x01104004)          # SMBMBAR
+        pdev.set_u4(0x14, 0x60)
+        pdev.set_u4(0x20, port | 1)            # SMB Base Address
+        set_bits(pdev.cfg, 0x2C, 0, 15, svid)  # Subsystem Vendor ID
+        pdev.set_u4(0x40, 0x11)                # HCFG: HST_EN + SPDWD
+        self.add_pci_device(bus, dev, fun, pdev)
+        if fun != 0 and (bus, dev, 0) not in self.pci:
+            # eSPI/LPC controller (function 0 of multifunction PCH device)
+            self.add_pci_device(bus, dev, 0, SimPciDevice(0x8086, 0x7A06, 0x06, 0x01, header_type = 0x80))
+        host = SimSmbusHost(port)
+        self.smbus[port] = host
+        return host
+
+    def add_dimm(self, slot, eeprom = None, temp = 35.5, with_pmic = True, host = None):
+        host = host if host else self.smbus[SIM_SMBUS_PORT]
+        hub = host.add_device(0x50 + slot, SimSpd5Hub(eeprom if eeprom else make_spd5_eeprom(), temp = temp))
+        if with_pmic:
+            host.add_device(0x48 + slot, SimPmicRichtek())
+        return hub
+
+    def load_mchbar(self, data):
+        if isinstance(data, str):
+            with open(data, 'rb') as file:
+                data = file.read()
+        self.mchbar[0:len(data)] = data[:len(self.mchbar)]
+
+    def init_default_platform(self, mchbar = None):
+        # Host Bridge / DRAM Controller
+        host = self.add_pci_device(0, 0, 0, SimPciDevice(0x8086, 0xA700, 0x06, 0x00))
+        host.set_u8(0x48, SIM_MCHBAR_BASE | 1)    # MCHBAR
+        host.set_u8(0x68, SIM_DMIBAR_BASE | 1)    # DMIBAR
+        host.set_u8(0x60, SIM_ECAM_BASE | 1)      # PCIEXBAR: 256MB
+        set_bits(host.cfg, 0xF0, 6, 6, 1)         # CAP_E: DDR5_EN
+        set_bits(host.cfg, 0xF0, 7, 11, 21)       # CAP_E: MAX_DATA_RATE_DDR5
+        set_bits(host.cfg, 0xE8, 21, 23, 7)       # CAP_B: PLL_REF100_CFG
+        self.mchbar = self.mem.add_region(SIM_MCHBAR_BASE, SIM_MCHBAR_SIZE)
+        dmibar = self.mem.add_region(SIM_DMIBAR_BASE, 0x1000)
+        set_bits(dmibar, 0, 0, 31, (0xA700 << 16) | 0x8086)
+        if mchbar:
+            self.load_mchbar(mchbar)
+        else:
+            init_mchbar_ddr5(self.mchbar, self.cpu_id)
+        # PCH SMBus controller
+        self.add_smbus_host(0, 31, 4, SIM_SMBUS_PORT)
+        self.add_dimm(1)
+        self.add_dimm(3)
+        self.msr[0xCE] = 0x0000080C38811800   # MSR_PLATFORM_INFO
+        self.msr[0x8B] = 0x0000012C00000000   # MSR_BIOS_SIGN_ID
+
+    #######################################################
+    #  I/O ports
+    #######################################################
+
+    def _find_smbus(self, port):
+        for base, host in self.smbus.items():
+            if port >= base and port < base + 0x20:
+                return host
+        return None
+
+    def port_read(self, port, size):
+        if port == 0xCFC and 0xCF8 in self.ports:
+            addr = self.ports[0xCF8]
+            if addr & 0x80000000:
+                bus = (addr >> 16) & 0xFF
+                data = self.pci_cfg_read(bus, (addr >> 11) & 0x1F, (addr >> 8) & 7, addr & 0xFC, 4)
+                return int.from_bytes(data, 'little') & MASK(size * 8)
+        host = self._find_smbus(port)
+        if host:
+            val = 0
+            for i in range(0, size):
+                val |= host.io_read(port - host.port + i) << (i * 8)
+            return val
+        return self.ports.get(port, 0xFFFFFFFF) & MASK(size * 8)
+
+    def port_write(self, port, value, size):
+        if port == 0xCFC and 0xCF8 in self.ports:
+            addr = self.ports[0xCF8]
+            if addr & 0x80000000:
+                bus = (addr >> 16) & 0xFF
+                return self.pci_cfg_write(bus, (addr >> 11) & 0x1F, (addr >> 8) & 7, addr & 0xFC, value.to_bytes(size, 'little'))
+        host = self._find_smbus(port)
+        if host:
+            for i in range(0, size):
+                host.io_write(port - host.port + i, (value >> (i * 8)) & 0xFF)
+            return True
+        self.ports[port] = value & MASK(size * 8)
+        return True
+
+    #######################################################
+    #  PCI config space
+    #######################################################
+
+    def pci_cfg_read(self, bus, dev, fun, offset, size):
+        pdev = self.pci.get((bus, dev, fun), None)
+        if not pdev:
+            return b'\xFF' * size
+        return pdev.read(offset, size)
+
+    def pci_cfg_write(self, bus, dev, fun, offset, data):
+        pdev = self.pci.get((bus, dev, fun), None)
+        if not pdev:
+            return False
+        return pdev.write(offset, bytes(data))
+
+    #######################################################
+    #  SMBus (CPUZ style transactions)
+    #######################################################
+
+    def smbus_read_u1(self, port, dev, command, status = 0xBF):
+        host = self.smbus.get(port, None)
+        device = host.devices.get(dev, None) if host else None
+        if not device:
+            return None
+        return device.read_byte(command) & 0xFF
+
+    def smbus_write_u1(self, port, dev, command, value, status = 0xBF):
+        host = self.smbus.get(port, None)
+        device = host.devices.get(dev, None) if host else None
+        if not device:
+            return False
+        return True if device.write_byte(command, value) else False
+
+    def smbus_pcall(self, port, dev, command, value, status = 0xBF):
+        host = self.smbus.get(port, None)
+        device = host.devices.get(dev, None) if host else None
+        if not device:
+            return None
+        return device.proc_call(command, value)
+
+    def smbus_read_X(self, port, dev, command):
+        host = self.smbus.get(port, None)
+        device = host.devices.get(dev, None) if host else None
+        if not device:
+            return None
+        return device.read_word(command)
+
+    #######################################################
+    #  MSR
+    #######################################################
+
+    def msr_read(self, reg):
+        return self.msr.get(reg, self.msr_default)
+
+    def msr_write(self, reg, val_HI, val_LO):
+        val_HI &= 0xFFFFFFFF
+        val_LO &= 0xFFFFFFFF
+        if reg == 0x150 and (val_HI & 0x80000000) != 0:   # MSR_OC_MAILBOX
+            status, data = self.msr_oc_mailbox(val_HI, val_LO)
+            self.msr[reg] = (status << 32) | data
+            return True
+        if reg == 0x607 and (val_LO & 0x80000000) != 0:   # VR_MAILBOX_MSR_INTERFACE
+            data = self.vr_mailbox.get(val_LO & 0x7FFFFFFF, 0)
+            self.msr[0x608] = data & 0xFFFFFFFF
+            self.msr[reg] = 0
+            return True
+        self.msr[reg] = (val_HI << 32) | val_LO
+        return True
+
+    def msr_oc_mailbox(self, cmd, data):
+        return 0, self.oc_mailbox.get(cmd & 0x7FFFFFFF, 0) & 0xFFFFFFFF
+
+    def msr_get_ticks(self, reg):
+        return 0.0
+
+    # simulated system has one CPU
+    def msr_read_all(self, regs, cpus = None):
+        cpus = [ 0 ] if cpus is None else cpus
+        return { cpu: { reg: self.msr_read(reg) for reg in regs } for cpu in cpus }
+
+    #######################################################
+    #  PHYS MEMORY
+    #######################################################
+
+    def phymem_read(self, addr, size):
+        return self.mem.read(addr, size)
+
+    def phymem_write(self, addr, data):
+        if addr == SIM_MCHBAR_BASE + 0x5DA4:   # BIOS pcode mailbox interface
+            cmd = int.from_bytes(data, 'little')
+            if (cmd & 0x80000000) != 0:
+                value = self.bios_mailbox.get(cmd & 0x7FFFFFFF, 0)
+                self.mem.write(SIM_MCHBAR_BASE + 0x5DA0, struct.pack('<I', value & 0xFFFFFFFF))
+                data = struct.pack('<I', 0)
+        return self.mem.write(addr, data)
+
+    def phymem_map(self, phy_addr, size):
+        data, pos = self.mem.find(phy_addr, size)
+        if data is None:
+            return None
+        return get_bytes_addr(data) + pos
+
+    def phymem_unmap(self, phy_addr, size):
+        return True
+
+#######################################################
+#  Default content
+#######################################################
+
+def make_spd5_eeprom(part_number = 'SIM-DDR5-6000-16G', vendor = 0x044D, serial = 0x12345678):
+    spd = bytearray(0x400)
+    spd[0] = 0x30       # 1024 bytes
+    spd[1] = 0x10       # revision 1.0
+    spd[2] = 0x12       # DDR5
+    spd[3] = 0x02       # UDIMM
+    spd[4] = 0x04       # 16 Gb, MONO
+    spd[5] = 0x00       # rows = 16, columns = 10
+    spd[6] = 0x20       # x8
+    spd[7] = 0x62       # 4 banks per BG, 8 BG
+    spd[192] = 0x10
+    struct.pack_into('<BB', spd, 194, 0x86, 0x32)   # SPD hub vendor: Montage
+    spd[196] = 0x51
+    struct.pack_into('<BB', spd, 198, 0x8A, 0x0C)   # PMIC vendor: Richtek
+    spd[234] = 0x00     # 1 rank
+    struct.pack_into('<BB', spd, 512, 0x80 | (vendor >> 8), vendor & 0x7F)
+    spd[515] = 0x25     # year (BCD)
+    spd[516] = 0x10     # week (BCD)
+    struct.pack_into('>I', spd, 517, serial)
+    spd[521:551] = part_number.encode('latin-1')[:30].ljust(30, b' ')
+    struct.pack_into('<BB', spd, 552, 0x80, 0x2D)   # DRAM vendor: SK Hynix
+    return spd
+
+def init_mchbar_ddr5(mchbar, cpu_id = SIM_CPU_ID, qclk_ratio = 30):
+    # common registers
+    set_bits(mchbar, 0x5F60, 0, 31, 100000)           # BCLK = 100 MHz
+    set_bits(mchbar, 0x5918, 2, 9, qclk_ratio)        # QCLK_RATIO
+    set_bits(mchbar, 0x5918, 10, 10, 1)               # QCLK_REFERENCE = 100 MHz
+    set_bits(mchbar, 0x5918, 24, 31, 45)              # UCLK_RATIO
+    set_bits(mchbar, 0x5918, 40, 55, 9830)            # SA_VOLTAGE = 1.2 V
+    set_bits(mchbar, 0x5938, 0, 3, 3)                 # PWR_UNIT
+    for reg in [ 0x5E00, 0x5E04 ]:
+        set_bits(mchbar, reg, 0, 7, qclk_ratio)       # MC_PLL_RATIO
+        set_bits(mchbar, reg, 8, 11, 1)               # MC_PLL_REF
+        set_bits(mchbar, reg, 12, 13, 1)              # GEAR2
+        set_bits(mchbar, reg, 17, 26, 220)            # VDDQ = 1.1 V
+    set_bits(mchbar, 0x13D10, 0, 7, qclk_ratio * 3)   # QCLK_RATIO (33.334 MHz)
+    set_bits(mchbar, 0x2C54, 8, 15, 105)              # VccDD2 = 1.1 V
+    for ctrl in range(0, 2):
+        base = 0x10000 * ctrl
+        set_bits(mchbar, base + 0xD800, 0, 2, 1)      # DDR_TYPE = DDR5
+        for ch in range(0, 2):
+            set_bits(mchbar, base + 0xD80C + ch * 4, 0, 6, 16 if ch == 0 else 0)   # 8 GB per sub-channel
+            data = bytearray(0x800)
+            set_bits(data, 0x070, 16, 22, 30)         # tCL
+            set_bits(data, 0x070, 24, 31, 28)         # tCWL
+            set_bits(data, 0x000, 0, 7, 38)           # tRP
+            set_bits(data, 0x000, 13, 19, 23)         # tRDPRE
+            set_bits(data, 0x000, 32, 41, 126)        # tWRPRE
+            set_bits(data, 0x000, 42, 50, 76)         # tRAS
+            set_bits(data, 0x000, 51, 58, 38)         # tRCD
+            set_bits(data, 0x43C, 0, 17, 11700)       # tREFI
+            set_bits(data, 0x43C, 18, 30, 884)        # tRFC
+            set_bits(data, 0x008, 0, 8, 32)           # tFAW
+            set_bits(data, 0x008, 9, 14, 12)          # tRRD_sg
+            set_bits(data, 0x008, 15, 21, 8)          # tRRD_dg
+            set_bits(data, 0x014, 0, 8, 54)           # tWRRD_sg
+            set_bits(data, 0x014, 9, 17, 42)          # tWRRD_dg
+            set_bits(data, 0x088, 3, 4, 1)            # CMD_STRETCH = 2N
+            set_bits(data, 0x088, 31, 31, 1)          # GEAR2
+            pos = base + 0xE000 + ch * 0x800
+            mchbar[pos:pos+0x800] = data
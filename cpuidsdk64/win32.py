@@ -4,6 +4,7 @@
 
 import os
 import sys
+import time
 import atexit
 import ctypes
 from ctypes.wintypes import *
@@ -285,79 +286,95 @@ LPOVERLAPPED = ctypes.POINTER(OVERLAPPED)
 
 ###########################################################################################
 
-_kernel32 = ctypes.WinDLL('kernel32')
-_win32 = SimpleNamespace()
-
-_win32.CloseHandle = _kernel32.CloseHandle
-_win32.CloseHandle.argtypes = [ HANDLE ]
-_win32.CloseHandle.restype = BOOL 
-
-_win32.CreateFileA = _kernel32.CreateFileA
-_win32.CreateFileA.argtypes = [
-    LPCSTR,                # lpFileName,
-    DWORD,                 # dwDesiredAccess,
-    DWORD,                 # dwShareMode,
-    LPSECURITY_ATTRIBUTES, # lpSecurityAttributes,
-    DWORD,                 # dwCreationDisposition,
-    DWORD,                 # dwFlagsAndAttributes,
-    HANDLE                 # hTemplateFile
-]
-_win32.CreateFileA.restype = HANDLE 
-
-_win32.CreateEventA = _kernel32.CreateEventA
-_win32.CreateEventA.argtypes = [
-    LPSECURITY_ATTRIBUTES, # lpEventAttributes,
-    BOOL,                  # bManualReset,
-    BOOL,                  # bInitialState,
-    LPCSTR                 # lpName
-]
-_win32.CloseHandle.restype = BOOL 
-
-_win32.SetEvent = _kernel32.SetEvent
-_win32.SetEvent.argtypes = [ HANDLE ]   # hEvent
-_win32.SetEvent.restype = BOOL
-
-_win32.ResetEvent = _kernel32.ResetEvent
-_win32.ResetEvent.argtypes = [ HANDLE ]   # hEvent
-_win32.ResetEvent.restype = BOOL
-
-_win32.CancelIo = _kernel32.CancelIo
-_win32.CancelIo.argtypes = [ HANDLE ]   # hFile
-_win32.CancelIo.restype = BOOL
-
-_win32.WaitForSingleObject = _kernel32.WaitForSingleObject
-_win32.WaitForSingleObject.argtypes = [
-    HANDLE,  # hHandle,
-    DWORD    # dwMilliseconds
-]
-_win32.WaitForSingleObject.restype = DWORD 
-
-_win32.DeviceIoControl = _kernel32.DeviceIoControl
-_win32.DeviceIoControl.argtypes = [ HANDLE, DWORD, LPVOID, DWORD, LPVOID, DWORD, LPDWORD, LPOVERLAPPED ]
-_win32.DeviceIoControl.restype = BOOL
-
-_win32.CreateMutexW = _kernel32.CreateMutexA
-_win32.CreateMutexW.argtypes = [
-    LPSECURITY_ATTRIBUTES, # lpMutexAttributes,
-    BOOL,                  # bInitialOwner,
-    LPCWSTR                # lpName
-]
-_win32.CreateMutexW.restype = HANDLE
-
-_win32.OpenMutexW = _kernel32.OpenMutexW
-_win32.OpenMutexW.argtypes = [
-    DWORD,     # dwDesiredAccess
-    BOOL,      # bInheritHandle,
-    LPCWSTR    # lpName
-]
-_win32.OpenMutexW.restype = HANDLE
-
-_win32.ReleaseMutex = _kernel32.ReleaseMutex
-_win32.ReleaseMutex.argtypes = [ HANDLE ]   # hMutex
-_win32.ReleaseMutex.restype = BOOL
+if os.name != 'nt':
+    _kernel32 = None
+    _win32 = None
+else:
+    _kernel32 = ctypes.WinDLL('kernel32')
+    _win32 = SimpleNamespace()
+
+
+    _win32.CloseHandle = _kernel32.CloseHandle
+    _win32.CloseHandle.argtypes = [ HANDLE ]
+    _win32.CloseHandle.restype = BOOL 
+
+    _win32.CreateFileA = _kernel32.CreateFileA
+    _win32.CreateFileA.argtypes = [
+        LPCSTR,                # lpFileName,
+        DWORD,                 # dwDesiredAccess,
+        DWORD,                 # dwShareMode,
+        LPSECURITY_ATTRIBUTES, # lpSecurityAttributes,
+        DWORD,                 # dwCreationDisposition,
+        DWORD,                 # dwFlagsAndAttributes,
+        HANDLE                 # hTemplateFile
+    ]
+    _win32.CreateFileA.restype = HANDLE 
+
+    _win32.CreateEventA = _kernel32.CreateEventA
+    _win32.CreateEventA.argtypes = [
+        LPSECURITY_ATTRIBUTES, # lpEventAttributes,
+        BOOL,                  # bManualReset,
+        BOOL,                  # bInitialState,
+        LPCSTR                 # lpName
+    ]
+    _win32.CloseHandle.restype = BOOL 
+
+    _win32.SetEvent = _kernel32.SetEvent
+    _win32.SetEvent.argtypes = [ HANDLE ]   # hEvent
+    _win32.SetEvent.restype = BOOL
+
+    _win32.ResetEvent = _kernel32.ResetEvent
+    _win32.ResetEvent.argtypes = [ HANDLE ]   # hEvent
+    _win32.ResetEvent.restype = BOOL
+
+    _win32.CancelIo = _kernel32.CancelIo
+    _win32.CancelIo.argtypes = [ HANDLE ]   # hFile
+    _win32.CancelIo.restype = BOOL
+
+    _win32.WaitForSingleObject = _kernel32.WaitForSingleObject
+    _win32.WaitForSingleObject.argtypes = [
+        HANDLE,  # hHandle,
+        DWORD    # dwMilliseconds
+    ]
+    _win32.WaitForSingleObject.restype = DWORD 
+
+    _win32.DeviceIoControl = _kernel32.DeviceIoControl
+    _win32.DeviceIoControl.argtypes = [ HANDLE, DWORD, LPVOID, DWORD, LPVOID, DWORD, LPDWORD, LPOVERLAPPED ]
+    _win32.DeviceIoControl.restype = BOOL
+
+    _win32.CreateMutexW = _kernel32.CreateMutexA
+    _win32.CreateMutexW.argtypes = [
+        LPSECURITY_ATTRIBUTES, # lpMutexAttributes,
+        BOOL,                  # bInitialOwner,
+        LPCWSTR                # lpName
+    ]
+    _win32.CreateMutexW.restype = HANDLE
+
+    _win32.OpenMutexW = _kernel32.OpenMutexW
+    _win32.OpenMutexW.argtypes = [
+        DWORD,     # dwDesiredAccess
+        BOOL,      # bInheritHandle,
+        LPCWSTR    # lpName
+    ]
+    _win32.OpenMutexW.restype = HANDLE
+
+    _win32.ReleaseMutex = _kernel32.ReleaseMutex
+    _win32.ReleaseMutex.argtypes = [ HANDLE ]   # hMutex
+    _win32.ReleaseMutex.restype = BOOL
 
 ###############################################################################################
 
+# Named mutexes for non-Windows platforms (process-local only)
+_local_mutex_dict = { }
+
+def _local_mutex(obj_path, open = False):
+    import threading
+    lock = _local_mutex_dict.get(obj_path, None)
+    if lock is None and not open:
+        lock = threading.RLock()
+        _local_mutex_dict[obj_path] = lock
+    return lock
+
 class Win32FileHandle:
     def __init__(self):
         global _win32
@@ -371,6 +388,7 @@ class Win32FileHandle:
         self.is_acquired = False
         self.release_on_close = True
         self.msgerr = None
+        self.lock = None
     
     def __del__(self):
         self.close()
@@ -380,7 +398,10 @@ class Win32FileHandle:
 
     def close(self):
         global _win32
-        if self.handle and _win32 and _win32.CloseHandle:
+        if self.handle and self.lock:
+            if self.is_mutex and self.release_on_close:
+                self.release_mutex()
+        elif self.handle and _win32 and _win32.CloseHandle:
             if self.is_mutex and self.release_on_close:
                 self.release_mutex()
             _win32.CloseHandle(self.handle)
@@ -411,6 +432,8 @@ class Win32FileHandle:
             raise RuntimeError('Handle already used!')
         self.handle = None
         self.name = obj_path # .decode('utf-16-le')
+        if _win32 is None:
+            return self._create_local_mutex(obj_path, bInitialOwner, release_on_close, open, throwable)
         if open:
             dwDesiredAccess = AC_SYNCHRONIZE
             bInheritHandle = bInitialOwner
@@ -430,12 +453,33 @@ class Win32FileHandle:
         self.handle = handle        
         return self
 
+    def _create_local_mutex(self, obj_path, bInitialOwner, release_on_close, open, throwable):
+        lock = _local_mutex(obj_path, open)
+        self.release_on_close = release_on_close
+        self.is_mutex = True
+        if lock is None:
+            if throwable:
+                raise RuntimeError(f'ERROR: Mutex "{obj_path}" not found')
+            return None
+        self.lock = lock
+        self.handle = id(lock)
+        if bInitialOwner and not open:
+            lock.acquire()
+            self.is_acquired = True
+        return self
+
     def release_mutex(self, throwable = False):
         global _win32
         if not self.handle:
             if throwable:
                 raise ValueError('Incorrect mutex handle!')
             return False
+        if self.lock:
+            if not self.is_acquired:
+                return False
+            self.lock.release()
+            self.is_acquired = False
+            return True
         rc = _win32.ReleaseMutex(self.handle)
         if rc != 0 and self.is_acquired:
             self.is_acquired = False
@@ -451,7 +495,10 @@ class Win32FileHandle:
             if throwable:
                 raise ValueError('Incorrect mutex handle!')
             return False
-        rc = _win32.WaitForSingleObject(self.handle, wait_ms)
+        if self.lock:
+            rc = STATUS_WAIT_0 if self.lock.acquire(timeout = wait_ms / 1000) else STATUS_TIMEOUT
+        else:
+            rc = _win32.WaitForSingleObject(self.handle, wait_ms)
         if rc != STATUS_WAIT_0 and throwable:
             if not self.msgerr:
                 raise RuntimeError(f'ERROR: Cannot acquire a mutex "{self.name}"')
@@ -483,7 +530,31 @@ def rawDeviceIoControl(hDevice, ioctl, lpInBuffer, nInBufferSize, lpOutBuffer, n
     rc = _win32.DeviceIoControl(hDevice, ioctl, lpInBuffer, nInBufferSize, lpOutBuffer, nOutBufferSize, lpBytesReturned, lpOverlapped)
     return True if rc != 0 else False
 
-def DeviceIoControl(hDevice, ioctl, inbuf, outbufsize, dummy = None):
+# hooks for capture / statistics of IOCTL traffic:  func(ioctl, inbuf, outbuf, xbuf, elapsed_ns)
+_ioctl_hooks = [ ]
+
+def add_ioctl_hook(func):
+    global _ioctl_hooks
+    if func not in _ioctl_hooks:
+        _ioctl_hooks = _ioctl_hooks + [ func ]
+
+def remove_ioctl_hook(func):
+    global _ioctl_hooks
+    _ioctl_hooks = [ hook for hook in _ioctl_hooks if hook != func ]
+
+# xbuf: extra data buffer, the pointer of which is passed into inbuf
+def DeviceIoControl(hDevice, ioctl, inbuf, outbufsize, xbuf = None):
+    global _win32, _ioctl_hooks
+    if _ioctl_hooks:
+        start_time = time.perf_counter_ns()
+        out = _DeviceIoControl(hDevice, ioctl, inbuf, outbufsize)
+        elapsed_ns = time.perf_counter_ns() - start_time
+        for hook in _ioctl_hooks:
+            hook(ioctl, inbuf, out, xbuf, elapsed_ns)
+        return out
+    return _DeviceIoControl(hDevice, ioctl, inbuf, outbufsize)
+
+def _DeviceIoControl(hDevice, ioctl, inbuf, outbufsize):
     global _win32
     if isinstance(hDevice, Win32FileHandle):
         hDevice = hDevice.handle
@@ -509,6 +580,58 @@ def DeviceIoControl(hDevice, ioctl, inbuf, outbufsize, dummy = None):
         return b''
     return bytes(ctypes.cast(lpOutBuffer, ctypes.POINTER(ctypes.c_ubyte * bytesReturned.value)).contents)
 
+# Persistent IOCTL channel for one device handle.
+# Input, output and data buffers are allocated once and their addresses are passed to the driver as is.
+# Usage:
+#   layout.pack_into(chan.inbuf, 0, ...)
+#   out = chan.call(ioctl, layout.size, outsize)    # memoryview into chan.outbuf (valid until next call)
+class DeviceIoChannel():
+    def __init__(self, hDevice, bufsize = 256, datasize = 4096):
+        self.hDevice = hDevice
+        self.inbuf = bytearray(bufsize)
+        self.outbuf = bytearray(bufsize)
+        self.inview = memoryview(self.inbuf)
+        self.outview = memoryview(self.outbuf)
+        self.in_addr = get_bytes_addr(self.inbuf)
+        self.out_addr = get_bytes_addr(self.outbuf)
+        self.returned = DWORD(0)
+        self.returned_ref = byref(self.returned)
+        self.set_data_size(datasize)
+
+    # data buffer for IOCTLs with pointer inside inbuf (PCI_CFG_READ, PHYMEM_READ, ...)
+    def set_data_size(self, size):
+        self.data = bytearray(size)
+        self.dataview = memoryview(self.data)
+        self.data_addr = get_bytes_addr(self.data)
+
+    def get_data(self, size):
+        if size > len(self.data):
+            self.set_data_size(ROUNDUP(size, 4096))
+        return self.data_addr
+
+    def call(self, ioctl, insize, outsize, xsize = 0):
+        global _win32, _ioctl_hooks
+        hDevice = self.hDevice
+        if isinstance(hDevice, Win32FileHandle):
+            hDevice = hDevice.handle
+        hooks = _ioctl_hooks
+        if hooks:
+            start_time = time.perf_counter_ns()
+        self.returned.value = 0
+        rc = _win32.DeviceIoControl(hDevice, ioctl, self.in_addr, insize, self.out_addr, outsize, self.returned_ref, None)
+        out = False
+        if rc != 0:
+            size = self.returned.value
+            if size > outsize:
+                raise RuntimeError()
+            out = self.outview[:size]
+        if hooks:
+            elapsed_ns = time.perf_counter_ns() - start_time
+            xbuf = self.dataview[:xsize] if xsize > 0 else None
+            for hook in hooks:
+                hook(ioctl, self.inview[:insize], out, xbuf, elapsed_ns)
+        return out
+
 def exec_command(cmd):
     import subprocess
     res = subprocess.run(cmd, capture_output=True, text=True, check=True, shell=True)
@@ -15,16 +15,32 @@ import enum
 
 __author__ = 'remittor'
 
-from cpuid import CPUID as CPUID_BASE
+try:
+    from cpuid import CPUID as CPUID_BASE
+except ImportError:
+    CPUID_BASE = None
+from cpuidsdk64 import get_backend
 from hardware import *
 
 gcpuid = None    # int
 gcpuinfo = None  # dict
 g_CPUID = None   # class
 
-def get_cpu_id(full = False):
+def read_cpuid(leaf, subleaf = 0):
     global g_CPUID
-    eax, ebx, ecx, edx = g_CPUID(1)
+    backend = get_backend()
+    if backend:
+        regs = backend.cpuid(leaf, subleaf)
+        if regs is not None:
+            return regs
+    if not g_CPUID:
+        if not CPUID_BASE:
+            raise RuntimeError(f'ERROR: module "cpuid" not found')
+        g_CPUID = CPUID_BASE()
+    return g_CPUID(leaf, subleaf)
+
+def get_cpu_id(full = False):
+    eax, ebx, ecx, edx = read_cpuid(1)
     stepping = eax & 0xF
     model = (eax >> 4) & 0xF
     family = (eax >> 8) & 0xF
@@ -39,18 +55,16 @@ def get_cpu_id(full = False):
         return cpu_id, stepping
 
 def get_cpu_vendor():
-    global g_CPUID
-    eax, ebx, ecx, edx = g_CPUID(0)
+    eax, ebx, ecx, edx = read_cpuid(0)
     name = struct.pack("III", ebx, edx, ecx).decode("utf-8")
     if '\x00' in name:
         return name.split('\x00', 1)[0]
     return name
 
 def get_cpu_name():
-    global g_CPUID
     name = ''
     for code in range(2, 5):
-        eax, ebx, ecx, edx = g_CPUID(0x80000000 + code)
+        eax, ebx, ecx, edx = read_cpuid(0x80000000 + code)
         name += struct.pack("IIII", eax, ebx, ecx, edx).decode("utf-8")
     return name.split('\x00', 1)[0]
 
@@ -74,13 +88,13 @@ def get_cpu_info(log = False):
         print(f'CPU name: "{cpu["name"]}"', '   CPU ID: %02X:%02X:%02X ' % (cpu['family'], cpu['model_id'], cpu['stepping']))
     return cpu
 
-if not g_CPUID:
+if not g_CPUID and CPUID_BASE:
     g_CPUID = CPUID_BASE()
 
-if not gcpuid:
+if not gcpuid and (CPUID_BASE or get_backend()):   # CPUID source may be set later (offline mode)
     gcpuid = get_cpu_id()
 
-if not gcpuinfo:
+if not gcpuinfo and gcpuid:
     gcpuinfo = get_cpu_info(log = False)
 
 if __name__ == "__main__":
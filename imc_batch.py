@@ -0,0 +1,205 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+import io
+import csv
+import json
+import time
+import contextlib
+import multiprocessing
+
+__author__ = 'remittor'
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Batch analyzer of memory snapshots collected from many machines.
+# Input: directories with IMC_*.json files (saved by meminfo / memspd) and dump sets of MCHBAR (see cpuidsdk64/dumpbackend.py).
+# Every snapshot is decoded in a process pool and converted into flat rows:
+#   kind = 'channel' : one row per controller / channel (columns "mc.*", "ch.*", "tm.*")
+#   kind = 'dimm'    : one row per DIMM (columns "dimm.*", "spd.*")
+# Common columns of machine ("cpu.*", "board.*", "mem.*") are repeated in every row.
+# Output: CSV table + optional record batches in NumPy format (<out>.NNNN.npz, BATCH_ROWS rows per file).
+# Rows are spooled into temporary file, so memory usage does not depend on number of snapshots.
+# Usage:
+#   python imc_batch.py <dir | file> ... [-o fleet] [-j N] [--npz]
+
+BATCH_ROWS = 8192
+SKIP_KEYS = [ 'MCHBAR_SNAPSHOT', 'spd_eeprom' ]
+
+def find_snapshots(paths):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for fn in sorted(files):
+                if fn.lower().endswith('.json'):
+                    yield os.path.join(root, fn)
+
+def flatten(obj, prefix, out):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            key = str(key)
+            if key.startswith('__') or key in SKIP_KEYS:
+                continue
+            flatten(value, prefix + key + '.', out)
+    elif isinstance(obj, (list, tuple)):
+        for idx, value in enumerate(obj):
+            flatten(value, prefix + str(idx) + '.', out)
+    else:
+        out[prefix[:-1]] = int(obj) if isinstance(obj, bool) else obj
+    return out
+
+def load_snapshot(fn):
+    with open(fn, 'r', encoding = 'utf-8') as file:
+        info = json.load(file)
+    if 'mchbar' in info:
+        # dump set: decode MCHBAR without driver
+        import memory
+        from cpuidsdk64.dumpbackend import load_dump_set
+        dump = load_dump_set(fn)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                info = memory.get_mem_info_offline(dump)
+        finally:
+            dump.close()
+    elif 'memory' in info:
+        # saved result: SPD is decoded again from raw EEPROM data
+        from spd_eeprom import spd_eeprom_decode
+        for dimm in info['memory'].get('DIMM', [ ]):
+            if dimm.get('spd_eeprom', None):
+                dimm['SPD'] = spd_eeprom_decode(dimm['spd_eeprom'])
+    else:
+        return None
+    return info
+
+def snapshot_rows(fn, info):
+    base = { 'snapshot': fn }
+    flatten(info.get('cpu', { }), 'cpu.', base)
+    flatten(info.get('board', { }), 'board.', base)
+    mem = info['memory']
+    flatten({ key: value for key, value in mem.items() if key not in [ 'mc', 'DIMM', 'SMBus' ] }, 'mem.', base)
+    rows = [ ]
+    for mc in mem.get('mc', [ ]):
+        ctrl = { key: value for key, value in mc.items() if key != 'channels' }
+        for ch in mc['channels']:
+            row = dict(base)
+            row['kind'] = 'channel'
+            row['controller'] = mc['controller']
+            row['channel'] = ch['__channel']
+            flatten(ctrl, 'mc.', row)
+            flatten({ key: value for key, value in ch.items() if key != 'info' }, 'ch.', row)
+            flatten(ch.get('info', { }), 'tm.', row)
+            rows.append(row)
+    for dimm in mem.get('DIMM', [ ]):
+        row = dict(base)
+        row['kind'] = 'dimm'
+        row['slot'] = dimm.get('slot', None)
+        flatten({ key: value for key, value in dimm.items() if key != 'SPD' }, 'dimm.', row)
+        flatten(dimm.get('SPD', { }), 'spd.', row)
+        rows.append(row)
+    return rows
+
+# worker of process pool: return ( filename, rows, error )
+def analyze_snapshot(fn):
+    try:
+        info = load_snapshot(fn)
+        if info is None:
+            return fn, None, None    # not a snapshot
+        return fn, snapshot_rows(fn, info), None
+    except Exception as e:
+        return fn, None, f'{e.__class__.__name__}: {e}'
+
+class ColumnarWriter():
+    def __init__(self, out_name, with_npz = False):
+        self.out_name = out_name
+        self.with_npz = with_npz
+        self.columns = { }     # name => True for numeric column  (in order of appearance)
+        self.rows = 0
+        self.batches = 0
+        self.spool_fn = out_name + '.spool'
+        self.spool = open(self.spool_fn, 'w', encoding = 'utf-8')
+
+    def add(self, row):
+        for name, value in row.items():
+            numeric = value is None or isinstance(value, (int, float))
+            if name not in self.columns:
+                self.columns[name] = numeric
+            elif not numeric:
+                self.columns[name] = False
+        self.spool.write(json.dumps(row))
+        self.spool.write('\n')
+        self.rows += 1
+
+    def _write_batch(self, names, batch):
+        arrays = { }
+        for name in names:
+            if self.columns[name]:
+                arrays[name] = numpy.array([ row.get(name, None) for row in batch ], dtype = numpy.float64)   # None => NaN
+            else:
+                arrays[name] = numpy.array([ '' if row.get(name, None) is None else str(row[name]) for row in batch ])
+        numpy.savez(f'{self.out_name}.{self.batches:04d}.npz', **arrays)
+        self.batches += 1
+
+    def close(self):
+        self.spool.close()
+        names = list(self.columns.keys())
+        batch = [ ]
+        with open(self.spool_fn, 'r', encoding = 'utf-8') as spool, open(self.out_name + '.csv', 'w', newline = '', encoding = 'utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames = names, restval = '')
+            writer.writeheader()
+            for line in spool:
+                row = json.loads(line)
+                writer.writerow(row)
+                if self.with_npz:
+                    batch.append(row)
+                    if len(batch) >= BATCH_ROWS:
+                        self._write_batch(names, batch)
+                        batch = [ ]
+        if batch:
+            self._write_batch(names, batch)
+        os.remove(self.spool_fn)
+
+def run_batch(paths, out_name = 'fleet', jobs = None, with_npz = False, chunksize = 16):
+    if with_npz and not numpy:
+        raise RuntimeError(f'ERROR: module "numpy" not found')
+    writer = ColumnarWriter(out_name, with_npz)
+    stat = { 'files': 0, 'snapshots': 0, 'errors': 0 }
+    t0 = time.time()
+    with multiprocessing.Pool(processes = jobs) as pool:
+        for fn, rows, error in pool.imap(analyze_snapshot, find_snapshots(paths), chunksize = chunksize):
+            stat['files'] += 1
+            if error:
+                stat['errors'] += 1
+                print(f'ERROR: "{fn}": {error}')
+                continue
+            if rows is None:
+                continue
+            stat['snapshots'] += 1
+            for row in rows:
+                writer.add(row)
+    writer.close()
+    stat['rows'] = writer.rows
+    stat['columns'] = len(writer.columns)
+    stat['batches'] = writer.batches
+    stat['time'] = round(time.time() - t0, 2)
+    return stat
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description = 'Batch analyzer of IMC snapshots')
+    parser.add_argument('paths', nargs = '+', help = 'directories or files (IMC_*.json, MCHBAR dump sets)')
+    parser.add_argument('-o', '--out', default = 'fleet', help = 'output name (without extension)')
+    parser.add_argument('-j', '--jobs', type = int, default = None, help = 'number of worker processes')
+    parser.add_argument('--npz', action = 'store_true', help = 'also write NumPy record batches')
+    args = parser.parse_args()
+    stat = run_batch(args.paths, args.out, args.jobs, args.npz)
+    print(f'Snapshots: {stat["snapshots"]}  rows: {stat["rows"]}  columns: {stat["columns"]}  errors: {stat["errors"]}  time: {stat["time"]} sec')
+    print(f'File "{args.out}.csv" created!')
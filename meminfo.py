@@ -1042,15 +1042,16 @@ class WindowMemory():
         self.current_mc = mc_id
         self.current_ch = ch_id
     
-    def refresh(self, update = True):
+    # force = False : static data (CPUID, SPD EEPROM, board, ...) is taken from cache, timings are re-read
+    def refresh(self, update = True, force = False):
         if update:
             print('Refresh started...')
-        self.update_hardware_info()
+        self.update_hardware_info(force = force)
         if update:
             self.update()
             print('Main window refreshed!')
 
-    def update_hardware_info(self):
+    def update_hardware_info(self, force = False):
         if self.test:
             with open('IMC.json', 'r', encoding='utf-8') as file:
                 self.mem_info = json.load(file)
@@ -1060,7 +1061,8 @@ class WindowMemory():
             if not self.sdk_inited:
                 SdkInit(None, verbose = 0)
                 self.sdk_inited = True
-            self.mem_info = get_mem_spd_all(None, with_pmic = True, allinone = True)
+            hw_cache_clear(HW_SEMI)
+            self.mem_info = get_mem_spd_all(None, with_pmic = True, allinone = True, force = force)
 
     def on_radio_select(self):
         vv = self.vars
@@ -1083,6 +1085,7 @@ class WindowMemory():
         act_menu = tk.Menu(menubar, tearoff = 0, font = font)
         menubar.add_cascade(label = "  Actions  ", menu = act_menu)
         act_menu.add_command(label = "Refresh", font = font, command = self.wnd_menu_refresh)
+        act_menu.add_command(label = "Full refresh", font = font, command = self.wnd_menu_full_refresh)
         act_menu.add_command(label = "MLC tool", font = font, command = self.wnd_menu_mlc)
 
         info_menu = tk.Menu(menubar, tearoff = 0, font = font)
@@ -1096,6 +1099,9 @@ class WindowMemory():
     
     def wnd_menu_refresh(self):
         self.refresh()
+
+    def wnd_menu_full_refresh(self):
+        self.refresh(force = True)
         
     def wnd_menu_about(self):
         AboutDialog(self.root, appver)
@@ -12,6 +12,11 @@ from ctypes import byref
 from types import SimpleNamespace
 import json
 import enum
+import io
+import importlib
+import atexit
+import contextlib
+import concurrent.futures
 
 __author__ = 'remittor'
 
@@ -25,7 +30,7 @@ from hardware import *
 # DOC: 15th Generation Intel® Core™ Ultra 200S and 200HX Series Processors CFG & MEM Registers
 # ref: https://edc.intel.com/output/DownloadCrifOutput?id=510
 
-cpu_id = get_cpu_id()
+cpu_id = get_cpu_id() if gcpuid else None
 MCHBAR_BASE = None
 DMIBAR_BASE = None
 gdict = { }
@@ -47,8 +52,27 @@ TREFIMIN_DDR4   = 7800000   # Average periodic refresh interval, in picoseconds
 TREFIMIN_DDR5   = 1950000   # Average periodic refresh interval, in picoseconds (1.95 us for DDR5)
 TREFIMULTIPLIER = 1000      # tREFI value defined in XMP 1.3 spec is actually in thousands of MTB units. 
 
-g_fake_cpu_id = None
-g_fake_mchbar = None
+# Register decoders of memory controller are placed into separate modules (one module per CPU family).
+# Decoder module is imported on first use, new family requires only new module and register_mem_decoder() call.
+g_mem_decoders = { }         # cpu_id => module name
+g_mem_decoder_mods = { }     # module name => module
+
+def register_mem_decoder(module_name, cpu_list):
+    for cpu in cpu_list:
+        g_mem_decoders[cpu] = module_name
+
+register_mem_decoder('memory_adl', i12_FAM)   # Alder Lake / Raptor Lake / Meteor Lake
+register_mem_decoder('memory_arl', i15_FAM)   # Arrow Lake
+
+def get_mem_decoder(cpu_id):
+    module_name = g_mem_decoders.get(cpu_id, None)
+    if not module_name:
+        raise RuntimeError(f'ERROR: Processor model 0x{cpu_id:X} not supported')
+    mod = g_mem_decoder_mods.get(module_name, None)
+    if mod is None:
+        mod = importlib.import_module(module_name)
+        g_mem_decoder_mods[module_name] = mod
+    return mod
 
 SA_MC_BUS = 0
 SA_MC_DEV = 0
@@ -57,18 +81,158 @@ MCHBAR_ADDR_REG = 0x48
 MCHBAR_ADDR_MASK = 0xFFFFFFFE
 
 
+MCHBAR_SIZE = 0x10000 * 3
+
+g_mchbar = None   # PhyMemWindow of MCHBAR (mapped once per session)
+
+def is_offline():
+    backend = get_backend()
+    return True if backend and backend.offline else False
+
+def get_mchbar_window():
+    global g_mchbar, MCHBAR_BASE
+    if not MCHBAR_BASE:
+        return None
+    if g_mchbar is not None:
+        if g_mchbar and not g_mchbar.closed and g_mchbar.phy_addr == MCHBAR_BASE:
+            return g_mchbar
+        if g_mchbar is False and is_phymem_windows_enabled():
+            return None   # mapping is not supported
+    g_mchbar = phymem_map_window(MCHBAR_BASE, MCHBAR_SIZE)
+    if not g_mchbar:
+        g_mchbar = False if is_phymem_windows_enabled() else None
+    return g_mchbar
+
+# Snapshot of MCHBAR registers used by get_mem_info.
+# Requested regions are merged into one bulk read per 4 KB page, all regions are readed before decoding,
+# and the decoders read registers from this buffer. Raw data is saved into result (key "MCHBAR_SNAPSHOT").
+
+MCHBAR_PAGE_SIZE = 0x1000
+
+MCHBAR_SNAPSHOT_REGIONS = [    # ( offset, size )
+    ( 0x58F0, 4 ),       # Package RAPL Performance Status
+    ( 0x5918, 8 ),       # System Agent Performance Status
+    ( 0x5920, 0x10 ),    # Turbo Policy / Plane Energy Status
+    ( 0x5938, 8 ),       # Package Power SKU Unit / Package Energy Status
+    ( 0x597C, 4 ),
+    ( 0x5F58, 0x10 ),    # MC_TIMING_RUNTIME_OC / BCLK_FREQ
+    ( 0x2C30, 4 ),       # DDRPHY_COMP_CR_VCCDDQLDO_DVFSCOMP_CTRL0  (used by get_undoc_params)
+    ( 0x2C54, 4 ),       # DDRPHY_COMP_CR_DLLCOMP_VDLLCTRL
+    ( 0x3CA0, 4 ),       # DDRPHY_COMP_NEW_CR_VSSHICOMP_CTRL2
+    ( 0x84A0, 4 ),       # DATA0CH0_CR_DQSTXRXCTL
+]
+
+MCHBAR_SNAPSHOT_CTRL_REGIONS = [    # ( offset, size ) for every controller (MCHBAR + 0x10000 * ctrl_num)
+    ( 0xD800, 0x14 ),    # Inter-Channel / Intra-Channel Decode Parameters / DIMM Characteristics
+    ( 0xE000, 0x800 * 2 ),   # MC channel registers
+]
+
+class MchbarSnapshot():
+    def __init__(self, base, regions = None):
+        self.base = base
+        self.regions = [ ]     # [ ( offset, bytes ) ]  sorted by offset
+        if regions:
+            self.regions = sorted(regions, key = lambda item: item[0])
+
+    def __repr__(self):
+        return f'<MchbarSnapshot:0x{self.base:X}: regions = {len(self.regions)}, size = 0x{self.size:X}>'
+
+    @property
+    def size(self):
+        return sum([ len(data) for offset, data in self.regions ])
+
+    # merge list of ( offset, size ) into minimal list of contiguous reads (one read per page)
+    @staticmethod
+    def plan(ranges, page_size = MCHBAR_PAGE_SIZE):
+        pages = { }
+        for offset, size in ranges:
+            pos = offset
+            end = offset + size
+            while pos < end:
+                page = pos & ~(page_size - 1)
+                chunk_end = min(end, page + page_size)
+                beg0, end0 = pages.get(page, ( pos, chunk_end ))
+                pages[page] = ( min(beg0, pos), max(end0, chunk_end) )
+                pos = chunk_end
+        out = [ ]
+        for page in sorted(pages.keys()):
+            beg, end = pages[page]
+            if out and out[-1][0] + out[-1][1] == beg:
+                out[-1] = ( out[-1][0], out[-1][1] + end - beg )    # adjacent pages are readed by one request
+            else:
+                out.append( ( beg, end - beg ) )
+        return out
+
+    def acquire(self, ranges):
+        self.regions = [ ]
+        for offset, size in self.plan(ranges):
+            data = phymem_read(self.base + offset, size)
+            if not data or len(data) != size:
+                raise RuntimeError(f'ERROR: cannot read MCHBAR region 0x{offset:X} (size = 0x{size:X})')
+            self.regions.append( ( offset, bytes(data) ) )
+        return len(self.regions)
+
+    def contains(self, addr, size = 1):
+        return self.read(addr, size) is not None
+
+    def read(self, addr, size):
+        pos = addr - self.base
+        for offset, data in self.regions:
+            if pos >= offset and pos + size <= offset + len(data):
+                return data[pos-offset:pos-offset+size]
+        return None
+
+    def to_dict(self):
+        return { 'base': self.base, 'regions': { f'0x{offset:05X}': data.hex() for offset, data in self.regions } }
+
+    @staticmethod
+    def from_dict(snap):
+        regions = [ ( int(offset, 16), bytes.fromhex(data) ) for offset, data in snap['regions'].items() ]
+        return MchbarSnapshot(snap['base'], regions)
+
+g_mchbar_snapshot = None
+
+def get_mchbar_snapshot_ranges(with_common = True, with_ctrl = True):
+    ranges = [ ]
+    if with_common:
+        ranges += list(MCHBAR_SNAPSHOT_REGIONS) + list(get_mem_decoder(cpu_id).MCHBAR_REGIONS)
+    if with_ctrl:
+        for ctrl_num in range(0, 2):
+            ranges += [ ( 0x10000 * ctrl_num + offset, size ) for offset, size in MCHBAR_SNAPSHOT_CTRL_REGIONS ]
+    return ranges
+
+def acquire_mchbar_snapshot(ranges = None):
+    global g_mchbar_snapshot, MCHBAR_BASE
+    g_mchbar_snapshot = None
+    if ranges is None:
+        ranges = get_mchbar_snapshot_ranges()
+    snap = MchbarSnapshot(MCHBAR_BASE)
+    snap.acquire(ranges)
+    g_mchbar_snapshot = snap
+    return snap
+
 def phymem_read(addr, size, out_decimal = False):
     import cpuidsdk64
-    global g_fake_mchbar
-    if g_fake_mchbar and MCHBAR_BASE and addr >= MCHBAR_BASE and addr + size < MCHBAR_BASE + len(g_fake_mchbar):
-        pos = addr - MCHBAR_BASE
-        data = g_fake_mchbar[pos:pos+size]
+    if g_mchbar_snapshot:
+        data = g_mchbar_snapshot.read(addr, size)
+        if data is not None:
+            return int.from_bytes(data, 'little') if out_decimal else data
+    win = get_mchbar_window()
+    if win and win.contains(addr, size):
+        data = win.read(addr - win.phy_addr, size)
         return int.from_bytes(data, 'little') if out_decimal else data
     return cpuidsdk64.phymem_read(addr, size, out_decimal)
 
 def MrcReadCR(offset, size = 4):
     if size != 4 and size != 8:
         raise NotImplementedError()
+    if g_mchbar_snapshot and MCHBAR_BASE:
+        data = g_mchbar_snapshot.read(MCHBAR_BASE + offset, size)
+        if data is not None:
+            return int.from_bytes(data, 'little')
+    win = get_mchbar_window()
+    if win and win.contains(win.phy_addr + offset, size):
+        return win.read_u4(offset) if size == 4 else win.read_u8(offset)
     val = phymem_pc_read64(0, 0, 0, MCHBAR_ADDR_REG, MCHBAR_ADDR_MASK, offset)
     if val is None:
         return None
@@ -77,16 +241,59 @@ def MrcReadCR(offset, size = 4):
     return val
 
 def MrcWriteCR(offset, value):
+    win = get_mchbar_window()
+    if win and win.contains(win.phy_addr + offset, 4):
+        return win.write_u4(offset, value)
     rc = phymem_pc_write32(0, 0, 0, MCHBAR_ADDR_REG, MCHBAR_ADDR_MASK, offset, value & 0xFFFFFFFF)
     if not rc:
         print(f'ERROR: MrcWriteCR(0x{offset:X}): cannot write data to MCHBAR!')
         return False
     return True
 
-def get_mchbar_info(info, controller, channel):
+# Register layouts of MC channel window (MCHBAR + 0xE000 + 0x800 * channel), common for all supported families
+
+IMC_TURNAROUND = RegLayout([
+    ( "tRDRD_sg", 0x00C, 0, 6 ),
+    ( "tRDRD_dg", 0x00C, 8, 14 ),
+    ( "tRDRD_dr", 0x00C, 16, 23 ),
+    ( "tRDRD_dd", 0x00C, 24, 31 ),
+    ( "tRDWR_sg", 0x010, 0, 7 ),
+    ( "tRDWR_dg", 0x010, 8, 15 ),
+    ( "tRDWR_dr", 0x010, 16, 23 ),
+    ( "tRDWR_dd", 0x010, 24, 31 ),
+    ( "tWRRD_sg", 0x014, 0, 8 ),
+    ( "tWRRD_dg", 0x014, 9, 17 ),
+    ( "tWRRD_dr", 0x014, 18, 24 ),
+    ( "tWRRD_dd", 0x014, 25, 31 ),
+    ( "tWRWR_sg", 0x018, 0, 6 ),
+    ( "tWRWR_dg", 0x018, 8, 14 ),
+    ( "tWRWR_dr", 0x018, 16, 22 ),
+    ( "tWRWR_dd", 0x018, 24, 31 ),
+])
+
+IMC_RTL = RegLayout([
+    ( "tRTL_0", 0x020, 0, 7 ),
+    ( "tRTL_1", 0x020, 8, 15 ),
+    ( "tRTL_2", 0x020, 16, 23 ),
+    ( "tRTL_3", 0x020, 24, 31 ),
+])
+
+IMC_ODT_MATRIX = RegLayout([   # enabled using SC_GS_CFG_0_0_0_MCHBAR.enable_odt_matrix
+    ( "READ_RANK_0", 0x080, 0, 3 ),
+    ( "READ_RANK_1", 0x080, 4, 7 ),
+    ( "READ_RANK_2", 0x080, 8, 11 ),
+    ( "READ_RANK_3", 0x080, 12, 15 ),
+    ( "WRITE_RANK_0", 0x080, 16, 19 ),
+    ( "WRITE_RANK_1", 0x080, 20, 23 ),
+    ( "WRITE_RANK_2", 0x080, 24, 27 ),
+    ( "WRITE_RANK_3", 0x080, 28, 31 ),
+])
+
+def get_mchbar_info(info, controller, channel, with_undoc = True):
     global gdict, gcpuinfo, cpu_id, MCHBAR_BASE 
     MCHBAR_addr = MCHBAR_BASE + (0x10000 * controller)
     tm = { }    
+    dec = get_mem_decoder(cpu_id)
     if True:
         MC_REGS_OFFSET = 0xE000
         MC_REGS_SIZE = 0x800
@@ -94,79 +301,11 @@ def get_mchbar_info(info, controller, channel):
         data = phymem_read(MCHBAR_addr + offset, MC_REGS_SIZE)
         tm["__channel"] = channel
         
-        IMC_CR_TC_CAS = 0x070     # CAS timing parameters
-        tm["tCL"] = get_bits(data, IMC_CR_TC_CAS, 16, 22)
-        tm["tCWL"] = get_bits(data, IMC_CR_TC_CAS, 24, 31)
-        if cpu_id in i15_FAM:
-            tm["tCCD_32_byte_CAS_delta"] = get_bits(data, IMC_CR_TC_CAS, 0, 5)
-            
-        IMC_CR_TC_PRE = 0         # Timing constraints to PRE commands
-        tm["tRP"] = get_bits(data, IMC_CR_TC_PRE, 0, 7)
-        if cpu_id in i12_FAM:
-            tm["tRPab_ext"] = get_bits(data, IMC_CR_TC_PRE, 8, 12)
-            tm["tRDPRE"] = get_bits(data, IMC_CR_TC_PRE, 13, 19)
-            tm["tPPD"] = get_bits(data, IMC_CR_TC_PRE, 20, 23)
-            tm["tRCDW"] = get_bits(data, IMC_CR_TC_PRE, 24, 31)
-            tm["tWRPRE"] = get_bits(data, IMC_CR_TC_PRE, 32, 41)
-            tm["tRAS"] = get_bits(data, IMC_CR_TC_PRE, 42, 50)
-            tm["tRCD"] = get_bits(data, IMC_CR_TC_PRE, 51, 58)
-            tm["DERATING_EXT"] = get_bits(data, IMC_CR_TC_PRE, 59, 62)
-        if cpu_id in i15_FAM:
-            tm["tRPab_ext"] = get_bits(data, IMC_CR_TC_PRE, 10, 17)
-            tm["tRDPRE"] = get_bits(data, IMC_CR_TC_PRE, 20, 26)
-            tm["tPPD"] = get_bits(data, IMC_CR_TC_PRE, 28, 31)
-            tm["tWRPRE"] = get_bits(data, IMC_CR_TC_PRE, 33, 42)
-            tm["tRAS"] = get_bits(data, IMC_CR_TC_PRE, 45, 53)
-            tm["DERATING_EXT"] = get_bits(data, IMC_CR_TC_PRE, 59, 62)
-        
-        if cpu_id in i12_FAM:
-            IMC_REFRESH_TC = 0x43C     # Refresh timing parameters
-            tm["tREFI"] = get_bits(data, IMC_REFRESH_TC, 0, 17)
-            tm["tRFC"]  = get_bits(data, IMC_REFRESH_TC, 18, 30)
-            tm["tRFC2"] = None
-            tm["tRFC4"] = None
-        if cpu_id in i15_FAM:
-            IMC_REFRESH_TC = 0x4A0     # Refresh timing parameters
-            tm["tREFI"]    = get_bits(data, IMC_REFRESH_TC, 0, 17)
-            tm["tRFC"]     = get_bits(data, IMC_REFRESH_TC, 18, 30)
-            tm["tRFC2"] = None
-            tm["tRFC4"] = None
-            tm["tREFIx9"]  = get_bits(data, IMC_REFRESH_TC, 32, 39)
-            tm["tRFCpb"]   = get_bits(data, IMC_REFRESH_TC, 40, 50)
-            tm["tREFSBRD"] = get_bits(data, IMC_REFRESH_TC, 51, 58)
-        
-        IMC_REFRESH_AUX = 0x438
-        tm["oref_ri"]  = get_bits(data, IMC_REFRESH_AUX, 0, 7)
-        tm["REFRESH_HP_WM"]  = get_bits(data, IMC_REFRESH_AUX, 8, 11)
-        tm["REFRESH_PANIC_WM"]  = get_bits(data, IMC_REFRESH_AUX, 12, 15)
-        if cpu_id in i12_FAM:
-            tm["COUNTTREFIWHILEREFENOFF"]  = get_bits(data, IMC_REFRESH_AUX, 16, 16)
-            tm["HPREFONMRS"]  = get_bits(data, IMC_REFRESH_AUX, 17, 17)
-            tm["SRX_REF_DEBITS"]  = get_bits(data, IMC_REFRESH_AUX, 18, 19)
-            tm["RAISE_BLK_WAIT"]  = get_bits(data, IMC_REFRESH_AUX, 20, 23)
-            tm["tREFIx9"]  = get_bits(data, IMC_REFRESH_AUX, 24, 31)   # Should be programmed to 8 * tREFI / 1024 (to allow for possible delays from ZQ or ISOC).
-        if cpu_id in i12_FAM:
-            IMC_REFRESH_EXT = 0x488
-            tm["PBR_DISABLE"]  = get_bits(data, IMC_REFRESH_EXT, 0, 0)
-            tm["PBR_OOO_DIS"]  = get_bits(data, IMC_REFRESH_EXT, 1, 1)
-            tm["PBR_DISABLE_ON_HOT"]  = get_bits(data, IMC_REFRESH_EXT, 3, 3)
-            tm["PBR_EXIT_ON_IDLE_CNT"]  = get_bits(data, IMC_REFRESH_EXT, 4, 9)
-            tm["tRFCpb"]   = get_bits(data, IMC_REFRESH_EXT, 10, 20)
-        
-        tm["tRFM"]     = get_bits(data, 0x40C, 0, 10)    # Default is same as tRFCpb
-        if cpu_id in i12_FAM:
-            IMC_CR_TC_ACT = 0x008     # Timing constraints to ACT commands
-            tm["tFAW"]     = get_bits(data, IMC_CR_TC_ACT, 0, 8)
-            tm["tRRD_sg"]  = get_bits(data, IMC_CR_TC_ACT, 9, 14)
-            tm["tRRD_dg"]  = get_bits(data, IMC_CR_TC_ACT, 15, 21)
-            tm["tREFSBRD"] = get_bits(data, IMC_CR_TC_ACT, 24, 31)
-        if cpu_id in i15_FAM:
-            IMC_CR_TC_ACT = 0x138     # Timing constraints to ACT commands
-            tm["tFAW"]     = get_bits(data, IMC_CR_TC_ACT, 0, 8)
-            tm["tRRD_sg"]  = get_bits(data, IMC_CR_TC_ACT, 9, 14)
-            tm["tRRD_dg"]  = get_bits(data, IMC_CR_TC_ACT, 15, 21)
-            tm["tRCD"]     = get_bits(data, IMC_CR_TC_ACT, 22, 29)
-            tm["tRCDW"]    = get_bits(data, IMC_CR_TC_ACT, 32, 39)
+        dec.MC_TIMING.decode(data, out = tm)
+        tm["tRFC2"] = None
+        tm["tRFC4"] = None
+        dec.MC_REFRESH.decode(data, out = tm)
+
         tm["tRRD"] = None
         tm["tRRD_L"] = None
         tm["tRRD_S"] = None
@@ -178,93 +317,12 @@ def get_mchbar_info(info, controller, channel):
             tm["tRRD"]   = tm["tRRD_sg"]
             tm["tRRD_L"] = tm["tRRD_sg"]
         
-        IMC_TC_PWDEN = 0x050     # Power Down Timing
-        tm["tCKE"] = get_bits(data, IMC_TC_PWDEN, 0, 6)
-        tm["tXP"] = get_bits(data, IMC_TC_PWDEN, 7, 13)
-        if cpu_id in i12_FAM:
-            tm["tXPDLL"] = get_bits(data, IMC_TC_PWDEN, 14, 20)
-            tm["tRDPDEN"] = get_bits(data, IMC_TC_PWDEN, 21, 28)
-            tm["tWRPDEN"] = get_bits(data, IMC_TC_PWDEN, 32, 41)
-            tm["tCSH"] = get_bits(data, IMC_TC_PWDEN, 42, 47)
-            tm["tCSL"] = get_bits(data, IMC_TC_PWDEN, 48, 53)
-            tm["tPRPDEN"] = get_bits(data, IMC_TC_PWDEN, 59, 63)
-        if cpu_id in i15_FAM:
-            tm["tCPDED"] = get_bits(data, IMC_TC_PWDEN, 14, 18)
-            tm["tRDPDEN"] = get_bits(data, IMC_TC_PWDEN, 19, 26)
-            tm["tWRPDEN"] = get_bits(data, IMC_TC_PWDEN, 27, 36)
-            tm["tCKCKEH"] = get_bits(data, IMC_TC_PWDEN, 37, 41)
-            tm["tCSH"] = get_bits(data, IMC_TC_PWDEN, 42, 47)
-            tm["tCSL"] = get_bits(data, IMC_TC_PWDEN, 48, 53)
-            tm["tCACSH "] = get_bits(data, IMC_TC_PWDEN, 54, 58)
-            tm["tPRPDEN"] = get_bits(data, IMC_TC_PWDEN, 59, 63)
+        dec.MC_CONFIG.decode(data, out = tm)
+        dec.decode_config(tm)
         
-        IMC_SC_GS_CFG = 0x088   # Scheduler configuration
-        if cpu_id in i12_FAM:
-            tm["CMD_STRETCH"] = get_bits(data, IMC_SC_GS_CFG, 3, 4)
-            CR_map = { 0: "1N", 1: '2N', 2: '3N', 3: "N:1" }
-            tm["tCR"] = CR_map[tm["CMD_STRETCH"]]
-            tm["N_TO_1_RATIO"] = get_bits(data, IMC_SC_GS_CFG, 5, 7)
-            tm["ADDRESS_MIRROR"] = get_bits(data, IMC_SC_GS_CFG, 8, 11)
-            tm["GEAR4"] = get_bits(data, IMC_SC_GS_CFG, 15, 15)
-            tm["NO_GEAR4_PARAM_DIVIDE"] = get_bits(data, IMC_SC_GS_CFG, 16, 16)
-            tm["X8_DEVICE"] = get_bits(data, IMC_SC_GS_CFG, 28, 29)
-            tm["NO_GEAR2_PARAM_DIVIDE"] = get_bits(data, IMC_SC_GS_CFG, 30, 30)
-            tm["GEAR2"] = get_bits(data, IMC_SC_GS_CFG, 31, 31)
-            tm["DDR_1DPC_SPLIT_RANKS_ON_SUBCH"] = get_bits(data, IMC_SC_GS_CFG, 32, 33)
-            tm["WRITE0_ENABLE"] = get_bits(data, IMC_SC_GS_CFG, 49, 49)
-            tm["WCKDIFFLOWINIDLE"] = get_bits(data, IMC_SC_GS_CFG, 54, 54)
-            tm["tCPDED"] = get_bits(data, IMC_SC_GS_CFG, 56, 60)
-        if cpu_id in i15_FAM:
-            tm["CMD_STRETCH"] = get_bits(data, IMC_SC_GS_CFG, 3)
-            tm["tCR"] = '1N' if tm["CMD_STRETCH"] == 0 else '2N'
-            tm["ADDRESS_MIRROR"] = get_bits(data, IMC_SC_GS_CFG, 8, 11)
-            tm["NO_GEAR4_PARAM_DIVIDE"] = get_bits(data, IMC_SC_GS_CFG, 16, 16)
-            tm["NO_GEAR2_PARAM_DIVIDE"] = get_bits(data, IMC_SC_GS_CFG, 30, 30)
-            tm["GEAR"] = 2 if get_bits(data, IMC_SC_GS_CFG, 31) == 0 else 4
-            tm["DDR_1DPC_SPLIT_RANKS_ON_SUBCH"] = get_bits(data, IMC_SC_GS_CFG, 32, 33)
-            tm["WRITE0_ENABLE"] = get_bits(data, IMC_SC_GS_CFG, 49, 49)
-            tm["WCKDIFFLOWINIDLE"] = get_bits(data, IMC_SC_GS_CFG, 54, 54)
-        
-        if cpu_id in i12_FAM:
-            tm["ALLOW_2CYC_B2B_LPDDR"] = get_bits(data, 0x00C, 7, 7)
-        
-        tm["tRDRD_sg"] = get_bits(data, 0x00C, 0, 6)
-        tm["tRDRD_dg"] = get_bits(data, 0x00C, 8, 14)
-        tm["tRDRD_dr"] = get_bits(data, 0x00C, 16, 23)
-        tm["tRDRD_dd"] = get_bits(data, 0x00C, 24, 31)
-        
-        tm["tRDWR_sg"] = get_bits(data, 0x010, 0, 7)
-        tm["tRDWR_dg"] = get_bits(data, 0x010, 8, 15)
-        tm["tRDWR_dr"] = get_bits(data, 0x010, 16, 23)
-        tm["tRDWR_dd"] = get_bits(data, 0x010, 24, 31)
-        
-        tm["tWRRD_sg"] = get_bits(data, 0x014, 0, 8)
-        tm["tWRRD_dg"] = get_bits(data, 0x014, 9, 17)
-        tm["tWRRD_dr"] = get_bits(data, 0x014, 18, 24)
-        tm["tWRRD_dd"] = get_bits(data, 0x014, 25, 31)
-
-        tm["tWRWR_sg"] = get_bits(data, 0x018, 0, 6)
-        tm["tWRWR_dg"] = get_bits(data, 0x018, 8, 14)
-        tm["tWRWR_dr"] = get_bits(data, 0x018, 16, 22)
-        tm["tWRWR_dd"] = get_bits(data, 0x018, 24, 31)
-
-        if cpu_id in i12_FAM:   # Self-Refresh Timing Parameters
-            tm["tXSDLL"]  = get_bits(data, 0x440, 0, 12)
-            tm["tZQOPER"] = get_bits(data, 0x440, 16, 23)   # UNDOC
-            tm["tMOD"]    = get_bits(data, 0x440, 24, 31)   # UNDOC
-
-        if cpu_id in i12_FAM:   # Self-Refresh Exit Timing Parameters 
-            tm["tXSR"]    = get_bits(data, 0x4C0, 0, 12)
-            tm["tSR"]     = get_bits(data, 0x4C0, 52, 57)
-        if cpu_id in i15_FAM:   # Self-Refresh Exit Timing Parameters 
-            tm["tXSR"]    = get_bits(data, 0x4C0, 0, 12)
-            tm["tSR"]     = get_bits(data, 0x4C0, 45, 50)
-            tm["tXSDLL"]  = get_bits(data, 0x4C0, 51, 63)
-        
-        if cpu_id in i12_FAM:
-            tm["DEC_tCWL"] = get_bits(data, 0x478, 0, 5)   # The number of cycles (DCLK) decreased from tCWL.
-            tm["ADD_tCWL"] = get_bits(data, 0x478, 6, 11)  # The number of cycles (DCLK) increased to tCWL.
-            tm["ADD_1QCLK_DELAY"] = get_bits(data, 0x478, 12, 12)  # In Gear2, MC QCLK is actually 1xClk of the DDR, the regular MC register can only set even number of cycles (working in Dclk == 2 * 1xClk)
+        IMC_TURNAROUND.decode(data, out = tm)
+
+        dec.MC_SELF_REFRESH.decode(data, out = tm)
 
         if 'GEAR' not in tm:
             if tm['GEAR4']:
@@ -274,52 +332,59 @@ def get_mchbar_info(info, controller, channel):
             else:
                 tm['GEAR'] = 1
 
-        tm["tRTL_0"] = get_bits(data, 0x020, 0, 7)
-        tm["tRTL_1"] = get_bits(data, 0x020, 8, 15)
-        tm["tRTL_2"] = get_bits(data, 0x020, 16, 23)
-        tm["tRTL_3"] = get_bits(data, 0x020, 24, 31)
-
-        if cpu_id in i12_FAM: # ref: ICÈ_TÈA_BIOS  (leaked BIOS sources)  # file "MrcMcRegisterStructAdlExxx.h"
-            tm["enable_odt_matrix"] = get_bits(data, IMC_SC_GS_CFG, 24)
-            IMC_CR_TC_ODT = 0x070
-            tm["ODT_read_duration"] = get_bits(data, IMC_CR_TC_ODT, 0, 3)
-            tm["ODT_Read_Delay"] = get_bits(data, IMC_CR_TC_ODT, 4, 7)
-            tm["ODT_write_duration"] = get_bits(data, IMC_CR_TC_ODT, 8, 11)
-            tm["ODT_Write_Delay"] = get_bits(data, IMC_CR_TC_ODT, 12, 15)
-            tm["tAONPD"] = get_bits(data, IMC_CR_TC_ODT, 32, 37)
-            tm["Write_Early_ODT"] = get_bits(data, IMC_CR_TC_ODT, 38)
-            tm["PtrSep"] = get_bits(data, IMC_CR_TC_ODT, 39, 40)
-            IMC_MISC_ODT = 0x0B4
-            tm["ODT_Override"] = get_bits(data, IMC_MISC_ODT, 0, 3)
-            tm["ODT_On"] = get_bits(data, IMC_MISC_ODT, 16, 19)
-            tm["MPR_Train_DDR_On"] = get_bits(data, IMC_MISC_ODT, 31)
+        IMC_RTL.decode(data, out = tm)
+
+        dec.MC_ODT.decode(data, out = tm)
         
-        IMC_ODT_Matrix = 0x080 # enabled using SC_GS_CFG_0_0_0_MCHBAR.enable_odt_matrix
-        tm["READ_RANK_0"] = get_bits(data, IMC_ODT_Matrix, 0, 3)
-        tm["READ_RANK_1"] = get_bits(data, IMC_ODT_Matrix, 4, 7)
-        tm["READ_RANK_2"] = get_bits(data, IMC_ODT_Matrix, 8, 11)
-        tm["READ_RANK_3"] = get_bits(data, IMC_ODT_Matrix, 12, 15)
-        tm["WRITE_RANK_0"] = get_bits(data, IMC_ODT_Matrix, 16, 19)
-        tm["WRITE_RANK_1"] = get_bits(data, IMC_ODT_Matrix, 20, 23)
-        tm["WRITE_RANK_2"] = get_bits(data, IMC_ODT_Matrix, 24, 27)
-        tm["WRITE_RANK_3"] = get_bits(data, IMC_ODT_Matrix, 28, 31)
+        IMC_ODT_MATRIX.decode(data, out = tm)
         
+        IMC_SC_GS_CFG = 0x088   # Scheduler configuration
         tm["DRAM_technology"] = get_bits(data, IMC_SC_GS_CFG, 0, 2)  # UNDOC !!!
 
         get_mrs_storage(data, tm, info, controller, channel)
-        get_undoc_params(tm, info, controller, channel)
-    else:
-        raise RuntimeError(f'ERROR: Processor model 0x{cpu_id:X} not supported')
+        if with_undoc:
+            get_undoc_params(tm, info, controller, channel)
     return tm
+
+# Decoding of one channel is pure Python (GIL bound), so threads do not speed up single snapshot.
+# Many snapshots are decoded in parallel by processes (see get_mem_info_offline_all and imc_batch.py).
+g_decode_workers = 0    # number of threads for decoding of MC channels (0 = serial decoding)
+g_decode_pool = None    # ( workers, ThreadPoolExecutor ) created once and reused by next calls
+
+def get_decode_pool():
+    global g_decode_pool
+    if g_decode_pool and g_decode_pool[0] != g_decode_workers:
+        decode_pool_close()
+    if not g_decode_pool:
+        g_decode_pool = ( g_decode_workers, concurrent.futures.ThreadPoolExecutor(max_workers = g_decode_workers) )
+    return g_decode_pool[1]
+
+def decode_pool_close():
+    global g_decode_pool
+    if g_decode_pool:
+        g_decode_pool[1].shutdown()
+    g_decode_pool = None
+
+atexit.register(decode_pool_close)
+
+# decode list of channels [ ( info, controller, channel ) ] and return list of results in same order
+# Registers must be captured before (see acquire_mchbar_snapshot), so workers only decode memory buffers.
+# get_undoc_params updates gdict['memory'] and may use mailboxes, therefore it is called serially after decoding.
+def decode_mem_channels(jobs, with_undoc = True):
+    jobs = list(jobs)
+    if g_decode_workers and len(jobs) > 1:
+        res = list(get_decode_pool().map(lambda job: get_mchbar_info(*job, with_undoc = False), jobs))
+    else:
+        res = [ get_mchbar_info(*job, with_undoc = False) for job in jobs ]
+    if with_undoc:
+        for job, tm in zip(jobs, res):
+            get_undoc_params(tm, *job)
+    return res
     
 def get_undoc_params(tm, info, controller, channel):
     global gdict, gcpuinfo, cpu_id
     mem = gdict['memory']
-    mem_speed = 0
-    if cpu_id in i12_FAM:
-        mem_speed = mem['SA']['QCLK_FREQ'] * 2   # MT/s
-    if cpu_id in i15_FAM:
-        mem_speed = mem['QCLK_FREQ'] * 2
+    mem_speed = get_mem_decoder(cpu_id).get_qclk_freq(mem) * 2   # MT/s
     mem["Speed"] = round(mem_speed, 2)
     mem["tCKmin"] = None
     # ref: ICÈ_TÈA_BIOS  (leaked BIOS sources)  # file "MrcInterface.h"
@@ -465,9 +530,10 @@ def get_undoc_params(tm, info, controller, channel):
         try:
             VccIO = gdict['MSR']['BIOS']['VccIO']
         except KeyError:
-            import biosbox
-            bmb = biosbox.BiosMailBox()
-            VccIO = bmb.get_vccio_value()
+            if not is_offline():   # BIOS mailbox is not available for dumps
+                import biosbox
+                bmb = biosbox.BiosMailBox()
+                VccIO = bmb.get_vccio_value()
         mem['VccIO'] = VccIO
 
     if True:
@@ -519,6 +585,7 @@ def get_undoc_params(tm, info, controller, channel):
 
 # -----------------------------------------------------------------------------------------------------------
 
+@lut_decoder(8)
 def OdtDecode(value):
     if value == 0:
         return 0   # Disabled, Reset default
@@ -526,6 +593,7 @@ def OdtDecode(value):
     RZQ_list = [ '', 'RZQ/1', 'RZQ/2', 'RZQ/3', 'RZQ/4', 'RZQ/5', 'RZQ/6', 'RZQ/7' ]
     return Ohm_list[value] if value < len(Ohm_list) else None
 
+@lut_decoder(8)
 def CccOdtDecode(value):
     if value == 0:
         return 0   # Disabled, Reset default
@@ -536,10 +604,12 @@ def CccOdtDecode(value):
 def VrefPercentDecode(index):  # ref: ICÈ_TÈA_BIOS enum DDR5_MR10_VREF
     return 97.5 - index / 2
 
+@lut_decoder(4)
 def DDR5_ImpedanceDecode(value):
     val_list = [ 34, 40, 48 ]
     return val_list[value] if value < len(val_list) else None
 
+@lut_decoder(256)
 def DDR5_MR0_decode(value):
     res = { }
     BL_map = [ 'BL16', 'BC8 OTF', 'BL32', 'BL32 OTF' ]
@@ -547,6 +617,7 @@ def DDR5_MR0_decode(value):
     res['CasLatency'] = 22 + 2 * get_bits(value, 0, 2, 6)
     return res
 
+@lut_decoder(256)
 def DDR5_MR2_decode(value):
     res = { }
     res['ReadPreambleTraining']  = get_bits(value, 0, 0)
@@ -558,6 +629,7 @@ def DDR5_MR2_decode(value):
     res['InternalWriteTiming']   = get_bits(value, 0, 7)
     return res
 
+@lut_decoder(256)
 def DDR5_MR4_decode(value):
     res = { }
     res['RefreshRate'] = get_bits(value, 0, 0, 2)
@@ -565,6 +637,7 @@ def DDR5_MR4_decode(value):
     res['Tuf'] = get_bits(value, 0, 7)
     return res
 
+@lut_decoder(256)
 def DDR5_MR5_decode(value):
     res = { }
     res['DataOutputDisable'] = get_bits(value, 0, 0)
@@ -575,6 +648,7 @@ def DDR5_MR5_decode(value):
     res['PullDownOutputDriverImpedance'] = DDR5_ImpedanceDecode(get_bits(value, 0, 6, 7))
     return res
 
+@lut_decoder(256)
 def DDR5_MR6_decode(value):
     RTP_map = [ 12, 14, 15, 17, 18, 20, 21, 23, 24, None, None, None, None, None, None, None ]
     res = { }
@@ -582,6 +656,7 @@ def DDR5_MR6_decode(value):
     res['tRTP'] = RTP_map[get_bits(value, 0, 4, 7)]
     return res
 
+@lut_decoder(256)
 def DDR5_MR8_decode(value):
     res = { }
     res['ReadPreambleSettings']   = get_bits(value, 0, 0, 2)
@@ -590,15 +665,19 @@ def DDR5_MR8_decode(value):
     res['WritePostambleSettings'] = get_bits(value, 0, 7)
     return res
 
+@lut_decoder(256)
 def DDR5_MR10_decode(value):
     return VrefPercentDecode( get_bits(value, 0, 0, 7) )
 
+@lut_decoder(256)
 def DDR5_MR11_decode(value):
     return VrefPercentDecode( get_bits(value, 0, 0, 7) & 0x7F )
 
+@lut_decoder(256)
 def DDR5_MR12_decode(value):
     return VrefPercentDecode( get_bits(value, 0, 0, 7) & 0x7F )
 
+@lut_decoder(256)
 def DDR5_MR13_decode(value):
     value = value & 0x0F
     mr13_table = {
@@ -622,6 +701,7 @@ def DDR5_MR13_decode(value):
         return None
     return mr13_table[value]
 
+@lut_decoder(256)
 def DDR5_MR14_decode(value):
     res = { }
     res['Cid0'] = get_bits(value, 0, 0)
@@ -633,6 +713,7 @@ def DDR5_MR14_decode(value):
     res['EcsMode']              = get_bits(value, 0, 7)
     return res
 
+@lut_decoder(256)
 def DDR5_MR32_decode(value):
     res = { }
     res['CK'] = CccOdtDecode(get_bits(value, 0, 0, 2))
@@ -640,6 +721,7 @@ def DDR5_MR32_decode(value):
     res['CA_Strap'] = get_bits(value, 0, 6)
     return res
 
+@lut_decoder(256)
 def DDR5_MR33_decode(value):
     res = { }
     res['CA'] = CccOdtDecode(get_bits(value, 0, 0, 2))
@@ -651,17 +733,184 @@ GmfCmdMrw  = 0
 GmfCmdMpc  = 1
 GmfCmdVref = 2
 
+# struct MC0_CH0_CR_GENERIC_MRS_FSM_CONTROL_0_STRUCT
+FSM_CONTROL = RegLayout([
+    ( 'ADDRESS', 0, 0, 7 ),
+    ( 'MRS_STOR_PTR', 0, 8, 16 ),        # GENERIC_MRS_STORAGE_POINTER
+    ( 'COMMAND_TYPE', 0, 22, 23 ),       # enum GmfCmdType
+    ( 'GmfTimingIndex', 0, 24, 25 ),     # enum GmfTimingIndex / DelayIndex / TIMING_VALUE_POINTER
+    ( 'PER_DEVICE', 0, 27 ),
+    ( 'FSP_CONTROL', 0, 28, 29 ),
+    ( 'PER_RANK', 0, 30 ),
+    ( 'ACTIVE', 0, 31 ),
+])
+
 def FSM_decode(value):
-    # struct MC0_CH0_CR_GENERIC_MRS_FSM_CONTROL_0_STRUCT
+    return FSM_CONTROL.decode(value)
+
+def FSM_key(value):
+    # ( ADDRESS, COMMAND_TYPE, ACTIVE ) of FSM entry  (see FSM_decode)
+    return ( value & 0xFF, (value >> 22) & 0x03, value >> 31 )
+
+def FSM_stor_ptr(value):
+    return (value >> 8) & 0x1FF
+
+# index of FSM table: ( ADDRESS, COMMAND_TYPE, ACTIVE ) => position of first entry  (ACTIVE = None for any state)
+def FSM_index_build(fsm_list, fsm_len):
+    index = { }
+    for pos in range(0, fsm_len):
+        addr, cmd_type, active = FSM_key(fsm_list[pos])
+        index.setdefault( (addr, cmd_type, active), pos )
+        index.setdefault( (addr, cmd_type, None), pos )
+    return index
+
+DDR5_MPC_SET_2N_COMMAND_TIMING   = 0x08
+DDR5_MPC_SET_1N_COMMAND_TIMING   = 0x09
+
+DDR5_MPC_RTT_MASK = 0x07
+DDR5_MPC_GROUP_A_RTT_CK   = 0x20
+DDR5_MPC_GROUP_B_RTT_CK   = 0x28
+DDR5_MPC_GROUP_A_RTT_CS   = 0x30
+DDR5_MPC_GROUP_B_RTT_CS   = 0x38
+DDR5_MPC_GROUP_A_RTT_CA   = 0x40
+DDR5_MPC_GROUP_B_RTT_CA   = 0x48
+DDR5_MPC_SET_DQS_RTT_PARK = 0x50
+DDR5_MPC_SET_RTT_PARK     = 0x58
+DDR5_MPC_CFG_TDLLK_TCCD_L = 0x80  # Mask = 0x0F
+
+def MPC_CmdTiming_decode(value):
+    if value == DDR5_MPC_SET_2N_COMMAND_TIMING:
+        return '2N'
+    if value == DDR5_MPC_SET_1N_COMMAND_TIMING:
+        return '1N'
+    return ''
+
+def MPC_RttCcc_decode(value):
+    return CccOdtDecode(value & DDR5_MPC_RTT_MASK)
+
+def MPC_Rtt_decode(value):
+    return OdtDecode(value & DDR5_MPC_RTT_MASK)
+
+# type of pattern element => ( mask, value, decoder )   (byte of MRS storage matches if "byte & mask == value")
+MPC_ELEMENT_TYPES = {
+    '?'              : ( 0x00, 0x00, None ),
+    'mpcMR13'        : ( 0xF0, DDR5_MPC_CFG_TDLLK_TCCD_L, DDR5_MR13_decode ),
+    'mpcSetCmdTiming': ( 0x00, 0x00, MPC_CmdTiming_decode ),
+    'CKa'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_A_RTT_CK, MPC_RttCcc_decode ),
+    'CKb'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_B_RTT_CK, MPC_RttCcc_decode ),
+    'CSa'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_A_RTT_CS, MPC_RttCcc_decode ),
+    'CSb'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_B_RTT_CS, MPC_RttCcc_decode ),
+    'CAa'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_A_RTT_CA, MPC_RttCcc_decode ),
+    'CAb'            : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_GROUP_B_RTT_CA, MPC_RttCcc_decode ),
+    'ParkDqs'        : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_SET_DQS_RTT_PARK, MPC_Rtt_decode ),
+    'Park'           : ( 0xFF & ~DDR5_MPC_RTT_MASK, DDR5_MPC_SET_RTT_PARK, MPC_Rtt_decode ),
+}
+for _num in [ 0, 2, 4, 5, 6, 8, 10, 11, 12, 13, 14, 32, 33 ]:
+    MPC_ELEMENT_TYPES[f'MR{_num}'] = ( 0x00, 0x00, globals()[f'DDR5_MR{_num}_decode'] )
+
+# Sequences of MRS storage bytes written by BIOS at start of storage (element format: "type=name#index")
+MPC_PATTERNS = {
+    'i12_1x': [
+        'mpcMR13=MR13',                      # mpcMR13
+        'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
+        'CKa=RttCK_A',                       # mpcMR32a0
+        'CSa=RttCS_A',                       # mpcMR32a1
+        'CAa=RttCA_A',                       # mpcMR33a0
+        'CKb=RttCK_B',                       # mpcMR32b0
+        'CSb=RttCS_B',                       # mpcMR32b1
+        'CAb=RttCA_B',                       # mpcMR33b0
+        '?',
+        '?',
+        'ParkDqs=RttParkDqs',                # mpcMR33
+        'Park=RttPARK',                      # mpcMR34
+    ],
+    'i12_2x': [
+        'mpcMR13=MR13',                      # mpcMR13
+        'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
+        'CKa=RttCK_A#0', 'CKa=RttCK_A#1',    # mpcMR32a0
+        'CSa=RttCS_A#0', 'CSa=RttCS_A#1',    # mpcMR32a1
+        'CAa=RttCA_A#0', 'CAa=RttCA_A#1',    # mpcMR33a0
+        'CKb=RttCK_B#0', 'CKb=RttCK_B#1',    # mpcMR32b0
+        'CSb=RttCS_B#0', 'CSb=RttCS_B#1',    # mpcMR32b1
+        'CAb=RttCA_B#0', 'CAb=RttCA_B#1',    # mpcMR33b0
+        '?', '?',                            # MR11
+        '?', '?',                            # MR12
+        'ParkDqs=RttParkDqs#0', 'ParkDqs=RttParkDqs#1',   # mpcMR33
+        'Park=RttPARK#0', 'Park=RttPARK#1',               # mpcMR34
+    ],
+    'i12_4x': [
+        'mpcMR13=MR13',                      # mpcMR13
+        'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
+        'CKa=RttCK_A#0', 'CKa=RttCK_A#1', 'CKa=RttCK_A#2', 'CKa=RttCK_A#3',
+        'CSa=RttCS_A#0', 'CSa=RttCS_A#1', 'CSa=RttCS_A#2', 'CSa=RttCS_A#3',
+        'CAa=RttCA_A#0', 'CAa=RttCA_A#1', 'CAa=RttCA_A#2', 'CAa=RttCA_A#3',
+        'CKb=RttCK_B#0', 'CKb=RttCK_B#1', 'CKb=RttCK_B#2', 'CKb=RttCK_B#3',
+        'CSb=RttCS_B#0', 'CSb=RttCS_B#1', 'CSb=RttCS_B#2', 'CSb=RttCS_B#3',
+        'CAb=RttCA_B#0', 'CAb=RttCA_B#1', 'CAb=RttCA_B#2', 'CAb=RttCA_B#3',
+        '?', '?', '?', '?',
+        '?', '?', '?', '?',
+        'ParkDqs=RttParkDqs#0', 'ParkDqs=RttParkDqs#1', 'ParkDqs=RttParkDqs#2', 'ParkDqs=RttParkDqs#3',
+        'Park=RttPARK#0', 'Park=RttPARK#1', 'Park=RttPARK#2', 'Park=RttPARK#3',
+    ],
+    'i15': [
+        'mpcMR13=MR13#0', 'mpcMR13=MR13#1',  # mpcMR13
+        'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
+        'CKa=RttCK_A',                       # mpcMR32a0
+        'CSa=RttCS_A',                       # mpcMR32a1
+        'CAa=RttCA_A',                       # mpcMR33a0
+        'CKb=RttCK_B',                       # mpcMR32b0
+        'CSb=RttCS_B',                       # mpcMR32b1
+        'CAb=RttCA_B',                       # mpcMR33b0
+        '?',
+        '?',
+        'ParkDqs=RttParkDqs',                # mpcMR33
+        'Park=RttPARK',                      # mpcMR34
+    ],
+}
+
+# compile element "type=name#index" into tuple ( mask, value, decoder, name, index )
+def MPC_pattern_compile(pattern):
+    res = [ ]
+    for vname in pattern:
+        vtype = name = vname
+        if '=' in vname:
+            vtype, name = vname.split('=')
+        idx = None
+        if '#' in name:
+            name, idx = name.split('#')
+            idx = int(idx)
+        mask, value, decoder = MPC_ELEMENT_TYPES[vtype]
+        res.append( ( mask, value, decoder, name, idx ) )
+    return tuple(res)
+
+MPC_PATTERNS_COMPILED = { pname: MPC_pattern_compile(pattern) for pname, pattern in MPC_PATTERNS.items() }
+
+# All candidate patterns (with name prefix) are matched in single pass over MRS storage bytes.
+# Returns decoded values of first pattern (in order of MPC_PATTERNS) that fully matches, or None.
+def MPC_patterns_match(mrs_list, start, prefix):
+    alive = [ pat for pname, pat in MPC_PATTERNS_COMPILED.items() if pname.startswith(prefix) ]
+    alive = [ pat for pat in alive if start + len(pat) < len(mrs_list) ]
+    maxlen = max([ len(pat) for pat in alive ], default = 0)
+    for pos in range(0, maxlen):
+        if not alive:
+            return None
+        value = mrs_list[start + pos]
+        alive = [ pat for pat in alive if pos >= len(pat) or (value & pat[pos][0]) == pat[pos][1] ]
+    if not alive:
+        return None
     res = { }
-    res['ADDRESS']        = get_bits(value, 0, 0, 7)
-    res['MRS_STOR_PTR']   = get_bits(value, 0, 8, 16)    # GENERIC_MRS_STORAGE_POINTER
-    res['COMMAND_TYPE']   = get_bits(value, 0, 22, 23)   # enum GmfCmdType
-    res['GmfTimingIndex'] = get_bits(value, 0, 24, 25)   # enum GmfTimingIndex / DelayIndex / TIMING_VALUE_POINTER
-    res['PER_DEVICE']     = get_bits(value, 0, 27)
-    res['FSP_CONTROL']    = get_bits(value, 0, 28, 29)
-    res['PER_RANK']       = get_bits(value, 0, 30)
-    res['ACTIVE']         = get_bits(value, 0, 31)
+    for pos, (mask, _, decoder, name, idx) in enumerate(alive[0]):
+        if decoder is None:
+            continue
+        val = decoder(mrs_list[start + pos])
+        if idx is None:
+            res[name] = val
+            continue
+        if name not in res:
+            res[name] = [ ]
+        while idx >= len(res[name]):
+            res[name].append(None)
+        res[name][idx] = val
     return res
 
 def get_mrs_storage(data, tm, info, controller, channel):
@@ -675,30 +924,25 @@ def get_mrs_storage(data, tm, info, controller, channel):
     
     mrs_data_size = IMC_FSM_STORAGE - IMC_MRS_FSM_STORAGE
     mrs_data = data[IMC_MRS_FSM_STORAGE : IMC_MRS_FSM_STORAGE + mrs_data_size]
-    mrs_list = [ get_bits(mrs_data, i, 0, 7) for i in range(0, len(mrs_data)) ]
+    mrs_list = bytes(mrs_data)
     
-    fsm_data_size = MAX_MR_GEN_FSM * 4
-    fsm_data = data[IMC_FSM_STORAGE : IMC_FSM_STORAGE + fsm_data_size]
-    fsm_list = [ get_bits(fsm_data, i, 0, 31) for i in range(0, len(fsm_data), 4) ]
+    fsm_list = struct.unpack_from(f'<{MAX_MR_GEN_FSM}I', data, IMC_FSM_STORAGE)
 
     fsm_len = 0
     mrs_size = 0
+    fsm_index = { }
 
     def find_MR_into_FSM(MR_num, cmd_type = GmfCmdMrw, active = None):
-        nonlocal fsm_list, fsm_len, mrs_list, mrs_size
-        for pos, val in enumerate(fsm_list):
-            if fsm_len > 0 and pos >= fsm_len:
-                break
-            fsm = FSM_decode(val)
-            if fsm["ADDRESS"] == MR_num and fsm['COMMAND_TYPE'] == cmd_type:
-                if active is None or fsm['ACTIVE'] == active:
-                    next_fsm = FSM_decode(fsm_list[pos + 1])
-                    if next_fsm['MRS_STOR_PTR'] < fsm['MRS_STOR_PTR']:
-                        fsm['size'] = None
-                    else:
-                        fsm['size'] = next_fsm['MRS_STOR_PTR'] - fsm['MRS_STOR_PTR']
-                    return fsm
-        return None
+        pos = fsm_index.get( (MR_num, cmd_type, active), None )
+        if pos is None:
+            return None
+        fsm = FSM_decode(fsm_list[pos])
+        next_ptr = FSM_stor_ptr(fsm_list[pos + 1])
+        if next_ptr < fsm['MRS_STOR_PTR']:
+            fsm['size'] = None
+        else:
+            fsm['size'] = next_ptr - fsm['MRS_STOR_PTR']
+        return fsm
 
     SelectAllPDA = 0x7F  # persistent value (latest MRS storage value)
     fsm_SelectAllPDA = None
@@ -706,18 +950,18 @@ def get_mrs_storage(data, tm, info, controller, channel):
     for fsm_pos, val in enumerate(fsm_list):
         if fsm_pos > 4 and val == 0:
             break  # the end
-        fsm = FSM_decode(val)
-        if not fsm['ACTIVE']:
+        addr, cmd_type, active = FSM_key(val)
+        if not active:
             continue
-        if fsm['COMMAND_TYPE'] != GmfCmdMpc:
+        if cmd_type != GmfCmdMpc:
             continue
-        #if fsm['ADDRESS'] not in [ 0, 15 ]:
+        #if addr not in [ 0, 15 ]:
         #    continue
-        mrs_pos = fsm["MRS_STOR_PTR"]
+        mrs_pos = FSM_stor_ptr(val)
         if mrs_pos > 0 and mrs_pos < len(mrs_list):
             mrs_val = mrs_list[mrs_pos]
             if mrs_val == SelectAllPDA:
-                fsm_SelectAllPDA = fsm
+                fsm_SelectAllPDA = FSM_decode(val)
                 fsm_len = fsm_pos + 1
                 mrs_size = mrs_pos + 1
                 break
@@ -726,6 +970,8 @@ def get_mrs_storage(data, tm, info, controller, channel):
         mrs_size = len(mrs_list)
         fsm_len = len(fsm_list)
 
+    fsm_index = FSM_index_build(fsm_list, fsm_len)
+
     mrs_hex_list = [ '%02X' % mrs_list[i] for i in range(0, mrs_size) ]
     tm['mrs_data'] = ' '.join(mrs_hex_list)
     tm['mrs_size'] = mrs_size
@@ -766,161 +1012,7 @@ def get_mrs_storage(data, tm, info, controller, channel):
     if MR13:
         mr['mr13'] = DDR5_MR13_decode(mrs_list[ MR13['MRS_STOR_PTR'] ])
     
-    DDR5_MPC_SET_2N_COMMAND_TIMING   = 0x08
-    DDR5_MPC_SET_1N_COMMAND_TIMING   = 0x09
-    
-    DDR5_MPC_RTT_MASK = 0x07
-    DDR5_MPC_GROUP_A_RTT_CK   = 0x20
-    DDR5_MPC_GROUP_B_RTT_CK   = 0x28
-    DDR5_MPC_GROUP_A_RTT_CS   = 0x30
-    DDR5_MPC_GROUP_B_RTT_CS   = 0x38
-    DDR5_MPC_GROUP_A_RTT_CA   = 0x40
-    DDR5_MPC_GROUP_B_RTT_CA   = 0x48
-    DDR5_MPC_SET_DQS_RTT_PARK = 0x50
-    DDR5_MPC_SET_RTT_PARK     = 0x58
-    DDR5_MPC_CFG_TDLLK_TCCD_L = 0x80  # Mask = 0x0F
-    
-    def rttCx_check_and_read(start, pattern):
-        nonlocal mrs_data, mrs_list
-        plen = len(pattern)
-        vcount = 0
-        res = { }
-        mrs = [ mrs_list[pos] for pos in range(start, start + plen + 1) ]
-        if len(pattern) >= len(mrs):
-            return 0, res
-        for pi, vname in enumerate(pattern):
-            value = mrs[pi]
-            vtype = vname
-            name = vname
-            if '=' in vname:
-                vtype, name = vname.split('=')
-            idx = None
-            if '#' in name:
-                name, idx = name.split('#')
-                idx = int(idx)
-            val = '_SKIP_'
-            if vtype == '?':
-                vcount += 1
-                continue
-            if vtype == 'mpcMR13' and (value & 0xF0) == DDR5_MPC_CFG_TDLLK_TCCD_L:
-                val = DDR5_MR13_decode(value)
-            if vtype == 'mpcSetCmdTiming':
-                val = ''
-                if value == DDR5_MPC_SET_2N_COMMAND_TIMING:
-                    val = '2N'
-                if value == DDR5_MPC_SET_1N_COMMAND_TIMING:
-                    val = '1N'
-            if vtype == 'CKa' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_A_RTT_CK:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'CKb' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_B_RTT_CK:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'CSa' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_A_RTT_CS:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'CSb' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_B_RTT_CS:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'CAa' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_A_RTT_CA:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'CAb' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_GROUP_B_RTT_CA:
-                val = CccOdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'ParkDqs' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_SET_DQS_RTT_PARK:
-                val = OdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype == 'Park' and (value & ~DDR5_MPC_RTT_MASK) == DDR5_MPC_SET_RTT_PARK:
-                val = OdtDecode(value & DDR5_MPC_RTT_MASK)
-            if vtype in [ 'MR0', 'MR2', 'MR4', 'MR5', 'MR6', 'MR8', 'MR10', 'MR11', 'MR12', 'MR13', 'MR14', 'MR32', 'MR33' ]:
-                decode_func = globals()[f'DDR5_{vtype}_decode']
-                val = decode_func(value)
-            if val != '_SKIP_':
-                vcount += 1
-                if idx is not None:
-                    if name not in res:
-                        res[name] = [ ]
-                    while True:
-                        if idx >= len(res[name]):
-                            res[name].append(None)
-                        else:
-                            break
-                    res[name][idx] = val
-                else:    
-                    res[name] = val
-        return vcount, res
-    
-    pattern_Cx_dict = {
-        'i12_1x': [
-            'mpcMR13=MR13',                      # mpcMR13
-            'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
-            'CKa=RttCK_A',                       # mpcMR32a0
-            'CSa=RttCS_A',                       # mpcMR32a1
-            'CAa=RttCA_A',                       # mpcMR33a0
-            'CKb=RttCK_B',                       # mpcMR32b0
-            'CSb=RttCS_B',                       # mpcMR32b1
-            'CAb=RttCA_B',                       # mpcMR33b0
-            '?',
-            '?',
-            'ParkDqs=RttParkDqs',                # mpcMR33
-            'Park=RttPARK',                      # mpcMR34
-        ],
-        'i12_2x': [
-            'mpcMR13=MR13',                      # mpcMR13
-            'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
-            'CKa=RttCK_A#0', 'CKa=RttCK_A#1',    # mpcMR32a0
-            'CSa=RttCS_A#0', 'CSa=RttCS_A#1',    # mpcMR32a1
-            'CAa=RttCA_A#0', 'CAa=RttCA_A#1',    # mpcMR33a0
-            'CKb=RttCK_B#0', 'CKb=RttCK_B#1',    # mpcMR32b0
-            'CSb=RttCS_B#0', 'CSb=RttCS_B#1',    # mpcMR32b1
-            'CAb=RttCA_B#0', 'CAb=RttCA_B#1',    # mpcMR33b0
-            '?', '?',                            # MR11
-            '?', '?',                            # MR12
-            'ParkDqs=RttParkDqs#0', 'ParkDqs=RttParkDqs#1',   # mpcMR33
-            'Park=RttPARK#0', 'Park=RttPARK#1',               # mpcMR34
-        ],
-        'i12_4x': [
-            'mpcMR13=MR13',                      # mpcMR13
-            'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
-            'CKa=RttCK_A#0', 'CKa=RttCK_A#1', 'CKa=RttCK_A#2', 'CKa=RttCK_A#3',
-            'CSa=RttCS_A#0', 'CSa=RttCS_A#1', 'CSa=RttCS_A#2', 'CSa=RttCS_A#3',
-            'CAa=RttCA_A#0', 'CAa=RttCA_A#1', 'CAa=RttCA_A#2', 'CAa=RttCA_A#3',
-            'CKb=RttCK_B#0', 'CKb=RttCK_B#1', 'CKb=RttCK_B#2', 'CKb=RttCK_B#3',
-            'CSb=RttCS_B#0', 'CSb=RttCS_B#1', 'CSb=RttCS_B#2', 'CSb=RttCS_B#3',
-            'CAb=RttCA_B#0', 'CAb=RttCA_B#1', 'CAb=RttCA_B#2', 'CAb=RttCA_B#3',
-            '?', '?', '?', '?',
-            '?', '?', '?', '?',
-            'ParkDqs=RttParkDqs#0', 'ParkDqs=RttParkDqs#1', 'ParkDqs=RttParkDqs#2', 'ParkDqs=RttParkDqs#3',
-            'Park=RttPARK#0', 'Park=RttPARK#1', 'Park=RttPARK#2', 'Park=RttPARK#3',
-        ],
-        'i15': [
-            'mpcMR13=MR13#0', 'mpcMR13=MR13#1',  # mpcMR13
-            'mpcSetCmdTiming=CmdTiming',         # mpcSetCmdTiming
-            'CKa=RttCK_A',                       # mpcMR32a0
-            'CSa=RttCS_A',                       # mpcMR32a1
-            'CAa=RttCA_A',                       # mpcMR33a0
-            'CKb=RttCK_B',                       # mpcMR32b0
-            'CSb=RttCS_B',                       # mpcMR32b1
-            'CAb=RttCA_B',                       # mpcMR33b0
-            '?',
-            '?',
-            'ParkDqs=RttParkDqs',                # mpcMR33
-            'Park=RttPARK',                      # mpcMR34
-        ],
-    }
-    for pname in pattern_Cx_dict:
-        if cpu_id in i12_FAM and not pname.startswith('i12') :
-            pattern_Cx_dict[pname] = None
-        if cpu_id in i15_FAM and not pname.startswith('i15') :
-            pattern_Cx_dict[pname] = None
-
-    rttCx_start = 0
-    rttCx_size = 0
-    rttCx_pattern = ''
-    rttCx = None
-    for pname, pattern in pattern_Cx_dict.items():
-        if not pattern:
-            continue
-        sz, res = rttCx_check_and_read(rttCx_start, pattern)
-        if sz == len(pattern):
-            rttCx = res
-            rttCx_size = len(pattern) 
-            rttCx_pattern = pname
-            break
+    rttCx = MPC_patterns_match(mrs_list, 0, get_mem_decoder(cpu_id).MPC_PATTERN_PREFIX)
     if rttCx:
         mr.update( rttCx )
 
@@ -956,7 +1048,7 @@ def get_mrs_storage(data, tm, info, controller, channel):
 
     mr["SelectAllPDA"] = mrs_list[ fsm_SelectAllPDA['MRS_STOR_PTR'] ]
 
-def get_mem_ctrl(ctrl_num):
+def get_mem_ctrl(ctrl_num, with_channels = True):
     global gdict, gcpuinfo, cpu_id, MCHBAR_BASE
    
     mi = { }
@@ -964,7 +1056,8 @@ def get_mem_ctrl(ctrl_num):
    
     MC_REGS_SIZE = None
     MCHBAR_addr = MCHBAR_BASE + (0x10000 * ctrl_num)
-    if cpu_id in i12_FAM or cpu_id in i15_FAM:
+    dec = get_mem_decoder(cpu_id)
+    if True:
         MC_REGS_SIZE = 0x800
         data_offset = 0xD800  # Inter-Channel Decode Parameters
         MADCH = phymem_read(MCHBAR_addr + data_offset, 4)
@@ -980,8 +1073,6 @@ def get_mem_ctrl(ctrl_num):
         else:
             raise RuntimeError()
         mi['DDR_type'] = DDR_TYPE(mi["DDR_TYPE"]).name
-    else:
-        raise RuntimeError(f'ERROR: Processor model 0x{cpu_id:X} not supported')
     #print(json.dumps(mi, indent = 4))
     mchan = [ ]
     # 0xD804 - Intra-Channel 0 Decode Parameters
@@ -994,40 +1085,18 @@ def get_mem_ctrl(ctrl_num):
         data = phymem_read(MCHBAR_addr + 0xD804 + cnum * 4, 4)
         if data == b'\xFF\xFF\xFF\xFF':
             raise RuntimeError()
-        mc["DIMM_L_MAP"] = get_bits(data, 0, 0, 0)  # Virtual DIMM L mapping to physical DIMM: 0 = DIMM0, 1 = DIMM1
-        mc["EIM"] = get_bits(data, 0, 8, 8)
-        mc["ECC"] = get_bits(data, 0, 12, 13)
-        if cpu_id in i12_FAM:
-            mc["CRC"] = get_bits(data, 0, 14, 14)   # CRC Mode: 0 = Disabled  1 = Enabled
+        dec.MC_INTRA_CH.decode(data, out = mc)
         data = phymem_read(MCHBAR_addr + 0xD80C + cnum * 4, 4)
         if data == b'\xFF\xFF\xFF\xFF':
             raise RuntimeError()
-        mc["Dimm_L_Size"] = get_bits(data, 0, 0, 6)   # DIMM L Size in 512 MB multiples
-        if cpu_id in i12_FAM:
-            mc["DLW"]         = get_bits(data, 0, 7, 8)   # DIMM L width: 0=x8, 1=x16, 2=x32 
-            mc["DLNOR"]       = get_bits(data, 0, 9, 10)  # DIMM L ranks: 0=1, 1=2, 2=3, 3=4
-        if cpu_id in i15_FAM:
-            mc["DLW"]         = get_bits(data, 0, 7)      # DIMM L width: 0=x8, 1=x16
-            mc["DLNOR"]       = get_bits(data, 0, 9)      # DIMM L ranks: 0=1, 1=2
-        if cpu_id in i12_FAM:
-            mc["DDR5_DS_8GB"] = get_bits(data, 0, 11, 11) # DIMM S: 1 = 8Gb , 0 = more than 8Gb capacity
-            mc["DDR5_DL_8GB"] = get_bits(data, 0, 12, 12) # DIMM L: 0 = DDR5 capacity is more than 8Gb, 1 = DDR5 capacity is 8Gb
-        mc["Dimm_S_Size"] = get_bits(data, 0, 16, 22)
-        if cpu_id in i12_FAM:
-            mc["DSW"]         = get_bits(data, 0, 24, 25) # DIMM S width: 0=x8, 1=x16, 2=x32
-            mc["DSNOR"]       = get_bits(data, 0, 26, 27) # DIMM S ranks: 0=1, 1=2, 2=3, 3=4
-        if cpu_id in i15_FAM:
-            mc["DSW"]         = get_bits(data, 0, 24)     # DIMM S width: 0=x8, 1=x16
-            mc["DSNOR"]       = get_bits(data, 0, 26)     # DIMM S ranks: 0=1, 1=2
-        if cpu_id in i12_FAM:    
-            mc["BG0_BIT_OPTIONS"] = get_bits(data, 0, 28, 29)
-            mc["DECODER_EBH"] = get_bits(data, 0, 30, 31)
+        dec.MC_DIMM_CH.decode(data, out = mc)
         mchan.append( mc )
     #if mi["CH_L_MAP"]:
     #    mchan.reverse()
     mi['channels'] = mchan
-    for channel in range(0, 2):    
-        mchan[channel]['info'] = get_mchbar_info(mi, ctrl_num, channel)
+    if with_channels:
+        for channel, tm in enumerate(decode_mem_channels([ ( mi, ctrl_num, channel ) for channel in range(0, 2) ])):
+            mchan[channel]['info'] = tm
     return mi
 
 def get_mem_capabilities():
@@ -1035,106 +1104,49 @@ def get_mem_capabilities():
     gdict['CAP'] = { }
     cap = gdict['CAP']
 
-    CAP_A = pci_cfg_read(0, 0, 0, 0xE4, 4)  # Capabilities A. Processor capability enumeration.
-    cap['NVME_F7D'] = get_bits(CAP_A, 0, 1, 1)
-    cap['DDR_OVERCLOCK'] = get_bits(CAP_A, 0, 3, 3)
-    cap['CRID'] = get_bits(CAP_A, 0, 4, 7)
-    cap['2LM_SUPPORTED'] = get_bits(CAP_A, 0, 8, 8)
-    cap['DID0OE'] = get_bits(CAP_A, 0, 10, 10)
-    cap['IntGpu'] = True if get_bits(CAP_A, 0, 11, 11) == 0 else False     # IGD: Internal Graphics Status
-    cap['DualMemChan'] = True if get_bits(CAP_A, 0, 12, 12) == 0 else False  # PDCD: Dual Memory Channel Support
-    cap['X2APIC_EN'] = get_bits(CAP_A, 0, 13, 13)
-    cap['TwoDimmPerChan'] = True if get_bits(CAP_A, 0, 14, 14) == 0 else False   # DDPCD: 2 DIMMs Per Channel Status
-    cap['DTT_dev'] = True if get_bits(CAP_A, 0, 15, 15) == 0 else False     # CDD: DTT Device Status
-    cap['D1NM'] = True if get_bits(CAP_A, 0, 17, 17) == 0 else False       # DRAM 1N Timing Status
-    cap['PEG60'] = True if get_bits(CAP_A, 0, 18, 18) == 0 else False      # PEG60D: PCIe Controller Device 6 Function 0 Status
-    cap['DDRSZ'] = get_bits(CAP_A, 0, 19, 20)  # DRAM Maximum Size per Channel
+    dec = get_mem_decoder(cpu_id)
+    cfg = pci_cfg_read_cached(0, 0, 0, 0, 0x100)
+    dec.CAP.decode(cfg, out = cap)     # CAP_A, CAP_B, CAP_C, CAP_E
+    for name in dec.CAP_INVERTED:
+        cap[name] = True if cap[name] == 0 else False
     DRAM_SIZE_map = { 0: None, 1: '8GB', 2: '4GB', 3: '2GB' }
     cap['DDRSZ_max'] = DRAM_SIZE_map[cap['DDRSZ']]
-    if cpu_id in i12_FAM:
-        cap['DMIG2'] = True if get_bits(CAP_A, 0, 22, 22) == 0 else False  # DMIG2DIS: DMI GEN2 Status
-    cap['VTD'] = True if get_bits(CAP_A, 0, 23, 23) == 0 else False  # VTDD:  VT-d status
-    cap['FDEE'] = get_bits(CAP_A, 0, 24, 24)  # Force DRAM ECC Enable
-    cap['ECC'] = True if get_bits(CAP_A, 0, 25, 25) == 0 else False  # ECCDIS : DRAM ECC status
-    if cpu_id in i12_FAM:
-        cap['DW'] = 'x4' if get_bits(CAP_A, 0, 26, 26) == 0 else 'x2'   # DMI Width
-    cap['PELWU'] = True if get_bits(CAP_A, 0, 27, 27) == 0 else False  # PELWUD : PCIe Link Width Up-config
-    CAP_B = pci_cfg_read(0, 0, 0, 0xE8, 4)  # Capabilities B. Processor capability enumeration.
-    cap['SPEGFX1'] = get_bits(CAP_B, 0, 0)    
-    cap['DPEGFX1'] = get_bits(CAP_B, 0, 1)    
-    cap['VMD'] = True if get_bits(CAP_B, 0, 2) == 0 else False    # VMD_DIS
-    cap['SH_OPI_EN'] = get_bits(CAP_B, 0, 3)    
-    cap['Debug'] = True if get_bits(CAP_B, 0, 7) == 0 else False   # Debug mode status
-    cap['GNA'] = True if get_bits(CAP_B, 0, 8) == 0 else False     # GNA_DIS
-    cap['DEV10'] = True if get_bits(CAP_B, 0, 10) == 0 else False    # DEV10_DISABLED
-    cap['HDCP'] = True if get_bits(CAP_B, 0, 11) == 0 else False     # HDCPD
-    cap['LTECH'] = get_bits(CAP_B, 0, 12, 14)    
-    if cpu_id in i12_FAM:
-        cap['DMIG3'] = True if get_bits(CAP_B, 0, 15) == 0 else False   # DMIG3DIS 
-        cap['PEGX16'] = True if get_bits(CAP_B, 0, 16) == 0 else False    # PEGX16D
-    if cpu_id in i15_FAM:
-        cap['CDIE'] = True if get_bits(CAP_B, 0, 17) == 0 else False    # CDIE_?DISABLE
-    cap['PKGTYP'] = get_bits(CAP_B, 0, 19)    
-    if cpu_id in i12_FAM:
-        cap['PEGG3'] = True if get_bits(CAP_B, 0, 20) == 0 else False    # PEGG3_DIS
-    cap['PLL_REF100_CFG'] = get_bits(CAP_B, 0, 21, 23)  # DDR Maximum Frequency Capability with 100MHz memory reference clock (ref_clk). 0: 100 MHz memory reference clock is not supported / 1-6: Reserved / 7: Unlimited
-    cap['SVM'] = True if get_bits(CAP_B, 0, 24) == 0 else False  # SVM_DISABLE  
-    cap['CACHESZ'] = get_bits(CAP_B, 0, 25, 27)    
-    cap['SMT'] = get_bits(CAP_B, 0, 28)    
-    cap['OC_ENABLED'] = get_bits(CAP_B, 0, 29)   # Overclocking Enabled 
-    cap['TRACE_HUB'] = True if get_bits(CAP_B, 0, 30) == 0 else False   # TRACE_HUB_DIS 
-    cap['IPU'] = True if get_bits(CAP_B, 0, 31) == 0 else False   # IPU_DIS  
-    CAP_C = pci_cfg_read(0, 0, 0, 0xEC, 4)  # Capabilities C. Processor capability enumeration.
-    cap['DISPLAY_PIPE3'] = get_bits(CAP_C, 0, 5)
-    cap['IDD'] = get_bits(CAP_C, 0, 6)
-    cap['BCLKOCRANGE'] = get_bits(CAP_C, 0, 7, 8)  # BCLK Overclocking maximum frequency
+    if 'DW' in cap:
+        cap['DW'] = 'x4' if cap['DW'] == 0 else 'x2'   # DMI Width
     BCLK_OC_map = { 0: 'disabled', 1: 'max=115MHz', 2: 'max=130MHz', 3: 'unlimited' }
     cap['BCLKOC_freq_limit'] = BCLK_OC_map[cap['BCLKOCRANGE']]
-    cap['QCLK_GV'] = True if get_bits(CAP_C, 0, 14) == 0 else False   # QCLK_GV_DIS
-    if cpu_id in i15_FAM:
-        cap['VPU'] = True if get_bits(CAP_C, 0, 15) == 0 else False   # VPU_?DIS
-    cap['LPDDR4_EN'] = get_bits(CAP_C, 0, 16)
-    cap['MAX_DATA_RATE_LPDDR4'] = get_bits(CAP_C, 0, 17, 21)
-    cap['DDR4_EN'] = get_bits(CAP_C, 0, 22)
-    cap['MAX_DATA_RATE_DDR4'] = get_bits(CAP_C, 0, 23, 27)
-    if cpu_id in i12_FAM:
-        cap['PEGG4'] = True if get_bits(CAP_C, 0, 28) == 0 else False   # PEGG4_DIS
-        cap['PEGG5'] = True if get_bits(CAP_C, 0, 29) == 0 else False   # PEGG5_DIS
-        cap['PEG61'] = True if get_bits(CAP_C, 0, 30) == 0 else False   # PEG61D
-    CAP_E = pci_cfg_read(0, 0, 0, 0xF0, 4)  # Capabilities E. Processor capability enumeration.
-    cap['LPDDR5_EN'] = get_bits(CAP_E, 0, 0)
-    if cpu_id in i12_FAM:
-        cap['MAX_DATA_RATE_LPDDR5'] = get_bits(CAP_E, 0, 1, 5)
-        cap['MAX_DATA_FREQ_LPDDR5'] = None
-        cap['DDR5_EN'] = get_bits(CAP_E, 0, 6)
-        cap['MAX_DATA_RATE_DDR5'] = get_bits(CAP_E, 0, 7, 11)
-        cap['MAX_DATA_FREQ_DDR5'] = None
-        cap['IBECC'] = True if get_bits(CAP_E, 0, 12) == 0 else False  # IBECC_DIS
-        VDDQ_VOLTAGE_MAX = get_bits(CAP_E, 0, 13, 23)
-    if cpu_id in i15_FAM:
-        cap['MAX_DATA_RATE_LPDDR5'] = get_bits(CAP_E, 0, 1, 8)
-        cap['MAX_DATA_FREQ_LPDDR5'] = None
-        cap['DDR5_EN'] = get_bits(CAP_E, 0, 9)
-        cap['MAX_DATA_RATE_DDR5'] = get_bits(CAP_E, 0, 10, 17)
-        cap['MAX_DATA_FREQ_DDR5'] = None
-        cap['IBECC'] = True if get_bits(CAP_E, 0, 18) == 0 else False  # IBECC_DIS
-        VDDQ_VOLTAGE_MAX = get_bits(CAP_E, 0, 19, 29)
     cap['MAX_DATA_FREQ_LPDDR5'] = cap['MAX_DATA_RATE_LPDDR5'] * 266
     cap['MAX_DATA_FREQ_DDR5'] = cap['MAX_DATA_RATE_DDR5'] * 266
-    cap['VDDQ_VOLTAGE_MAX'] = round(VDDQ_VOLTAGE_MAX * 5 / 1000, 3)  # VDDQ_TX Maximum VID value (granularity UNDOC !!!)
+    cap['VDDQ_VOLTAGE_MAX'] = round(cap['VDDQ_VOLTAGE_MAX'] * 5 / 1000, 3)  # VDDQ_TX Maximum VID value (granularity UNDOC !!!)
 
-def get_mem_info(with_msr = True, with_bios = True):
-    global gdict, gcpuinfo, cpu_id, MCHBAR_BASE, DMIBAR_BASE
-    gcpuinfo = get_cpu_info(log = True)
-    cpu_id = get_cpu_id()
+# MC registers of all controllers (timings, MRS) decoded from MCHBAR snapshot, without params of get_undoc_params
+def read_mem_ctrls():
+    mc = [ ]
+    for ctrl_num in range(0, 2):
+        mem = get_mem_ctrl(ctrl_num, with_channels = False)
+        mc.append( mem )
+    jobs = [ ( mem, mem['controller'], channel ) for mem in mc for channel in range(0, len(mem['channels'])) ]
+    for job, tm in zip(jobs, decode_mem_channels(jobs, with_undoc = False)):
+        mem, ctrl_num, channel = job
+        mem['channels'][channel]['info'] = tm
+    return mc
+
+# force = True : all cached hardware data is re-read (see cpuidsdk64/hwcache.py)
+def get_mem_info(with_msr = True, with_bios = True, mchbar_snapshot = None, force = False):
+    global gdict, gcpuinfo, cpu_id, MCHBAR_BASE, DMIBAR_BASE, g_mchbar_snapshot
+    if force:
+        hw_cache_clear()
+    gcpuinfo = hw_cache_get(HW_STATIC, 'cpu', get_cpu_info, log = True)
+    cpu_id = hw_cache_get(HW_STATIC, 'cpu_id', get_cpu_id)
 
     if gcpuinfo['family'] != 6:
         raise RuntimeError(f'ERROR: Currently support only Intel processors')
 
     if cpu_id < CPUID.ALDERLAKE:
         raise RuntimeError(f'ERROR: Processor model 0x{cpu_id:X} not supported')
+    get_mem_decoder(cpu_id)
 
-    MCHBAR_BASE = pci_cfg_read(0, 0, 0, 0x48, '8')
+    MCHBAR_BASE = pci_cfg_read_cached(0, 0, 0, 0x48, '8')
     if (MCHBAR_BASE & 1) != 1:
         raise RuntimeError(f'ERROR: Readed incorrect MCHBAR_BASE = 0x{MCHBAR_BASE:X}')
     if MCHBAR_BASE < 0xFE000000 or MCHBAR_BASE >= 0xFFFFFFFF - 0x10000 * 3:
@@ -1142,10 +1154,12 @@ def get_mem_info(with_msr = True, with_bios = True):
     MCHBAR_BASE = MCHBAR_BASE - 1
     print(f'MCHBAR_BASE = 0x{MCHBAR_BASE:X}')
 
-    dmibar_addr = pci_cfg_read(0, 0, 0, 0x68, '8')
+    dmibar_addr = pci_cfg_read_cached(0, 0, 0, 0x68, '8')
     DMIBAR_EN = get_bits(dmibar_addr, 0, 0, 1)
     if not DMIBAR_EN:
         print(f'DMIBAR_EN = False (0x{dmibar_addr:08X})')
+    elif is_offline():
+        pass   # DMIBAR is not captured in dumps
     else:
         DMIBAR_addr = get_bits(dmibar_addr, 0, 12, 41)
         DMIBAR_BASE = DMIBAR_addr << 12
@@ -1163,58 +1177,53 @@ def get_mem_info(with_msr = True, with_bios = True):
     gdict['cpu'] = gcpuinfo.copy()
     board = gdict['board'] = { }
     R_SA_MC_DEVICE_ID = 0x02
-    gdict['cpu']['DeviceID'] = pci_cfg_read(0, 0, 0, R_SA_MC_DEVICE_ID, '2')
+    gdict['cpu']['DeviceID'] = pci_cfg_read_cached(0, 0, 0, R_SA_MC_DEVICE_ID, '2')
 
     get_mem_capabilities()
 
-    if g_fake_cpu_id:
-        cpu_id = g_fake_cpu_id
-        gdict['cpu']['model_id'] = cpu_id
-
     if with_msr:
         import msrbox
         mmb = msrbox.MsrMailBox()
         mmb.cpu_id = cpu_id
-        gdict['MSR'] = mmb.read_full_info()
+        gdict['MSR'] = mmb.read_full_info( hw_cache_get(HW_STATIC, 'MSR', mmb.read_static_info) )
 
     if with_bios:
         import biosbox
         bmb = biosbox.BiosMailBox()
         bmb.cpu_id = cpu_id
-        gdict['BIOS'] = bmb.read_full_info()
+        gdict['BIOS'] = bmb.read_full_info( hw_cache_get(HW_STATIC, 'BIOS', bmb.read_static_info) )
 
     gdict['memory'] = { }
     mi = gdict['memory']
 
+    mc_regs = None
+    if mchbar_snapshot:
+        g_mchbar_snapshot = MchbarSnapshot.from_dict(mchbar_snapshot) if isinstance(mchbar_snapshot, dict) else mchbar_snapshot
+    else:
+        mc_regs = hw_cache_get(HW_SEMI, 'mc')   # timings and MRS (see hw_cache_clear)
+        acquire_mchbar_snapshot(get_mchbar_snapshot_ranges(with_ctrl = False))
+        if mc_regs:
+            ctrl_regions = mc_regs['regions']
+        else:
+            ctrl_snap = MchbarSnapshot(MCHBAR_BASE)
+            ctrl_snap.acquire(get_mchbar_snapshot_ranges(with_common = False))
+            ctrl_regions = ctrl_snap.regions
+        g_mchbar_snapshot.regions = sorted(g_mchbar_snapshot.regions + ctrl_regions, key = lambda item: item[0])
+
     data = phymem_read(MCHBAR_BASE + 0x5F58, 8)
     mi['MC_TIMING_RUNTIME_OC_ENABLED'] = get_bits(data, 0, 0, 0)  # Adjusting memory timing values for overclocking is enabled
     data = phymem_read(MCHBAR_BASE + 0x5F60, 8)
     BCLK_FREQ = get_bits(data, 0, 0, 31) / 1000.0  # Reported BCLK Frequency in KHz
     mi['BCLK_FREQ'] = round(BCLK_FREQ, 3)
-    if cpu_id in i15_FAM:
-        mi['SOCBCLK_FREQ'] = mi['BCLK_FREQ']
-        CPUBCLK_FREQ = get_bits(data, 0, 32, 63) / 1000.0  # Reported PCIE BCLK Frequency in Khz
-        mi['CPUBCLK_FREQ'] = round(CPUBCLK_FREQ, 3)
+    dec = get_mem_decoder(cpu_id)
+    read = lambda offset, size: phymem_read(MCHBAR_BASE + offset, size)
+    dec.decode_bclk_regs(mi, read)
 
     pw = mi['POWER'] = { }
-    if cpu_id in i12_FAM:
-        data = phymem_read(MCHBAR_BASE + 0x58E0, 8)   # DDR Power Limit
-        pw['LIMIT1_POWER'] = get_bits(data, 0, 0, 14) * 0.125   # Power Limit 1 (PL1) for DDR domain in Watts. Format is U11.3: Resolution 0.125W, Range 0-2047.875W
-        pw['LIMIT1_ENABLE'] = get_bits(data, 0, 15, 15)         # Power Limit 1 (PL1) enable bit for DDR domain
-        pw['LIMIT1_TIME_WINDOW_Y'] = get_bits(data, 0, 17, 21)  # Power Limit 1 (PL1) time window Y value, for DDR domain. Actual time window for RAPL is: (1/1024 seconds) * (1+(X/4)) * (2Y)
-        pw['LIMIT1_TIME_WINDOW_X'] = get_bits(data, 0, 22, 23)  # Power Limit 1 (PL1) time window X value, for DDR domain. Actual time window for RAPL is: (1/1024 seconds) * (1+(X/4)) * (2Y) 
-        pw['LIMIT2_POWER'] = get_bits(data, 0, 32, 46) * 0.125  # Power Limit 2 (PL2) for DDR domain in Watts. Format is U11.3: Resolution 0.125W, Range 0-2047.875W.
-        pw['LIMIT2_ENABLE'] = get_bits(data, 0, 47, 47)         # Power Limit 2 (PL2) enable bit for DDR domain.
-        pw['limits_LOCKED'] = get_bits(data, 0, 63, 63)  # When set, this entire register becomes read-only. This bit will typically be set by BIOS during boot.
+    dec.decode_power_limit(pw, read)
     data = phymem_read(MCHBAR_BASE + 0x58F0, 4)   # Package RAPL Performance Status
     pw['RAPL_COUNTS'] = get_bits(data, 0, 0, 31)
-    if cpu_id in i12_FAM:
-        data = phymem_read(MCHBAR_BASE + 0x5920, 4)   # Primary Plane Turbo Policy
-        pw['PRIPTP'] = get_bits(data, 0, 0, 4)  # Priority Level. A higher number implies a higher priority.
-    if cpu_id in i15_FAM:
-        data = phymem_read(MCHBAR_BASE + 0x5920, 4)   # GT IA Performance BIAS
-        pw['IA_PERF_MULTIPLIER'] = get_bits(data, 0, 0, 15)   # IA Performance Multiplier, in U1.15 format
-        pw['GT_PERF_MULTIPLIER'] = get_bits(data, 0, 16, 31)  # GT Performance Multiplier, in U1.15 format
+    dec.decode_turbo_policy(pw, read)
     data = phymem_read(MCHBAR_BASE + 0x5924, 4)   # Secondary Plane Turbo Policy
     pw['SECPTP'] = get_bits(data, 0, 0, 4)  # Priority Level. A higher number implies a higher priority.
     data = phymem_read(MCHBAR_BASE + 0x5928, 4)   # Primary Plane Energy Status
@@ -1252,74 +1261,60 @@ def get_mem_info(with_msr = True, with_bios = True):
     sa['SA_VOLTAGE'] = get_bits(data, 0, 40, 55)  # Reports the System Agent voltage in u3.13 format. Conversion to Volts: V = SA_VOLTAGE / 8192.0
     sa['SA_VOLTAGE'] = round(sa['SA_VOLTAGE'] / 8192, 3)
 
-    if cpu_id in i12_FAM:
-        bios = mi['BIOS_REQUEST'] = { }
-        data = phymem_read(MCHBAR_BASE + 0x5E00, 4)   # Memory Controller BIOS Request
-        MC_PLL_RATIO = get_bits(data, 0, 0, 7) # This field holds the memory controller frequency (QCLK).
-        bios['MC_PLL_REF'] = get_bits(data, 0, 8, 11)
-        bios['MC_PLL_RATIO'] = MC_PLL_RATIO
-        bios['MC_PLL_freq'] = MC_PLL_RATIO * 100.0 if bios['MC_PLL_REF'] == 1 else round(MC_PLL_RATIO * 133.33, 3)
-        bios['GEAR'] = 1 << get_bits(data, 0, 12, 13)
-        bios['REQ_VDDQ_TX_VOLTAGE'] = round(get_bits(data, 0, 17, 26) * 5 / 1000, 3) # Voltage of the VDDQ TX rail at this clock frequency and gear configuration. Described in 5mV resolution
-        bios['REQ_VDDQ_TX_ICCMAX'] = round(get_bits(data, 0, 27, 30) * 0.25, 3)  # Described in 0.25A resolution. IccMax: 32 * 0.25 = 8A
-        bios['RUN_BUSY'] = get_bits(data, 0, 31, 31)
-
-        #bios = mi['BIOS_DATA'] = { }
-        bios = mi
-        data = phymem_read(MCHBAR_BASE + 0x5E04, 4)   # Memory Controller BIOS Data
-        MC_PLL_RATIO = get_bits(data, 0, 0, 7) # This field holds the memory controller frequency (QCLK).
-        bios['MC_PLL_REF'] = get_bits(data, 0, 8, 11)
-        bios['MC_PLL_RATIO'] = MC_PLL_RATIO
-        bios['MC_PLL_freq'] = MC_PLL_RATIO * 100.0 if bios['MC_PLL_REF'] == 1 else round(MC_PLL_RATIO * 133.33, 3)
-        bios['GEAR'] = 1 << get_bits(data, 0, 12, 13)
-        bios['REQ_VDDQ_TX_VOLTAGE'] = round(get_bits(data, 0, 17, 26) * 5 / 1000, 3) # Voltage of the VDDQ TX rail at this clock frequency and gear configuration. Described in 5mV resolution
-        bios['REQ_VDDQ_TX_ICCMAX'] = round(get_bits(data, 0, 27, 30) * 0.25, 3)  # Described in 0.25A resolution. IccMax: 32 * 0.25 = 8A
-
-    if cpu_id in i15_FAM:
-        bios = mi['BIOS_REQUEST'] = { }
-        data = phymem_read(MCHBAR_BASE + 0x13D08, 4)   # MemSS PMA BIOS request register
-        bios['QCLK_REF_FREQ'] = 33.334 # MHz
-        bios['QCLK_RATIO'] = get_bits(data, 0, 0, 7)
-        bios['QCLK_FREQ'] = round(bios['QCLK_RATIO'] * bios['QCLK_REF_FREQ'], 2)
-        bios['GEAR'] = 2 if get_bits(data, 0, 8) == 0 else 4
-        bios['MAX_BW_MBPS'] = get_bits(data, 0, 9, 28)
-        bios['QCLK_WP_IDX'] = get_bits(data, 0, 29, 30)
-        bios['RUN_BUSY'] = get_bits(data, 0, 31)
-
-        bios = mi
-        data = phymem_read(MCHBAR_BASE + 0x13D10, 4)   # MemSS PMA BIOS data register
-        bios['QCLK_REF_FREQ'] = 33.334 # MHz
-        bios['QCLK_RATIO'] = get_bits(data, 0, 0, 7)
-        bios['QCLK_FREQ'] = round(bios['QCLK_RATIO'] * bios['QCLK_REF_FREQ'], 2)
-        bios['GEAR'] = 2 if get_bits(data, 0, 8) == 0 else 4
-
-    if cpu_id in i12_FAM:
-        data = phymem_read(MCHBAR_BASE + 0x5F00, 4)   # System Agent Power Management Control
-        mi['SACG_ENA'] = get_bits(data, 0, 0, 0)  # This bit is used to enable or disable the System Agent Clock Gating (FCLK) : 0 = Not Allow , 1 = Allow
-        mi['MPLL_OFF_ENA'] = get_bits(data, 0, 1, 1)  # This bit is used to enable shutting down the Memory Controller PLLs (MCPLL and GDPLL).   0b: PLL shutdown is not allowed   1b: PLL shutdown is allowed
-        mi['PPLL_OFF_ENA'] = get_bits(data, 0, 2, 2)  # This bit is used to enable shutting down the PCIe/DMI PLL
-        mi['SACG_SEN'] = get_bits(data, 0, 8, 8)  # This bit indicates when the System Agent clock gating is possible based on link active power states.
-        mi['MPLL_OFF_SEN'] = get_bits(data, 0, 9, 9) # This bit indicates when the Memory PLLs (MCPLL and GDPLL) may be shutdown based on link active power states.
-        mi['MDLL_OFF_SEN'] = get_bits(data, 0, 10, 10) # This bit indicates when the Memory Master DLL may be shutdown based on link active power states.
-        mi['SACG_SREXIT'] = get_bits(data, 0, 11, 11)  # The Display Engine can indicate to the PCU that it wants the Memory Controller to exit self-refresh
-        mi['NSWAKE_SREXIT'] = get_bits(data, 0, 12, 12)  # When this bit is set to 1b, a Non-Snoop wakeup signal from the PCH will cause the PCU to force the memory controller to exit from Self-Refresh
-        mi['SACG_MPLL'] = get_bits(data, 0, 13, 13)  # When this bit is set to 1b, FCLK will never be gated when the memory controller PLL is ON.
-        mi['MPLL_ON_DE'] = get_bits(data, 0, 14, 14)
-        mi['MDLL_ON_DE'] = get_bits(data, 0, 15, 15)
-    
+    # family specific registers: BIOS request / data, SA power management
+    dec.decode_sa_regs(mi, read)
+
     # BCLKOCRANGE
 
     if True:
-        mb = get_motherboard_info()
+        mb = get_backend().board if is_offline() else hw_cache_get(HW_STATIC, 'board', get_motherboard_info)
         board['manufacturer'] = mb['manufacturer']
         board['product'] = mb['product']
 
-    mc = gdict['memory']['mc'] = [ ]
-    for ctrl_num in range(0, 2):
-        mem = get_mem_ctrl(ctrl_num)
-        mc.append( mem )
+    if mc_regs:
+        mc = mc_regs['mc']
+    else:
+        mc = read_mem_ctrls()
+        if not mchbar_snapshot:
+            hw_cache_set(HW_SEMI, 'mc', { 'mc': mc, 'regions': ctrl_snap.regions })
+    gdict['memory']['mc'] = mc
+    for mem in mc:
+        for channel, ch in enumerate(mem['channels']):
+            get_undoc_params(ch['info'], mem, mem['controller'], channel)
+    gdict['MCHBAR_SNAPSHOT'] = g_mchbar_snapshot.to_dict()
+    g_mchbar_snapshot = None
     return gdict
 
+# decode dump set (see cpuidsdk64/dumpbackend.py) without driver
+def get_mem_info_offline(dump):
+    global g_mchbar
+    import cpuidsdk64
+    prev_backend = get_backend()
+    cpuidsdk64.set_backend(dump)
+    g_mchbar = None
+    try:
+        return get_mem_info(with_msr = False, with_bios = False)
+    finally:
+        g_mchbar = None
+        cpuidsdk64.set_backend(prev_backend)
+
+# worker of process pool: return ( path of MCHBAR dump, info )
+def _decode_dump_set(fn):
+    from cpuidsdk64.dumpbackend import load_dump_set
+    dump = load_dump_set(fn)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return dump.mchbar_path, get_mem_info_offline(dump)
+    finally:
+        dump.close()
+
+# decode many dump sets in process pool (every process has own backend and caches), results are in order of files
+# jobs: number of processes (None = number of CPUs)
+def get_mem_info_offline_all(paths, jobs = None):
+    from cpuidsdk64.dumpbackend import find_dump_sets
+    with concurrent.futures.ProcessPoolExecutor(max_workers = jobs) as pool:
+        yield from pool.map(_decode_dump_set, find_dump_sets(paths))
+
 def dump_mchbar(offset, size):
     global MCHBAR_BASE 
     if not MCHBAR_BASE:
@@ -1337,23 +1332,88 @@ def dump_mchbar_to_file(offset, size, filename = None):
         print(f'File "{fn}" created!')
     return True
 
+# save MCHBAR + config space of host bridge + CPU id as dump set for offline decoding
+def save_mem_dump(filename = 'MCHBAR_0000.json'):
+    from cpuidsdk64.dumpbackend import save_dump_set
+    fn = os.path.splitext(filename)[0] + '.dat'
+    if not dump_mchbar_to_file(0, MCHBAR_SIZE, fn):
+        return False
+    cpu_id, stepping = get_cpu_id(full = True)
+    pci = { ( 0, 0, 0 ): pci_cfg_cache.snapshot(0, 0, 0) }
+    board = gdict['board'] if 'board' in gdict else None
+    save_dump_set(filename, fn, cpu_id, stepping, get_cpu_name(), pci, MCHBAR_BASE, board)
+    print(f'File "{filename}" created!')
+    return True
+
 if __name__ == "__main__":
-    get_cpu_info(log = True)
     dump_raw_mchbar = False
+    offline = None
     if len(sys.argv) > 1:
         if sys.argv[1].lower() == 'mchbar':
             dump_raw_mchbar = True
-        if sys.argv[1].lower() == 'test':
+        if sys.argv[1].lower() == 'test':   # test <MCHBAR.dat> <cpu_id>  or  test <dump.json>
+            from cpuidsdk64.dumpbackend import DumpBackend, load_dump_set
             fn = sys.argv[2]
-            with open(fn, 'rb') as file:
-                g_fake_mchbar = file.read()
-            g_fake_cpu_id = int(sys.argv[3])
-    
-    SdkInit(None, 0)
-    out = get_mem_info()
+            if fn.lower().endswith('.json'):
+                offline = load_dump_set(fn)
+            else:
+                offline = DumpBackend(fn, int(sys.argv[3], 0))
+        if sys.argv[1].lower() == 'offline':   # offline <dump.json | dir> ...
+            for mchbar_path, out in get_mem_info_offline_all(sys.argv[2:]):
+                out_fn = 'IMC_' + os.path.splitext(os.path.basename(mchbar_path))[0] + '.json'
+                with open(out_fn, 'w') as file:
+                    json.dump(out, file, indent = 4)
+                print(f'File "{out_fn}" created!')
+            sys.exit(0)
+        if sys.argv[1].lower() == 'bench_mrs':   # benchmark of FSM/MRS storage parsing (synthetic tables)
+            import random
+            def find_MR_linear(fsm_list, fsm_len, MR_num, cmd_type = GmfCmdMrw, active = None):
+                for pos in range(0, fsm_len):
+                    fsm = FSM_decode(fsm_list[pos])
+                    if fsm["ADDRESS"] == MR_num and fsm['COMMAND_TYPE'] == cmd_type:
+                        if active is None or fsm['ACTIVE'] == active:
+                            return pos
+                return None
+            queries = [ (34, GmfCmdMrw), (35, GmfCmdMrw), (36, GmfCmdMrw), (13, GmfCmdMrw), (11, GmfCmdVref), (12, GmfCmdVref), (10, GmfCmdMrw) ]
+            queries += [ (num, GmfCmdMrw) for num in [ 0, 2, 4, 5, 6, 8, 14 ] ]
+            count = 2000
+            for cpu_id, pname in [ (0x06B7, 'i12'), (0x06C6, 'i15') ]:
+                random.seed(cpu_id)
+                data = bytearray(random.getrandbits(8) for _ in range(0x800))
+                fsm = [ ]
+                for pos in range(0, 100):
+                    fsm.append( (pos % 40) | (pos * 2 << 8) | ((pos // 40) << 22) | (1 << 31) )
+                fsm.append( 15 | (201 << 8) | (GmfCmdMpc << 22) | (1 << 31) )
+                data[0x200 + 201] = 0x7F
+                data[0x600 : 0x600 + len(fsm) * 4] = struct.pack(f'<{len(fsm)}I', *fsm)
+                fsm_list = struct.unpack_from('<108I', data, 0x600)
+                assert [ find_MR_linear(fsm_list, len(fsm), *q) for q in queries ] == [ FSM_index_build(fsm_list, len(fsm)).get(q + (None,), None) for q in queries ]
+                t0 = time.perf_counter()
+                for i in range(count):
+                    res = [ find_MR_linear(fsm_list, len(fsm), *q) for q in queries ]
+                t1 = time.perf_counter()
+                for i in range(count):
+                    index = FSM_index_build(fsm_list, len(fsm))
+                    res = [ index.get(q + (None,), None) for q in queries ]
+                t2 = time.perf_counter()
+                for i in range(count):
+                    get_mrs_storage(data, { }, { }, 0, 0)
+                t3 = time.perf_counter()
+                print(f'{pname}: FSM entries = {len(fsm)}, lookups = {len(queries)}')
+                print(f'  linear search:    {(t1 - t0) * 1000000 / count:8.1f} us per channel')
+                print(f'  indexed search:   {(t2 - t1) * 1000000 / count:8.1f} us per channel')
+                print(f'  get_mrs_storage:  {(t3 - t2) * 1000000 / count:8.1f} us per channel')
+            sys.exit(0)
+
+    if offline:
+        out = get_mem_info_offline(offline)
+    else:
+        get_cpu_info(log = True)
+        SdkInit(None, 0)
+        out = get_mem_info()
     out_fn = 'IMC_mini.json'
 
-    if g_fake_mchbar and os.path.exists('DIMM_fake.json'):
+    if offline and os.path.exists('DIMM_fake.json'):
         with open('DIMM_fake.json', 'r', encoding='utf-8') as file:
             dimm = json.load(file)
         out['memory']['DIMM'] = dimm['DIMM']
@@ -1364,4 +1424,4 @@ if __name__ == "__main__":
         print(f'File "{out_fn}" created!')
 
     if dump_raw_mchbar:
-        dump_mchbar_to_file(0, 0x10000 * 3)
+        save_mem_dump()
@@ -0,0 +1,281 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+
+__author__ = 'remittor'
+
+from cpuidsdk64 import *
+from hardware import *
+
+# Decoder of memory controller registers for Alder Lake / Raptor Lake / Meteor Lake (i12_FAM)
+# The module is loaded by memory.get_mem_decoder() and used by get_mchbar_info / get_mem_ctrl / get_mem_capabilities / get_mem_info.
+
+# DOC: 13th Generation Intel ® Core™ Processor Datasheet, Volume 2 of 2
+# ref: https://cdrdv2-public.intel.com/743846/743846-001.pdf
+
+FAMILY = 'ADL'
+MPC_PATTERN_PREFIX = 'i12'    # see get_mrs_storage
+
+MCHBAR_REGIONS = [    # ( offset, size ) of family specific registers, see memory.MCHBAR_SNAPSHOT_REGIONS
+    ( 0x58E0, 8 ),       # DDR Power Limit
+    ( 0x5E00, 8 ),       # Memory Controller BIOS Request / Data
+    ( 0x5F00, 4 ),       # System Agent Power Management Control
+]
+
+def get_qclk_freq(mem):
+    return mem['SA']['QCLK_FREQ']
+
+#######################################################
+#  MC channel registers  (MCHBAR + 0xE000 + 0x800 * channel)
+#######################################################
+
+MC_TIMING = RegLayout([
+    ( "tCL", 0x070, 16, 22 ),            # IMC_CR_TC_CAS: CAS timing parameters
+    ( "tCWL", 0x070, 24, 31 ),
+    ( "tRP", 0x000, 0, 7 ),              # IMC_CR_TC_PRE: Timing constraints to PRE commands
+    ( "tRPab_ext", 0x000, 8, 12 ),
+    ( "tRDPRE", 0x000, 13, 19 ),
+    ( "tPPD", 0x000, 20, 23 ),
+    ( "tRCDW", 0x000, 24, 31 ),
+    ( "tWRPRE", 0x000, 32, 41 ),
+    ( "tRAS", 0x000, 42, 50 ),
+    ( "tRCD", 0x000, 51, 58 ),
+    ( "DERATING_EXT", 0x000, 59, 62 ),
+    ( "tREFI", 0x43C, 0, 17 ),           # IMC_REFRESH_TC: Refresh timing parameters
+    ( "tRFC", 0x43C, 18, 30 ),
+])
+
+MC_REFRESH = RegLayout([
+    ( "oref_ri", 0x438, 0, 7 ),          # IMC_REFRESH_AUX
+    ( "REFRESH_HP_WM", 0x438, 8, 11 ),
+    ( "REFRESH_PANIC_WM", 0x438, 12, 15 ),
+    ( "COUNTTREFIWHILEREFENOFF", 0x438, 16, 16 ),
+    ( "HPREFONMRS", 0x438, 17, 17 ),
+    ( "SRX_REF_DEBITS", 0x438, 18, 19 ),
+    ( "RAISE_BLK_WAIT", 0x438, 20, 23 ),
+    ( "tREFIx9", 0x438, 24, 31 ),        # Should be programmed to 8 * tREFI / 1024 (to allow for possible delays from ZQ or ISOC).
+    ( "PBR_DISABLE", 0x488, 0, 0 ),      # IMC_REFRESH_EXT
+    ( "PBR_OOO_DIS", 0x488, 1, 1 ),
+    ( "PBR_DISABLE_ON_HOT", 0x488, 3, 3 ),
+    ( "PBR_EXIT_ON_IDLE_CNT", 0x488, 4, 9 ),
+    ( "tRFCpb", 0x488, 10, 20 ),
+    ( "tRFM", 0x40C, 0, 10 ),            # Default is same as tRFCpb
+    ( "tFAW", 0x008, 0, 8 ),             # IMC_CR_TC_ACT: Timing constraints to ACT commands
+    ( "tRRD_sg", 0x008, 9, 14 ),
+    ( "tRRD_dg", 0x008, 15, 21 ),
+    ( "tREFSBRD", 0x008, 24, 31 ),
+])
+
+MC_CONFIG = RegLayout([
+    ( "tCKE", 0x050, 0, 6 ),             # IMC_TC_PWDEN: Power Down Timing
+    ( "tXP", 0x050, 7, 13 ),
+    ( "tXPDLL", 0x050, 14, 20 ),
+    ( "tRDPDEN", 0x050, 21, 28 ),
+    ( "tWRPDEN", 0x050, 32, 41 ),
+    ( "tCSH", 0x050, 42, 47 ),
+    ( "tCSL", 0x050, 48, 53 ),
+    ( "tPRPDEN", 0x050, 59, 63 ),
+    ( "CMD_STRETCH", 0x088, 3, 4 ),      # IMC_SC_GS_CFG: Scheduler configuration
+    ( "tCR", 0x088, 3, 4 ),              # look CR_MAP
+    ( "N_TO_1_RATIO", 0x088, 5, 7 ),
+    ( "ADDRESS_MIRROR", 0x088, 8, 11 ),
+    ( "GEAR4", 0x088, 15, 15 ),
+    ( "NO_GEAR4_PARAM_DIVIDE", 0x088, 16, 16 ),
+    ( "X8_DEVICE", 0x088, 28, 29 ),
+    ( "NO_GEAR2_PARAM_DIVIDE", 0x088, 30, 30 ),
+    ( "GEAR2", 0x088, 31, 31 ),
+    ( "DDR_1DPC_SPLIT_RANKS_ON_SUBCH", 0x088, 32, 33 ),
+    ( "WRITE0_ENABLE", 0x088, 49, 49 ),
+    ( "WCKDIFFLOWINIDLE", 0x088, 54, 54 ),
+    ( "tCPDED", 0x088, 56, 60 ),
+    ( "ALLOW_2CYC_B2B_LPDDR", 0x00C, 7, 7 ),
+])
+
+MC_SELF_REFRESH = RegLayout([
+    ( "tXSDLL", 0x440, 0, 12 ),          # Self-Refresh Timing Parameters
+    ( "tZQOPER", 0x440, 16, 23 ),        # UNDOC
+    ( "tMOD", 0x440, 24, 31 ),           # UNDOC
+    ( "tXSR", 0x4C0, 0, 12 ),            # Self-Refresh Exit Timing Parameters
+    ( "tSR", 0x4C0, 52, 57 ),
+    ( "DEC_tCWL", 0x478, 0, 5 ),         # The number of cycles (DCLK) decreased from tCWL.
+    ( "ADD_tCWL", 0x478, 6, 11 ),        # The number of cycles (DCLK) increased to tCWL.
+    ( "ADD_1QCLK_DELAY", 0x478, 12, 12 ),   # In Gear2, MC QCLK is actually 1xClk of the DDR, the regular MC register can only set even number of cycles (working in Dclk == 2 * 1xClk)
+])
+
+# ref: ICÈ_TÈA_BIOS  (leaked BIOS sources)  # file "MrcMcRegisterStructAdlExxx.h"
+MC_ODT = RegLayout([
+    ( "enable_odt_matrix", 0x088, 24 ),
+    ( "ODT_read_duration", 0x070, 0, 3 ),    # IMC_CR_TC_ODT
+    ( "ODT_Read_Delay", 0x070, 4, 7 ),
+    ( "ODT_write_duration", 0x070, 8, 11 ),
+    ( "ODT_Write_Delay", 0x070, 12, 15 ),
+    ( "tAONPD", 0x070, 32, 37 ),
+    ( "Write_Early_ODT", 0x070, 38 ),
+    ( "PtrSep", 0x070, 39, 40 ),
+    ( "ODT_Override", 0x0B4, 0, 3 ),         # IMC_MISC_ODT
+    ( "ODT_On", 0x0B4, 16, 19 ),
+    ( "MPR_Train_DDR_On", 0x0B4, 31 ),
+])
+
+CR_MAP = { 0: "1N", 1: '2N', 2: '3N', 3: "N:1" }
+
+def decode_config(tm):
+    tm["tCR"] = CR_MAP[tm["tCR"]]
+
+#######################################################
+#  MC decode parameters  (MCHBAR + 0xD804 / 0xD80C)
+#######################################################
+
+MC_INTRA_CH = RegLayout([
+    ( "DIMM_L_MAP", 0, 0, 0 ),           # Virtual DIMM L mapping to physical DIMM: 0 = DIMM0, 1 = DIMM1
+    ( "EIM", 0, 8, 8 ),
+    ( "ECC", 0, 12, 13 ),
+    ( "CRC", 0, 14, 14 ),                # CRC Mode: 0 = Disabled  1 = Enabled
+])
+
+MC_DIMM_CH = RegLayout([
+    ( "Dimm_L_Size", 0, 0, 6 ),          # DIMM L Size in 512 MB multiples
+    ( "DLW", 0, 7, 8 ),                  # DIMM L width: 0=x8, 1=x16, 2=x32
+    ( "DLNOR", 0, 9, 10 ),               # DIMM L ranks: 0=1, 1=2, 2=3, 3=4
+    ( "DDR5_DS_8GB", 0, 11, 11 ),        # DIMM S: 1 = 8Gb , 0 = more than 8Gb capacity
+    ( "DDR5_DL_8GB", 0, 12, 12 ),        # DIMM L: 0 = DDR5 capacity is more than 8Gb, 1 = DDR5 capacity is 8Gb
+    ( "Dimm_S_Size", 0, 16, 22 ),
+    ( "DSW", 0, 24, 25 ),                # DIMM S width: 0=x8, 1=x16, 2=x32
+    ( "DSNOR", 0, 26, 27 ),              # DIMM S ranks: 0=1, 1=2, 2=3, 3=4
+    ( "BG0_BIT_OPTIONS", 0, 28, 29 ),
+    ( "DECODER_EBH", 0, 30, 31 ),
+])
+
+#######################################################
+#  Capabilities  (PCI 0:0.0 offset 0xE4 ... 0xF3)
+#######################################################
+
+CAP = RegLayout([
+    ( 'NVME_F7D', 0xE4, 1, 1 ),          # CAP_A: Capabilities A. Processor capability enumeration.
+    ( 'DDR_OVERCLOCK', 0xE4, 3, 3 ),
+    ( 'CRID', 0xE4, 4, 7 ),
+    ( '2LM_SUPPORTED', 0xE4, 8, 8 ),
+    ( 'DID0OE', 0xE4, 10, 10 ),
+    ( 'IntGpu', 0xE4, 11, 11 ),          # IGD: Internal Graphics Status
+    ( 'DualMemChan', 0xE4, 12, 12 ),     # PDCD: Dual Memory Channel Support
+    ( 'X2APIC_EN', 0xE4, 13, 13 ),
+    ( 'TwoDimmPerChan', 0xE4, 14, 14 ),  # DDPCD: 2 DIMMs Per Channel Status
+    ( 'DTT_dev', 0xE4, 15, 15 ),         # CDD: DTT Device Status
+    ( 'D1NM', 0xE4, 17, 17 ),            # DRAM 1N Timing Status
+    ( 'PEG60', 0xE4, 18, 18 ),           # PEG60D: PCIe Controller Device 6 Function 0 Status
+    ( 'DDRSZ', 0xE4, 19, 20 ),           # DRAM Maximum Size per Channel
+    ( 'DDRSZ_max', 0xE4, 19, 20 ),
+    ( 'DMIG2', 0xE4, 22, 22 ),           # DMIG2DIS: DMI GEN2 Status
+    ( 'VTD', 0xE4, 23, 23 ),             # VTDD:  VT-d status
+    ( 'FDEE', 0xE4, 24, 24 ),            # Force DRAM ECC Enable
+    ( 'ECC', 0xE4, 25, 25 ),             # ECCDIS : DRAM ECC status
+    ( 'DW', 0xE4, 26, 26 ),              # DMI Width
+    ( 'PELWU', 0xE4, 27, 27 ),           # PELWUD : PCIe Link Width Up-config
+    ( 'SPEGFX1', 0xE8, 0 ),              # CAP_B: Capabilities B. Processor capability enumeration.
+    ( 'DPEGFX1', 0xE8, 1 ),
+    ( 'VMD', 0xE8, 2 ),                  # VMD_DIS
+    ( 'SH_OPI_EN', 0xE8, 3 ),
+    ( 'Debug', 0xE8, 7 ),                # Debug mode status
+    ( 'GNA', 0xE8, 8 ),                  # GNA_DIS
+    ( 'DEV10', 0xE8, 10 ),               # DEV10_DISABLED
+    ( 'HDCP', 0xE8, 11 ),                # HDCPD
+    ( 'LTECH', 0xE8, 12, 14 ),
+    ( 'DMIG3', 0xE8, 15 ),               # DMIG3DIS
+    ( 'PEGX16', 0xE8, 16 ),              # PEGX16D
+    ( 'PKGTYP', 0xE8, 19 ),
+    ( 'PEGG3', 0xE8, 20 ),               # PEGG3_DIS
+    ( 'PLL_REF100_CFG', 0xE8, 21, 23 ),  # DDR Maximum Frequency Capability with 100MHz memory reference clock (ref_clk). 0: 100 MHz memory reference clock is not supported / 1-6: Reserved / 7: Unlimited
+    ( 'SVM', 0xE8, 24 ),                 # SVM_DISABLE
+    ( 'CACHESZ', 0xE8, 25, 27 ),
+    ( 'SMT', 0xE8, 28 ),
+    ( 'OC_ENABLED', 0xE8, 29 ),          # Overclocking Enabled
+    ( 'TRACE_HUB', 0xE8, 30 ),           # TRACE_HUB_DIS
+    ( 'IPU', 0xE8, 31 ),                 # IPU_DIS
+    ( 'DISPLAY_PIPE3', 0xEC, 5 ),        # CAP_C: Capabilities C. Processor capability enumeration.
+    ( 'IDD', 0xEC, 6 ),
+    ( 'BCLKOCRANGE', 0xEC, 7, 8 ),       # BCLK Overclocking maximum frequency
+    ( 'BCLKOC_freq_limit', 0xEC, 7, 8 ),
+    ( 'QCLK_GV', 0xEC, 14 ),             # QCLK_GV_DIS
+    ( 'LPDDR4_EN', 0xEC, 16 ),
+    ( 'MAX_DATA_RATE_LPDDR4', 0xEC, 17, 21 ),
+    ( 'DDR4_EN', 0xEC, 22 ),
+    ( 'MAX_DATA_RATE_DDR4', 0xEC, 23, 27 ),
+    ( 'PEGG4', 0xEC, 28 ),               # PEGG4_DIS
+    ( 'PEGG5', 0xEC, 29 ),               # PEGG5_DIS
+    ( 'PEG61', 0xEC, 30 ),               # PEG61D
+    ( 'LPDDR5_EN', 0xF0, 0 ),            # CAP_E: Capabilities E. Processor capability enumeration.
+    ( 'MAX_DATA_RATE_LPDDR5', 0xF0, 1, 5 ),
+    ( 'MAX_DATA_FREQ_LPDDR5', 0xF0, 1, 5 ),
+    ( 'DDR5_EN', 0xF0, 6 ),
+    ( 'MAX_DATA_RATE_DDR5', 0xF0, 7, 11 ),
+    ( 'MAX_DATA_FREQ_DDR5', 0xF0, 7, 11 ),
+    ( 'IBECC', 0xF0, 12 ),               # IBECC_DIS
+    ( 'VDDQ_VOLTAGE_MAX', 0xF0, 13, 23 ),
+])
+
+# bits with inverted meaning ( 0 = feature is present )
+CAP_INVERTED = [ 'IntGpu', 'DualMemChan', 'TwoDimmPerChan', 'DTT_dev', 'D1NM', 'PEG60', 'DMIG2', 'VTD', 'ECC', 'PELWU',
+                 'VMD', 'Debug', 'GNA', 'DEV10', 'HDCP', 'DMIG3', 'PEGX16', 'PEGG3', 'SVM', 'TRACE_HUB', 'IPU',
+                 'QCLK_GV', 'PEGG4', 'PEGG5', 'PEG61', 'IBECC' ]
+
+#######################################################
+#  SA / PCU registers  (MCHBAR + 0x5800 ... 0x5FFF)
+#######################################################
+
+# Hooks of memory.get_mem_info add family specific fields in place of call  (read(offset, size) returns bytes of MCHBAR registers)
+
+def decode_bclk_regs(mi, read):
+    pass
+
+def decode_power_limit(pw, read):
+    data = read(0x58E0, 8)   # DDR Power Limit
+    pw['LIMIT1_POWER'] = get_bits(data, 0, 0, 14) * 0.125   # Power Limit 1 (PL1) for DDR domain in Watts. Format is U11.3: Resolution 0.125W, Range 0-2047.875W
+    pw['LIMIT1_ENABLE'] = get_bits(data, 0, 15, 15)         # Power Limit 1 (PL1) enable bit for DDR domain
+    pw['LIMIT1_TIME_WINDOW_Y'] = get_bits(data, 0, 17, 21)  # Power Limit 1 (PL1) time window Y value, for DDR domain. Actual time window for RAPL is: (1/1024 seconds) * (1+(X/4)) * (2Y)
+    pw['LIMIT1_TIME_WINDOW_X'] = get_bits(data, 0, 22, 23)  # Power Limit 1 (PL1) time window X value, for DDR domain. Actual time window for RAPL is: (1/1024 seconds) * (1+(X/4)) * (2Y) 
+    pw['LIMIT2_POWER'] = get_bits(data, 0, 32, 46) * 0.125  # Power Limit 2 (PL2) for DDR domain in Watts. Format is U11.3: Resolution 0.125W, Range 0-2047.875W.
+    pw['LIMIT2_ENABLE'] = get_bits(data, 0, 47, 47)         # Power Limit 2 (PL2) enable bit for DDR domain.
+    pw['limits_LOCKED'] = get_bits(data, 0, 63, 63)  # When set, this entire register becomes read-only. This bit will typically be set by BIOS during boot.
+
+def decode_turbo_policy(pw, read):
+    data = read(0x5920, 4)   # Primary Plane Turbo Policy
+    pw['PRIPTP'] = get_bits(data, 0, 0, 4)  # Priority Level. A higher number implies a higher priority.
+
+def decode_sa_regs(mi, read):
+    bios = mi['BIOS_REQUEST'] = { }
+    data = read(0x5E00, 4)   # Memory Controller BIOS Request
+    MC_PLL_RATIO = get_bits(data, 0, 0, 7) # This field holds the memory controller frequency (QCLK).
+    bios['MC_PLL_REF'] = get_bits(data, 0, 8, 11)
+    bios['MC_PLL_RATIO'] = MC_PLL_RATIO
+    bios['MC_PLL_freq'] = MC_PLL_RATIO * 100.0 if bios['MC_PLL_REF'] == 1 else round(MC_PLL_RATIO * 133.33, 3)
+    bios['GEAR'] = 1 << get_bits(data, 0, 12, 13)
+    bios['REQ_VDDQ_TX_VOLTAGE'] = round(get_bits(data, 0, 17, 26) * 5 / 1000, 3) # Voltage of the VDDQ TX rail at this clock frequency and gear configuration. Described in 5mV resolution
+    bios['REQ_VDDQ_TX_ICCMAX'] = round(get_bits(data, 0, 27, 30) * 0.25, 3)  # Described in 0.25A resolution. IccMax: 32 * 0.25 = 8A
+    bios['RUN_BUSY'] = get_bits(data, 0, 31, 31)
+
+    #bios = mi['BIOS_DATA'] = { }
+    bios = mi
+    data = read(0x5E04, 4)   # Memory Controller BIOS Data
+    MC_PLL_RATIO = get_bits(data, 0, 0, 7) # This field holds the memory controller frequency (QCLK).
+    bios['MC_PLL_REF'] = get_bits(data, 0, 8, 11)
+    bios['MC_PLL_RATIO'] = MC_PLL_RATIO
+    bios['MC_PLL_freq'] = MC_PLL_RATIO * 100.0 if bios['MC_PLL_REF'] == 1 else round(MC_PLL_RATIO * 133.33, 3)
+    bios['GEAR'] = 1 << get_bits(data, 0, 12, 13)
+    bios['REQ_VDDQ_TX_VOLTAGE'] = round(get_bits(data, 0, 17, 26) * 5 / 1000, 3) # Voltage of the VDDQ TX rail at this clock frequency and gear configuration. Described in 5mV resolution
+    bios['REQ_VDDQ_TX_ICCMAX'] = round(get_bits(data, 0, 27, 30) * 0.25, 3)  # Described in 0.25A resolution. IccMax: 32 * 0.25 = 8A
+
+    data = read(0x5F00, 4)   # System Agent Power Management Control
+    mi['SACG_ENA'] = get_bits(data, 0, 0, 0)  # This bit is used to enable or disable the System Agent Clock Gating (FCLK) : 0 = Not Allow , 1 = Allow
+    mi['MPLL_OFF_ENA'] = get_bits(data, 0, 1, 1)  # This bit is used to enable shutting down the Memory Controller PLLs (MCPLL and GDPLL).   0b: PLL shutdown is not allowed   1b: PLL shutdown is allowed
+    mi['PPLL_OFF_ENA'] = get_bits(data, 0, 2, 2)  # This bit is used to enable shutting down the PCIe/DMI PLL
+    mi['SACG_SEN'] = get_bits(data, 0, 8, 8)  # This bit indicates when the System Agent clock gating is possible based on link active power states.
+    mi['MPLL_OFF_SEN'] = get_bits(data, 0, 9, 9) # This bit indicates when the Memory PLLs (MCPLL and GDPLL) may be shutdown based on link active power states.
+    mi['MDLL_OFF_SEN'] = get_bits(data, 0, 10, 10) # This bit indicates when the Memory Master DLL may be shutdown based on link active power states.
+    mi['SACG_SREXIT'] = get_bits(data, 0, 11, 11)  # The Display Engine can indicate to the PCU that it wants the Memory Controller to exit self-refresh
+    mi['NSWAKE_SREXIT'] = get_bits(data, 0, 12, 12)  # When this bit is set to 1b, a Non-Snoop wakeup signal from the PCH will cause the PCU to force the memory controller to exit from Self-Refresh
+    mi['SACG_MPLL'] = get_bits(data, 0, 13, 13)  # When this bit is set to 1b, FCLK will never be gated when the memory controller PLL is ON.
+    mi['MPLL_ON_DE'] = get_bits(data, 0, 14, 14)
+    mi['MDLL_ON_DE'] = get_bits(data, 0, 15, 15)
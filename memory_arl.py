@@ -0,0 +1,218 @@
+#
+# Copyright (C) 2025 remittor
+#
+
+import os
+import sys
+
+__author__ = 'remittor'
+
+from cpuidsdk64 import *
+from hardware import *
+
+# Decoder of memory controller registers for Arrow Lake (i15_FAM)
+# The module is loaded by memory.get_mem_decoder() and used by get_mchbar_info / get_mem_ctrl / get_mem_capabilities / get_mem_info.
+
+# DOC: 15th Generation Intel® Core™ Ultra 200S and 200HX Series Processors CFG & MEM Registers
+# ref: https://edc.intel.com/output/DownloadCrifOutput?id=510
+
+FAMILY = 'ARL'
+MPC_PATTERN_PREFIX = 'i15'    # see get_mrs_storage
+
+MCHBAR_REGIONS = [    # ( offset, size ) of family specific registers, see memory.MCHBAR_SNAPSHOT_REGIONS
+    ( 0x13D08, 0xC ),    # MemSS PMA BIOS request / data registers
+]
+
+def get_qclk_freq(mem):
+    return mem['QCLK_FREQ']
+
+#######################################################
+#  MC channel registers  (MCHBAR + 0xE000 + 0x800 * channel)
+#######################################################
+
+MC_TIMING = RegLayout([
+    ( "tCL", 0x070, 16, 22 ),            # IMC_CR_TC_CAS: CAS timing parameters
+    ( "tCWL", 0x070, 24, 31 ),
+    ( "tCCD_32_byte_CAS_delta", 0x070, 0, 5 ),
+    ( "tRP", 0x000, 0, 7 ),              # IMC_CR_TC_PRE: Timing constraints to PRE commands
+    ( "tRPab_ext", 0x000, 10, 17 ),
+    ( "tRDPRE", 0x000, 20, 26 ),
+    ( "tPPD", 0x000, 28, 31 ),
+    ( "tWRPRE", 0x000, 33, 42 ),
+    ( "tRAS", 0x000, 45, 53 ),
+    ( "DERATING_EXT", 0x000, 59, 62 ),
+    ( "tREFI", 0x4A0, 0, 17 ),           # IMC_REFRESH_TC: Refresh timing parameters
+    ( "tRFC", 0x4A0, 18, 30 ),
+])
+
+MC_REFRESH = RegLayout([
+    ( "tREFIx9", 0x4A0, 32, 39 ),
+    ( "tRFCpb", 0x4A0, 40, 50 ),
+    ( "tREFSBRD", 0x4A0, 51, 58 ),
+    ( "oref_ri", 0x438, 0, 7 ),          # IMC_REFRESH_AUX
+    ( "REFRESH_HP_WM", 0x438, 8, 11 ),
+    ( "REFRESH_PANIC_WM", 0x438, 12, 15 ),
+    ( "tRFM", 0x40C, 0, 10 ),            # Default is same as tRFCpb
+    ( "tFAW", 0x138, 0, 8 ),             # IMC_CR_TC_ACT: Timing constraints to ACT commands
+    ( "tRRD_sg", 0x138, 9, 14 ),
+    ( "tRRD_dg", 0x138, 15, 21 ),
+    ( "tRCD", 0x138, 22, 29 ),
+    ( "tRCDW", 0x138, 32, 39 ),
+])
+
+MC_CONFIG = RegLayout([
+    ( "tCKE", 0x050, 0, 6 ),             # IMC_TC_PWDEN: Power Down Timing
+    ( "tXP", 0x050, 7, 13 ),
+    ( "tCPDED", 0x050, 14, 18 ),
+    ( "tRDPDEN", 0x050, 19, 26 ),
+    ( "tWRPDEN", 0x050, 27, 36 ),
+    ( "tCKCKEH", 0x050, 37, 41 ),
+    ( "tCSH", 0x050, 42, 47 ),
+    ( "tCSL", 0x050, 48, 53 ),
+    ( "tCACSH ", 0x050, 54, 58 ),
+    ( "tPRPDEN", 0x050, 59, 63 ),
+    ( "CMD_STRETCH", 0x088, 3 ),         # IMC_SC_GS_CFG: Scheduler configuration
+    ( "tCR", 0x088, 3 ),                 # 0 = 1N, 1 = 2N
+    ( "ADDRESS_MIRROR", 0x088, 8, 11 ),
+    ( "NO_GEAR4_PARAM_DIVIDE", 0x088, 16, 16 ),
+    ( "NO_GEAR2_PARAM_DIVIDE", 0x088, 30, 30 ),
+    ( "GEAR", 0x088, 31 ),               # 0 = Gear2, 1 = Gear4
+    ( "DDR_1DPC_SPLIT_RANKS_ON_SUBCH", 0x088, 32, 33 ),
+    ( "WRITE0_ENABLE", 0x088, 49, 49 ),
+    ( "WCKDIFFLOWINIDLE", 0x088, 54, 54 ),
+])
+
+MC_SELF_REFRESH = RegLayout([
+    ( "tXSR", 0x4C0, 0, 12 ),            # Self-Refresh Exit Timing Parameters
+    ( "tSR", 0x4C0, 45, 50 ),
+    ( "tXSDLL", 0x4C0, 51, 63 ),
+])
+
+MC_ODT = RegLayout([ ])
+
+def decode_config(tm):
+    tm["tCR"] = '1N' if tm["tCR"] == 0 else '2N'
+    tm["GEAR"] = 2 if tm["GEAR"] == 0 else 4
+
+#######################################################
+#  MC decode parameters  (MCHBAR + 0xD804 / 0xD80C)
+#######################################################
+
+MC_INTRA_CH = RegLayout([
+    ( "DIMM_L_MAP", 0, 0, 0 ),           # Virtual DIMM L mapping to physical DIMM: 0 = DIMM0, 1 = DIMM1
+    ( "EIM", 0, 8, 8 ),
+    ( "ECC", 0, 12, 13 ),
+])
+
+MC_DIMM_CH = RegLayout([
+    ( "Dimm_L_Size", 0, 0, 6 ),          # DIMM L Size in 512 MB multiples
+    ( "DLW", 0, 7 ),                     # DIMM L width: 0=x8, 1=x16
+    ( "DLNOR", 0, 9 ),                   # DIMM L ranks: 0=1, 1=2
+    ( "Dimm_S_Size", 0, 16, 22 ),
+    ( "DSW", 0, 24 ),                    # DIMM S width: 0=x8, 1=x16
+    ( "DSNOR", 0, 26 ),                  # DIMM S ranks: 0=1, 1=2
+])
+
+#######################################################
+#  Capabilities  (PCI 0:0.0 offset 0xE4 ... 0xF3)
+#######################################################
+
+CAP = RegLayout([
+    ( 'NVME_F7D', 0xE4, 1, 1 ),          # CAP_A: Capabilities A. Processor capability enumeration.
+    ( 'DDR_OVERCLOCK', 0xE4, 3, 3 ),
+    ( 'CRID', 0xE4, 4, 7 ),
+    ( '2LM_SUPPORTED', 0xE4, 8, 8 ),
+    ( 'DID0OE', 0xE4, 10, 10 ),
+    ( 'IntGpu', 0xE4, 11, 11 ),          # IGD: Internal Graphics Status
+    ( 'DualMemChan', 0xE4, 12, 12 ),     # PDCD: Dual Memory Channel Support
+    ( 'X2APIC_EN', 0xE4, 13, 13 ),
+    ( 'TwoDimmPerChan', 0xE4, 14, 14 ),  # DDPCD: 2 DIMMs Per Channel Status
+    ( 'DTT_dev', 0xE4, 15, 15 ),         # CDD: DTT Device Status
+    ( 'D1NM', 0xE4, 17, 17 ),            # DRAM 1N Timing Status
+    ( 'PEG60', 0xE4, 18, 18 ),           # PEG60D: PCIe Controller Device 6 Function 0 Status
+    ( 'DDRSZ', 0xE4, 19, 20 ),           # DRAM Maximum Size per Channel
+    ( 'DDRSZ_max', 0xE4, 19, 20 ),
+    ( 'VTD', 0xE4, 23, 23 ),             # VTDD:  VT-d status
+    ( 'FDEE', 0xE4, 24, 24 ),            # Force DRAM ECC Enable
+    ( 'ECC', 0xE4, 25, 25 ),             # ECCDIS : DRAM ECC status
+    ( 'PELWU', 0xE4, 27, 27 ),           # PELWUD : PCIe Link Width Up-config
+    ( 'SPEGFX1', 0xE8, 0 ),              # CAP_B: Capabilities B. Processor capability enumeration.
+    ( 'DPEGFX1', 0xE8, 1 ),
+    ( 'VMD', 0xE8, 2 ),                  # VMD_DIS
+    ( 'SH_OPI_EN', 0xE8, 3 ),
+    ( 'Debug', 0xE8, 7 ),                # Debug mode status
+    ( 'GNA', 0xE8, 8 ),                  # GNA_DIS
+    ( 'DEV10', 0xE8, 10 ),               # DEV10_DISABLED
+    ( 'HDCP', 0xE8, 11 ),                # HDCPD
+    ( 'LTECH', 0xE8, 12, 14 ),
+    ( 'CDIE', 0xE8, 17 ),                # CDIE_?DISABLE
+    ( 'PKGTYP', 0xE8, 19 ),
+    ( 'PLL_REF100_CFG', 0xE8, 21, 23 ),  # DDR Maximum Frequency Capability with 100MHz memory reference clock (ref_clk). 0: 100 MHz memory reference clock is not supported / 1-6: Reserved / 7: Unlimited
+    ( 'SVM', 0xE8, 24 ),                 # SVM_DISABLE
+    ( 'CACHESZ', 0xE8, 25, 27 ),
+    ( 'SMT', 0xE8, 28 ),
+    ( 'OC_ENABLED', 0xE8, 29 ),          # Overclocking Enabled
+    ( 'TRACE_HUB', 0xE8, 30 ),           # TRACE_HUB_DIS
+    ( 'IPU', 0xE8, 31 ),                 # IPU_DIS
+    ( 'DISPLAY_PIPE3', 0xEC, 5 ),        # CAP_C: Capabilities C. Processor capability enumeration.
+    ( 'IDD', 0xEC, 6 ),
+    ( 'BCLKOCRANGE', 0xEC, 7, 8 ),       # BCLK Overclocking maximum frequency
+    ( 'BCLKOC_freq_limit', 0xEC, 7, 8 ),
+    ( 'QCLK_GV', 0xEC, 14 ),             # QCLK_GV_DIS
+    ( 'VPU', 0xEC, 15 ),                 # VPU_?DIS
+    ( 'LPDDR4_EN', 0xEC, 16 ),
+    ( 'MAX_DATA_RATE_LPDDR4', 0xEC, 17, 21 ),
+    ( 'DDR4_EN', 0xEC, 22 ),
+    ( 'MAX_DATA_RATE_DDR4', 0xEC, 23, 27 ),
+    ( 'LPDDR5_EN', 0xF0, 0 ),            # CAP_E: Capabilities E. Processor capability enumeration.
+    ( 'MAX_DATA_RATE_LPDDR5', 0xF0, 1, 8 ),
+    ( 'MAX_DATA_FREQ_LPDDR5', 0xF0, 1, 8 ),
+    ( 'DDR5_EN', 0xF0, 9 ),
+    ( 'MAX_DATA_RATE_DDR5', 0xF0, 10, 17 ),
+    ( 'MAX_DATA_FREQ_DDR5', 0xF0, 10, 17 ),
+    ( 'IBECC', 0xF0, 18 ),               # IBECC_DIS
+    ( 'VDDQ_VOLTAGE_MAX', 0xF0, 19, 29 ),
+])
+
+# bits with inverted meaning ( 0 = feature is present )
+CAP_INVERTED = [ 'IntGpu', 'DualMemChan', 'TwoDimmPerChan', 'DTT_dev', 'D1NM', 'PEG60', 'VTD', 'ECC', 'PELWU',
+                 'VMD', 'Debug', 'GNA', 'DEV10', 'HDCP', 'CDIE', 'SVM', 'TRACE_HUB', 'IPU',
+                 'QCLK_GV', 'VPU', 'IBECC' ]
+
+#######################################################
+#  SA / PCU / MemSS registers
+#######################################################
+
+# Hooks of memory.get_mem_info add family specific fields in place of call  (read(offset, size) returns bytes of MCHBAR registers)
+
+def decode_bclk_regs(mi, read):
+    data = read(0x5F60, 8)
+    mi['SOCBCLK_FREQ'] = mi['BCLK_FREQ']
+    CPUBCLK_FREQ = get_bits(data, 0, 32, 63) / 1000.0  # Reported PCIE BCLK Frequency in Khz
+    mi['CPUBCLK_FREQ'] = round(CPUBCLK_FREQ, 3)
+
+def decode_power_limit(pw, read):
+    pass
+
+def decode_turbo_policy(pw, read):
+    data = read(0x5920, 4)   # GT IA Performance BIAS
+    pw['IA_PERF_MULTIPLIER'] = get_bits(data, 0, 0, 15)   # IA Performance Multiplier, in U1.15 format
+    pw['GT_PERF_MULTIPLIER'] = get_bits(data, 0, 16, 31)  # GT Performance Multiplier, in U1.15 format
+
+def decode_sa_regs(mi, read):
+    bios = mi['BIOS_REQUEST'] = { }
+    data = read(0x13D08, 4)   # MemSS PMA BIOS request register
+    bios['QCLK_REF_FREQ'] = 33.334 # MHz
+    bios['QCLK_RATIO'] = get_bits(data, 0, 0, 7)
+    bios['QCLK_FREQ'] = round(bios['QCLK_RATIO'] * bios['QCLK_REF_FREQ'], 2)
+    bios['GEAR'] = 2 if get_bits(data, 0, 8) == 0 else 4
+    bios['MAX_BW_MBPS'] = get_bits(data, 0, 9, 28)
+    bios['QCLK_WP_IDX'] = get_bits(data, 0, 29, 30)
+    bios['RUN_BUSY'] = get_bits(data, 0, 31)
+
+    bios = mi
+    data = read(0x13D10, 4)   # MemSS PMA BIOS data register
+    bios['QCLK_REF_FREQ'] = 33.334 # MHz
+    bios['QCLK_RATIO'] = get_bits(data, 0, 0, 7)
+    bios['QCLK_FREQ'] = round(bios['QCLK_RATIO'] * bios['QCLK_REF_FREQ'], 2)
+    bios['GEAR'] = 2 if get_bits(data, 0, 8) == 0 else 4
@@ -6,6 +6,7 @@ import os
 import sys
 import time
 import copy
+import atexit
 import struct
 import ctypes as ct
 import ctypes.wintypes as wintypes
@@ -20,6 +21,7 @@ from datetime import timedelta
 __author__ = 'remittor'
 
 from cpuidsdk64 import *
+from cpuidsdk64.linuxbackend import LinuxBackend
 from hardware import *
 from jep106 import *
 from pci_ids import *
@@ -36,6 +38,14 @@ g_smb = None    # class MemSmb
 SMBUS_SPD_DEVICE  = 0x50     # Typical SPD address for first DIMM
 SMBUS_PMIC_DEVICE = 0x48     # ????????
 
+# Linux kernel drivers of SPD EEPROM (DDR5 SPD hub / DDR4 EE1004), the device "<bus>-00<addr>" has file "eeprom"
+# (root of devices is LinuxBackend.spd_sysfs_root)
+SPD_SYSFS_DRIVERS = [ 'spd5118', 'ee1004' ]
+
+# Linux hwmon of SPD5 hub thermal sensor (driver spd5118), the value of temp1_input in millidegree Celsius
+# (root of hwmon devices is LinuxBackend.hwmon_root)
+g_hwmon_temp = None   # slot => fd of file temp1_input (opened once for repeated polling, closed by hw_cache_clear)
+
 # The SPD5 Hub device has totally 128 volatile registers as shown in Table 72
 # ref: https://www.ablic.com/en/doc/datasheet/dimm_serial_eeprom_spd/S34HTS08AB_E.pdf
 SPD5_MR3   = 0x03   # Vendor ID (two bytes)
@@ -70,8 +80,14 @@ PMIC_RICHTEK_ADC_LVDO_10V = 0x09   # 1.0V
 
 # =================================================================================================
 
+# return LinuxBackend if hardware is accessed through kernel interfaces of Linux host (i2c-dev, sysfs), else None
+def get_linux_backend():
+    backend = get_backend()
+    return backend if isinstance(backend, LinuxBackend) else None
+
 class MemSmb(SMBus):
-    def __init__(self):
+    # i2c: I2cDev for explicit usage of Linux i2c-dev (by default it is used only with LinuxBackend)
+    def __init__(self, i2c = None):
         super().__init__(0)
         self.mem_info = None
         self.slot_dict = None
@@ -79,6 +95,15 @@ class MemSmb(SMBus):
         self.spd_dev = None
         self.pmic_dev = None
         self.page = None
+        self.smbus_access = True   # False : SMBus controller cannot be used (no I/O ports and no i2c-dev)
+        backend = get_linux_backend()
+        if i2c is None and backend:
+            i2c = I2cDev.find_i801(sysfs_root = backend.i2c_sysfs_root, dev_root = backend.i2c_dev_root)
+            if not i2c:
+                log.warning(f'SMBus: i2c-dev or i801 adapter is unavailable (is module "i2c-dev" loaded?)')
+                self.smbus_access = False   # LinuxBackend does not support port I/O
+        if i2c:
+            self.set_i2c_dev(i2c)
 
     def set_slot(self, slot):
         self.slot = slot
@@ -240,6 +265,12 @@ class MemSmb(SMBus):
                 status = self._mem_spd_get_status()
                 if status != 0:
                     break
+                if self.io_mode == IOMODE.I2CDEV:
+                    val = self.read_block(self.spd_dev, 0x80, 0x80)   # whole page by block transfers
+                    if val is None:
+                        break
+                    buf += val
+                    continue
                 for offset in range(0, 0x80, size):
                     if size == 1:
                         val = self._mem_spd_read_byte(offset)
@@ -411,6 +442,8 @@ class MemSmb(SMBus):
 
 def find_spd_smbus(check_pci_did = True, check_spd = True):
     global g_smb
+    if not g_smb.smbus_access:
+        return None
 
     def find_all_spd_devices(self, smb):
         global g_smb
@@ -445,6 +478,120 @@ def temp_decode(val):  # see doc: S34HTS08AB_E.pdf  page 63  table 99  (Thermal
     temp = SETDIM(val, 10) / 4
     return -temp if sign else temp
 
+# return path to eeprom file of SPD device for DIMM slot (or None)
+def find_spd_sysfs(slot, root):
+    addr = f'{SMBUS_SPD_DEVICE + slot:04x}'
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return None
+    for name in sorted(names):
+        bus, sep, dev = name.partition('-')
+        if not sep or not bus.isdigit() or dev != addr:
+            continue
+        try:
+            with open(os.path.join(root, name, 'name'), 'r') as file:
+                drv_name = file.read().strip()
+        except OSError:
+            continue
+        fn = os.path.join(root, name, 'eeprom')
+        if drv_name in SPD_SYSFS_DRIVERS and os.path.exists(fn):
+            return fn
+    return None
+
+def read_spd_sysfs(slot, root):
+    fn = find_spd_sysfs(slot, root)
+    if not fn:
+        return None
+    try:
+        with open(fn, 'rb', buffering = 0) as file:
+            return file.read(1024)
+    except OSError as e:
+        log.warning(f'Cannot read "{fn}": {e}')
+        return None
+
+# return dict { slot: path_to_temp1_input }, the slot is determined by I2C address of parent device "<bus>-00<addr>"
+def find_hwmon_spd_temp(root):
+    res = { }
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return res
+    for name in sorted(names):
+        path = os.path.join(root, name)
+        try:
+            with open(os.path.join(path, 'name'), 'r') as file:
+                drv_name = file.read().strip()
+        except OSError:
+            continue
+        if drv_name != 'spd5118':
+            continue
+        dev_name = os.path.basename(os.path.realpath(os.path.join(path, 'device')))
+        bus, sep, dev = dev_name.partition('-')
+        if not sep:
+            continue
+        try:
+            slot = int(dev, 16) - SMBUS_SPD_DEVICE
+        except ValueError:
+            continue
+        fn = os.path.join(path, 'temp1_input')
+        if 0 <= slot < 8 and slot not in res and os.path.exists(fn):
+            res[slot] = fn
+    return res
+
+def hwmon_temp_close():
+    global g_hwmon_temp
+    if g_hwmon_temp:
+        for fd in g_hwmon_temp.values():
+            os.close(fd)
+    g_hwmon_temp = None
+
+hw_cache_add_hook(hwmon_temp_close)
+atexit.register(hwmon_temp_close)
+
+# return DIMM temperature in degC from kernel driver (or None)
+def get_dimm_temp(slot):
+    global g_hwmon_temp
+    backend = get_linux_backend()
+    if not backend:
+        return None
+    if g_hwmon_temp is None:
+        g_hwmon_temp = { }
+        for _slot, fn in find_hwmon_spd_temp(backend.hwmon_root).items():
+            try:
+                g_hwmon_temp[_slot] = os.open(fn, os.O_RDONLY)
+            except OSError:
+                pass
+    fd = g_hwmon_temp.get(slot, None)
+    if fd is None:
+        return None
+    try:
+        return int(os.pread(fd, 32, 0)) / 1000
+    except (OSError, ValueError):
+        return None
+
+# return SPD Device Manufacturer from EEPROM data (or None)
+def get_spd_eeprom_vid(spd_data):
+    if len(spd_data) >= 1024 and spd_data[2] in [ 0x12, 0x13 ]:   # DDR5 / LPDDR5
+        return jep106decode(get_bits(spd_data, 194, 0, 15))
+    return None
+
+# only EEPROM data from kernel driver is available (SMBus controller cannot be used)
+def get_mem_spd_info_sysfs(slot, spd_data):
+    spd = { }
+    spd["slot"] = slot
+    spd["smbus_dev"] = SMBUS_SPD_DEVICE + slot
+    spd_vid = get_spd_eeprom_vid(spd_data)
+    spd["spd_vid"] = spd_vid
+    spd["spd_vendor"] = jep106[spd_vid] if spd_vid in jep106 else None
+    temp = get_dimm_temp(slot)
+    if temp is not None:
+        spd['temp'] = temp
+    spd['PMIC'] = None
+    spd['spd_eeprom'] = spd_data.hex()
+    spd['SPD'] = None
+    return spd
+
 def get_mem_spd_info(slot, mem_info: dict, with_pmic = True):
     global g_mem_info, g_smb
     spd = { }
@@ -460,19 +607,30 @@ def get_mem_spd_info(slot, mem_info: dict, with_pmic = True):
     if cpu_id < CPUID.ALDERLAKE:
         raise RuntimeError(f'ERROR: Processor model 0x{cpu_id:X} not supported')
 
+    # EEPROM that is busy by kernel driver (spd5118 / ee1004) is readed through sysfs, other registers through SMBus
+    sysfs_data = None
+    backend = get_linux_backend()
+    if backend:
+        sysfs_data = hw_cache_get(HW_STATIC, ( 'spd_sysfs', slot ), read_spd_sysfs, slot, backend.spd_sysfs_root)
+        if sysfs_data:
+            print(f'Read SPD EEPROM of DIMM slot #{slot} from kernel driver ({len(sysfs_data)} bytes)')
+
     if not g_smb:
         g_smb = MemSmb()
         g_smb.mem_info = copy.deepcopy(mem_info)
 
+    if not g_smb.smbus_access:
+        return get_mem_spd_info_sysfs(slot, sysfs_data) if sysfs_data else None   # LinuxBackend without i2c-dev
+
     if not hasattr(g_smb, "__init_stage"):
         g_smb.__init_stage = 0
         _smb = find_spd_smbus(check_pci_did = True, check_spd = True)
         if not _smb:
             print('ERROR: Cannot found PCH with SMBus controller')
-            return None
+            return get_mem_spd_info_sysfs(slot, sysfs_data) if sysfs_data else None
 
-    if not g_smb.info:
-        return None
+    if not g_smb.info or not g_smb.slot_dict:
+        return get_mem_spd_info_sysfs(slot, sysfs_data) if sysfs_data else None
     
     smb = g_smb.info
     if "ddr_ver" not in g_smb.info:
@@ -492,31 +650,37 @@ def get_mem_spd_info(slot, mem_info: dict, with_pmic = True):
         g_smb.init_slots()
 
     if not smb['port']:
-        return None
+        return get_mem_spd_info_sysfs(slot, sysfs_data) if sysfs_data else None
 
     g_smb.set_slot(slot)
     if slot not in g_smb.slot_dict:
+        if sysfs_data:
+            return get_mem_spd_info_sysfs(slot, sysfs_data)
         print(f'Skip DIMM slot #{slot} (Reason: SPD device not founded)')
         return None
     
     print(f'Scan DIMM slot #{slot}')
     vendorid = g_smb.mem_spd_read_reg(SPD5_MR3, 2)  # MR3 + MR4 => Vendor ID
-    if not vendorid:
+    if vendorid:
+        spd_vid = jep106decode(vendorid)
+    elif sysfs_data:
+        spd_vid = get_spd_eeprom_vid(sysfs_data)   # registers of SPD hub are busy by kernel driver
+    else:
         log.warning(f'Cannot read VendorID from SPD#{slot}')
         return None
 
-    spd_vid = jep106decode(vendorid)
-
     spd["slot"] = slot
     spd["smbus_dev"] = SMBUS_SPD_DEVICE + slot
     spd["spd_vid"] = spd_vid
     spd["spd_vendor"] = jep106[spd_vid] if spd_vid in jep106 else None
-    print(f'SPD Vendor ID = 0x{spd_vid:04X} "{spd["spd_vendor"]}"')
+    if spd_vid is not None:
+        print(f'SPD Vendor ID = 0x{spd_vid:04X} "{spd["spd_vendor"]}"')
 
-    val = g_smb.mem_spd_read_reg(SPD5_MR18)  # Device Configuration
-    if val is None:
+    val = g_smb.mem_spd_read_reg(SPD5_MR18) if vendorid else None  # Device Configuration
+    if val is None and not sysfs_data:
         log.warning(f'Cannot read DevConf from SPD#{slot}')
         return None
+    val = val if val is not None else 0   # DevConf is unknown (SPD hub is busy by kernel driver)
     PEC_EN = get_bits(val, 0, 7)
     #print(f'{PEC_EN=}')
     PAR_DIS = get_bits(val, 0, 6)
@@ -533,17 +697,25 @@ def get_mem_spd_info(slot, mem_info: dict, with_pmic = True):
     if INF_SEL == 1:  # i3c protocol
         raise RuntimeError('ERROR: i3c protocol not supported!')
 
-    temp = g_smb.mem_spd_read_reg(SPD5_MR49, 2)  # MR49 + MR50 => TS Current Sensed Temperature
+    temp = get_dimm_temp(slot)
     if temp is not None:
-        temp = temp_decode(temp)
-        #print(f'spd[{slot}][MR49] = 0x{temp:04X}  =>  {temp} degC')
         spd['temp'] = temp
+    elif vendorid:
+        temp = g_smb.mem_spd_read_reg(SPD5_MR49, 2)  # MR49 + MR50 => TS Current Sensed Temperature
+        if temp is not None:
+            temp = temp_decode(temp)
+            #print(f'spd[{slot}][MR49] = 0x{temp:04X}  =>  {temp} degC')
+            spd['temp'] = temp
 
     spd['PMIC'] = None
     spd['spd_eeprom'] = ""
     spd['SPD'] = None
 
-    spd_data = g_smb.mem_spd_read_full()
+    spd_data = sysfs_data if sysfs_data else hw_cache_get(HW_STATIC, ( 'spd_eeprom', slot ))
+    if not spd_data:
+        spd_data = g_smb.mem_spd_read_full()   # 1 KB over SMBus
+        if spd_data and len(spd_data) >= 1024:
+            hw_cache_set(HW_STATIC, ( 'spd_eeprom', slot ), spd_data)
     if spd_data:
         log.trace(f'SPD[{slot}] = {spd_data.hex()}')
         log.trace(f'SPD len = {len(spd_data)}')
@@ -556,9 +728,12 @@ def get_mem_spd_info(slot, mem_info: dict, with_pmic = True):
         
     return spd
 
-def get_mem_spd_all(mem_info: dict, with_pmic = True, allinone = True):
+# force = True : all cached hardware data is re-read (see cpuidsdk64/hwcache.py)
+def get_mem_spd_all(mem_info: dict, with_pmic = True, allinone = True, force = False):
     global g_mem_info, g_smb
     from spd_eeprom import spd_eeprom_decode
+    if force:
+        hw_cache_clear()
     if not mem_info:
         from memory import get_mem_info
         mem_info = get_mem_info()
@@ -569,9 +744,9 @@ def get_mem_spd_all(mem_info: dict, with_pmic = True, allinone = True):
         spd = get_mem_spd_info(slot, mem_info, with_pmic = with_pmic)
         if not spd:
             continue
-        if not dimm['SMBus']:
+        if not dimm['SMBus'] and g_smb:
             dimm['SMBus'] = g_smb.info.copy()
-        spd['SPD'] = spd_eeprom_decode(spd['spd_eeprom'])
+        spd['SPD'] = hw_cache_get(HW_STATIC, ( 'SPD', spd['spd_eeprom'] ), spd_eeprom_decode, spd['spd_eeprom'])
         dimm['DIMM'].append(spd)
     if allinone:
         mem_info['memory']['SMBus'] = copy.deepcopy(dimm['SMBus'])
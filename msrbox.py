@@ -335,7 +335,7 @@ class MsrMailBox():
         vrt['PsysDisable'] = get_bits(data, 0, 31)
         return vrt
     
-    def _read_base_info(self):
+    def _read_vr_topology(self):
         out = { }
         self.VrIaAddress = None
         self.VrGtAddress = None
@@ -359,7 +359,10 @@ class MsrMailBox():
                 # struct OCMB_ICCMAX_DATA
                 out['IccMaxValue'] = get_bits(data, 0, 0, 10) * 0.25
                 out['UnlimitedIccMaxMode'] = get_bits(data, 0, 31)
+        return out
 
+    def _read_base_info(self):
+        out = { }
         data = self._msr_oc_mailbox(MAILBOX_OC_CMD_GET_BCLK_FREQUENCY_CMD, 0, 0)
         if data is None:
             log.error(f'MAILBOX_OC_CMD_GET_BCLK_FREQUENCY_CMD({0},{0}): status = 0x{self.status:X}')
@@ -542,17 +545,54 @@ class MsrMailBox():
 
         return { 'VR': out }
     
-    def read_full_info(self):
+    # platform info, VR topology, IccMax and VR parameters are not changed while machine is running
+    # strict = True : return None if some data cannot be readed
+    def read_static_info(self, strict = True):
         out = { }
         self.platform_info = self.get_platform_info()
         out['platform_info'] = self.platform_info
         self.acquire()
+        try:
+            out.update( self._read_vr_topology() )
+            out.update( self._read_vr_info() )
+        finally:
+            self.release()
+        if strict and not self.is_static_info_complete(out):
+            return None    # some mailbox request failed (result must not be cached)
+        return out
+
+    def is_static_info_complete(self, info):
+        if not info['platform_info']:
+            return False
+        if self.VrIaAddress is None:
+            return False    # VR topology cannot be readed
+        if info['VR_TOPOLOGY'] and 'IccMaxValue' not in info:
+            return False
+        for key in [ 'VR_Protocol_ID', 'VR_Vendor_ID', 'VR_Product_ID', 'VccInAuxImonIccImax', 'IccMax', 'SVID_VCC_MAX', 'AC_loadline' ]:
+            if key not in info['VR']:
+                return False
+        return True
+
+    # static_info: result of read_static_info (cached by caller)
+    def read_full_info(self, static_info = None):
+        if static_info is None:
+            static_info = self.read_static_info(strict = False)
+        else:
+            self.platform_info = static_info['platform_info']
+            vr_topology = static_info.get('VR_TOPOLOGY', { })
+            self.VrIaAddress = vr_topology.get('VrIaAddress', None)
+            self.VrGtAddress = vr_topology.get('VrGtAddress', None)
+        out = { }
+        for key, value in static_info.items():
+            if key != 'VR':
+                out[key] = value
+        self.acquire()
         try:
             out.update( self._read_base_info() )
             out.update( self._read_PL4_config() )
-            out.update( self._read_vr_info() )
         finally:
             self.release()
+        out['VR'] = static_info['VR']
         return out
     
     def check_mailbox_mutex(self):
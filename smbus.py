@@ -14,6 +14,10 @@ from types import SimpleNamespace
 import enum
 import json
 import logging
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from datetime import datetime
 from datetime import timedelta
@@ -82,6 +86,31 @@ SMBHSTCNT_PEC_EN            = 0x80
 SMBAUXCTL_CRC     = 0x01
 SMBAUXCTL_E32B    = 0x02 
 
+# Linux i2c-dev interface   # ref: https://github.com/torvalds/linux/blob/master/include/uapi/linux/i2c-dev.h
+I2C_DEV_ROOT       = '/dev'
+I2C_SYSFS_ROOT     = '/sys/class/i2c-adapter'
+I2C_I801_NAME      = 'SMBus I801 adapter'
+
+I2C_SLAVE          = 0x0703
+I2C_SLAVE_FORCE    = 0x0706
+I2C_FUNCS          = 0x0705
+I2C_RDWR           = 0x0707
+I2C_SMBUS          = 0x0720
+
+# transaction types for I2C_SMBUS   # ref: include/uapi/linux/i2c.h
+I2C_SMBUS_QUICK           = 0
+I2C_SMBUS_BYTE            = 1
+I2C_SMBUS_BYTE_DATA       = 2
+I2C_SMBUS_WORD_DATA       = 3
+I2C_SMBUS_PROC_CALL       = 4
+I2C_SMBUS_I2C_BLOCK_DATA  = 8
+I2C_SMBUS_BLOCK_MAX       = 32
+
+I2C_FUNC_I2C                  = 0x00000001
+I2C_FUNC_SMBUS_READ_I2C_BLOCK = 0x04000000
+
+I2C_M_RD           = 0x0001
+
 # =================================================================================================
 
 TRACE_LEVEL_NUM = 5
@@ -128,6 +157,156 @@ def hex_formatter(obj, fmt = None):
     else:
         return obj
 
+class i2c_smbus_data(ct.Union):
+    _fields_ = [ ('byte', ct.c_uint8), ('word', ct.c_uint16), ('block', ct.c_uint8 * (I2C_SMBUS_BLOCK_MAX + 2)) ]
+
+class i2c_smbus_ioctl_data(ct.Structure):
+    _fields_ = [ ('read_write', ct.c_uint8), ('command', ct.c_uint8), ('size', ct.c_uint32), ('data', ct.POINTER(i2c_smbus_data)) ]
+
+class i2c_msg(ct.Structure):
+    _fields_ = [ ('addr', ct.c_uint16), ('flags', ct.c_uint16), ('len', ct.c_uint16), ('buf', ct.POINTER(ct.c_uint8)) ]
+
+class i2c_rdwr_ioctl_data(ct.Structure):
+    _fields_ = [ ('msgs', ct.POINTER(i2c_msg)), ('nmsgs', ct.c_uint32) ]
+
+# SMBus adapter through Linux i2c-dev (/dev/i2c-N), the transactions are executed by kernel driver (i2c-i801)
+class I2cDev():
+    def __init__(self, adapter, dev_root = None):
+        self.adapter = adapter
+        self.path = os.path.join(dev_root or I2C_DEV_ROOT, f'i2c-{adapter}')
+        self.fd = os.open(self.path, os.O_RDWR)
+        self.addr = None
+        self.data = i2c_smbus_data()
+        self.args = i2c_smbus_ioctl_data(0, 0, 0, ct.pointer(self.data))
+        self.rdwr_buf = (ct.c_uint8 * 0x100)()
+        self.rdwr_msgs = (i2c_msg * 2)()
+        self.rdwr_args = i2c_rdwr_ioctl_data(self.rdwr_msgs, 2)
+        funcs = ct.c_ulong(0)
+        try:
+            fcntl.ioctl(self.fd, I2C_FUNCS, funcs)
+        except OSError:
+            pass
+        self.funcs = funcs.value
+
+    def __repr__(self):
+        return f'<I2cDev:{self.path}>'
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    # return list of ( adapter_num, name, pci_addr )
+    @staticmethod
+    def list_adapters(sysfs_root = None):
+        sysfs_root = sysfs_root or I2C_SYSFS_ROOT
+        res = [ ]
+        try:
+            names = os.listdir(sysfs_root)
+        except OSError:
+            return res
+        for name in names:
+            if not name.startswith('i2c-') or not name[4:].isdigit():
+                continue
+            try:
+                with open(os.path.join(sysfs_root, name, 'name'), 'r') as file:
+                    adapter_name = file.read().strip()
+            except OSError:
+                continue
+            pci_addr = os.path.basename(os.path.realpath(os.path.join(sysfs_root, name, 'device')))
+            res.append( ( int(name[4:]), adapter_name, pci_addr ) )
+        return sorted(res)
+
+    # return I2cDev for Intel i801 SMBus adapter (the name contains I/O port: "SMBus I801 adapter at efa0")
+    @staticmethod
+    def find_i801(port = None, sysfs_root = None, dev_root = None):
+        for adapter, name, pci_addr in I2cDev.list_adapters(sysfs_root):
+            if not name.startswith(I2C_I801_NAME):
+                continue
+            if port and not name.lower().endswith(f' at {port:04x}'):
+                continue
+            try:
+                return I2cDev(adapter, dev_root)
+            except OSError as e:
+                log.warning(f'Cannot open i2c adapter "{name}": {e}')
+        return None
+
+    # return False if address is busy by kernel driver (spd5118 / ee1004), such device is accessed through sysfs
+    def set_addr(self, dev):
+        if self.addr == dev:
+            return True
+        try:
+            fcntl.ioctl(self.fd, I2C_SLAVE, dev)
+        except OSError as e:
+            log.debug(f'I2cDev: dev = 0x{dev:02X} => {e}')
+            return False
+        self.addr = dev
+        return True
+
+    def smbus_access(self, dev, read_write, command, size):
+        if not self.set_addr(dev):
+            return False
+        self.args.read_write = read_write
+        self.args.command = command if command else 0
+        self.args.size = size
+        try:
+            fcntl.ioctl(self.fd, I2C_SMBUS, self.args)
+        except OSError as e:
+            log.debug(f'I2cDev: dev = 0x{dev:02X}, command = 0x{self.args.command:02X}, size = {size} => {e}')
+            return False
+        return True
+
+    def recv_byte(self, dev):
+        return self.data.byte if self.smbus_access(dev, I2C_READ, 0, I2C_SMBUS_BYTE) else None
+
+    def send_byte(self, dev, value):
+        return self.smbus_access(dev, I2C_WRITE, value, I2C_SMBUS_BYTE)
+
+    def read_byte(self, dev, command):
+        return self.data.byte if self.smbus_access(dev, I2C_READ, command, I2C_SMBUS_BYTE_DATA) else None
+
+    def read_word(self, dev, command):
+        return self.data.word if self.smbus_access(dev, I2C_READ, command, I2C_SMBUS_WORD_DATA) else None
+
+    def write_byte(self, dev, command, value):
+        self.data.byte = value & 0xFF
+        return self.smbus_access(dev, I2C_WRITE, command, I2C_SMBUS_BYTE_DATA)
+
+    def write_word(self, dev, command, value):
+        self.data.word = value & 0xFFFF
+        return self.smbus_access(dev, I2C_WRITE, command, I2C_SMBUS_WORD_DATA)
+
+    def proc_call(self, dev, command, value):
+        self.data.word = value & 0xFFFF
+        return self.data.word if self.smbus_access(dev, I2C_WRITE, command, I2C_SMBUS_PROC_CALL) else None
+
+    # read "size" bytes from device register "command" (I2C_RDWR if adapter is true I2C master, else by I2C block reads)
+    def read_block(self, dev, command, size):
+        if not self.set_addr(dev):
+            return None    # I2C_RDWR does not check that address is busy by kernel driver
+        if (self.funcs & I2C_FUNC_I2C) != 0 and size <= len(self.rdwr_buf):
+            self.rdwr_buf[0] = command
+            self.rdwr_msgs[0] = i2c_msg(dev, 0, 1, self.rdwr_buf)
+            self.rdwr_msgs[1] = i2c_msg(dev, I2C_M_RD, size, self.rdwr_buf)
+            try:
+                fcntl.ioctl(self.fd, I2C_RDWR, self.rdwr_args)
+                return bytes(self.rdwr_buf[:size])
+            except OSError:
+                pass
+        if (self.funcs & I2C_FUNC_SMBUS_READ_I2C_BLOCK) == 0:
+            return None
+        buf = b''
+        while len(buf) < size:
+            count = min(I2C_SMBUS_BLOCK_MAX, size - len(buf))
+            self.data.block[0] = count
+            if not self.smbus_access(dev, I2C_READ, command + len(buf), I2C_SMBUS_I2C_BLOCK_DATA):
+                return None
+            count = self.data.block[0]
+            if count == 0:
+                return None
+            buf += bytes(self.data.block[1:1+count])
+        return buf[:size]
+
 class IOMODE(enum.IntEnum):
     def __new__(cls, value, name, doc = None):
         obj = int.__new__(cls, value)
@@ -137,6 +316,7 @@ class IOMODE(enum.IntEnum):
         return obj
     CPUZMODE = 0, "CPUZMODE"
     LOWLEVEL = 1, "LOWLEVEL"
+    I2CDEV   = 2, "I2CDEV"     # Linux kernel driver through /dev/i2c-N
 
 class SMBus():
     def __init__(self, port):
@@ -152,13 +332,18 @@ class SMBus():
         self.lock_status = SMBHSTSTS_INUSE_STS
         self.init_status = SMBHSTSTS_INUSE_STS # actuality only for io_mode = CPUZMODE
         self.wait_intr_timeout = 100
+        self.i2c = None
         self.init_mutex()
 
+    def set_i2c_dev(self, i2c):
+        self.i2c = i2c
+        self.io_mode = IOMODE.I2CDEV if i2c else IOMODE.CPUZMODE
+
     def acquire(self, throwable = True):
         rc = self.mutex.acquire(wait_ms = self.mutex_wait_timeout, throwable = throwable)
         if not throwable and rc == False:
             return False
-        if not self.port:
+        if not self.port or self.io_mode == IOMODE.I2CDEV:
             return True
         is_inuse = True
         try:
@@ -183,7 +368,7 @@ class SMBus():
 
     def release(self):
         try:
-            if self.port:
+            if self.port and self.io_mode != IOMODE.I2CDEV:
                 # Unlock the SMBus device for use by BIOS/ACPI, and clear status flags
                 # if not done already.
                 port_write_u1(self.port + SMBHSTSTS, SMBHSTSTS_INUSE_STS | STATUS_FLAGS)
@@ -357,54 +542,80 @@ class SMBus():
     # ref: io-controller-hub-9-datasheet.pdf   # section: 5.20 SMBus Controller (D31:F3)
     def recv_byte(self, dev):
         log.debug(f'SMBus: recv_byte: dev = 0x{dev:02X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.recv_byte(dev)
         return self.do_command(I2C_READ, SMBHSTCNT_BYTE, dev, None, None)
 
     def send_byte(self, dev, value):
         log.debug(f'SMBus: send_byte: dev = 0x{dev:02X}, value = 0x{value:02X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.send_byte(dev, value)
         return self.do_command(I2C_WRITE, SMBHSTCNT_BYTE, dev, value, None)
 
     def read_byte(self, dev, command):
         log.debug(f'SMBus: read_byte: dev = 0x{dev:02X}, command = 0x{command:02X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.read_byte(dev, command)
         if self.io_mode == IOMODE.CPUZMODE:
             return smbus_read_u1(self.port, dev, command, status = self.init_status ^ 0xFF)
         return self.do_command(I2C_READ, SMBHSTCNT_BYTE_DATA, dev, command, None)
 
     def read_word(self, dev, command):
         log.debug(f'SMBus: read_word: dev = 0x{dev:02X}, command = 0x{command:02X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.read_word(dev, command)
         #if self.io_mode == IOMODE.CPUZMODE:
         #    raise NotImplementedError()
         return self.do_command(I2C_READ, SMBHSTCNT_WORD_DATA, dev, command, None)
 
     def write_byte(self, dev, command, value):
         log.debug(f'SMBus: write_byte: dev = 0x{dev:02X}, command = 0x{command:02X}, value = 0x{value:02X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.write_byte(dev, command, value)
         if self.io_mode == IOMODE.CPUZMODE:
             return smbus_write_u1(self.port, dev, command, value, status = self.init_status ^ 0xFF)
         return self.do_command(I2C_WRITE, SMBHSTCNT_BYTE_DATA, dev, command, value)
 
     def write_word(self, dev, command, value):
         log.debug(f'SMBus: write_word: dev = 0x{dev:02X}, command = 0x{command:02X}, value = 0x{value:04X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.write_word(dev, command, value)
         #if self.io_mode == IOMODE.CPUZMODE:
         #    raise NotImplementedError()
         return self.do_command(I2C_WRITE, SMBHSTCNT_WORD_DATA, dev, command, value)
 
     def proc_call(self, dev, command, value):
         log.debug(f'SMBus: proc_call: dev = 0x{dev:02X}, command = 0x{command:02X}, value = 0x{value:04X} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.proc_call(dev, command, value)
         if self.io_mode == IOMODE.CPUZMODE:
             return smbus_pcall(self.port, dev, command, value, status = self.init_status ^ 0xFF)
         return self.do_command(I2C_READ | I2C_WRITE, SMBHSTCNT_PROC_CALL, dev, command, value)
 
+    def read_block(self, dev, command, size):
+        log.debug(f'SMBus: read_block: dev = 0x{dev:02X}, command = 0x{command:02X}, size = {size} ...')
+        if self.io_mode == IOMODE.I2CDEV:
+            return self.i2c.read_block(dev, command, size)
+        buf = b''
+        for offset in range(0, size):
+            val = self.read_byte(dev, command + offset)
+            if val is None:
+                return None
+            buf += bytes([ val ])
+        return buf
+
     def read_info(self, bus, dev, fun, full_info = True):
-        class_code = pci_cfg_read(bus, dev, fun, 0x0B, size = '1') # ref: 743845_001.pdf  section: Base Class Code (BCC)—Offset Bh
+        class_code = pci_cfg_read_cached(bus, dev, fun, 0x0B, size = '1') # ref: 743845_001.pdf  section: Base Class Code (BCC)—Offset Bh
         if class_code != 0x0C:   # Serial Bus Controller   # source: https://wiki.osdev.org/PCI
             return None
-        subclass = pci_cfg_read(bus, dev, fun, 0x0A, size = '1') # ref: 743845_001.pdf  section: Sub Class Code (SCC)—Offset Ah
+        subclass = pci_cfg_read_cached(bus, dev, fun, 0x0A, size = '1') # ref: 743845_001.pdf  section: Sub Class Code (SCC)—Offset Ah
         if subclass != 0x05:     # SMBus Controller        # source: https://wiki.osdev.org/PCI
             return None
-        #header_type = pci_cfg_read(bus, dev, fun, 0x0E, size = '1')
+        #header_type = pci_cfg_read_cached(bus, dev, fun, 0x0E, size = '1')
         #if header_type != 0:
         #    return None
-        vid = pci_cfg_read(bus, dev, fun, 0, '2')   # ref: 743845_001.pdf  section: Vendor ID (VID)—Offset 0h
-        did = pci_cfg_read(bus, dev, fun, 2, '2')   # ref: 743845_001.pdf  section: Device ID (DID)—Offset 2h
+        vid = pci_cfg_read_cached(bus, dev, fun, 0, '2')   # ref: 743845_001.pdf  section: Vendor ID (VID)—Offset 0h
+        did = pci_cfg_read_cached(bus, dev, fun, 2, '2')   # ref: 743845_001.pdf  section: Device ID (DID)—Offset 2h
         smbus = { }
         smbus['cfg_addr'] = [ bus, dev, fun ]
         smbus['pch_vid'] = vid
@@ -412,17 +623,17 @@ class SMBus():
         smbus['pch_name'] = PCI_ID_SMBUS_INTEL[did]['name'] if did and did in PCI_ID_SMBUS_INTEL else None
         # ref: 743845_001.pdf  section: SMB Base Address (SBA)—Offset 20h
         offset = 0x10 + 4 * 4   # BAR4 - SMBus Addr
-        smbus['port'] = pci_cfg_read(bus, dev, fun, offset, size = '4')
+        smbus['port'] = pci_cfg_read_cached(bus, dev, fun, offset, size = '4')
         if full_info:
             # ref: 743845_001.pdf  section: Command (CMD)—Offset 4h
             offset = 0x4
-            CMD = pci_cfg_read(bus, dev, fun, offset, size = 2)
+            CMD = pci_cfg_read_cached(bus, dev, fun, offset, size = 2)
             if CMD:
                 smbus['MSE']  = get_bits(CMD, 0, 1)  # Memory Space Enable (MSE): 1= Enables memory mapped config space.
                 smbus['IOSE'] = get_bits(CMD, 0, 0)  # I/O Space Enable (IOSE): 1= enables access to the SM Bus I/O space registers as defined by the Base Address Register.
             # ref: 743845_001.pdf  section: SMBus Memory Base Address_31_0
             offset = 0x10
-            SMBMBAR = pci_cfg_read(bus, dev, fun, offset, size = 4)
+            SMBMBAR = pci_cfg_read_cached(bus, dev, fun, offset, size = 4)
             if SMBMBAR:
                 smbus['MSI']    = get_bits(SMBMBAR, 0, 0)     # Memory Space Indicator (MSI): Indicates that the SMB logic is memory mapped.
                 smbus['ADDRNG'] = get_bits(SMBMBAR, 0, 1, 2)  # Address Range (ADDRNG): Indicates that this SMBMBAR can be located anywhere in 64 bit address space
@@ -430,13 +641,13 @@ class SMBus():
                 smbus['HARDWIRED_0'] = get_bits(SMBMBAR, 0, 4, 7)   # Hardwired_0 (HARDWIRED_0): Hardwired to 0.
                 smbus_mem_addr = get_bits(SMBMBAR, 0, 8, 31)
                 # ref: 743845_001.pdf  section: SMBus Memory Base Address_63_32
-                smbus_mem_addr_HI = pci_cfg_read(bus, dev, fun, 0x14, size = '4')
+                smbus_mem_addr_HI = pci_cfg_read_cached(bus, dev, fun, 0x14, size = '4')
                 if smbus_mem_addr_HI is not None:
                     smbus_mem_addr = (smbus_mem_addr_HI << 32) + (smbus_mem_addr << 8)
                     smbus['MEMIO_ADDR'] = smbus_mem_addr
             # ref: 743845_001.pdf  section: Subsystem Vendor Identifiers (SVID)—Offset 2Ch
             offset = 0x2c
-            SVID = pci_cfg_read(bus, dev, fun, offset, size = '2')
+            SVID = pci_cfg_read_cached(bus, dev, fun, offset, size = '2')
             if SVID:
                 smbus['subsys_vid'] = SVID
                 smbus["subsys_vendor"] = pci_ids[SVID] if SVID in pci_ids else None
@@ -445,7 +656,7 @@ class SMBus():
                 smbus["subsys_vendor"] = None
             # ref: 743845_001.pdf  section: Host Configuration (HCFG)—Offset 40h
             offset = 0x40
-            HCFG = pci_cfg_read(bus, dev, fun, offset, size = 4)
+            HCFG = pci_cfg_read_cached(bus, dev, fun, offset, size = 4, volatile = True)
             if HCFG:
                 smbus['I2C_EN']  = get_bits(HCFG, 0, 2)   # I2C_EN (I2CEN): When this bit is 1, the PCH is enabled to communicate with I2C devices. This will change the formatting of some commands. When this bit is 0, behavior is for SMBus.
                 smbus['SSRESET'] = get_bits(HCFG, 0, 3)   # Soft SMBUS Reset: When this bit is 1, the SMbus state machine and logic in PCH is reset. The HW will reset this bit to 0 when reset operation is completed
@@ -455,12 +666,10 @@ class SMBus():
     # https://github.com/memtest86plus/memtest86plus/blob/2f9b165eec4de20ec4b23725c90d3989517ee3fe/system/x86/i2c.c#L80
     def find_smb_controllers(self):
         res = [ ]
-        for bus in range(0, 0xFF, 0x80):
-            for dev in range(0, 32):
-                for fun in range(0, 8):
-                    smb = self.read_info(bus, dev, fun)
-                    if smb:
-                        res.append( smb )
+        for pf in pci_find(class_code = 0x0C, subclass = 0x05):   # Serial Bus Controller / SMBus Controller
+            smb = self.read_info(pf.bus, pf.dev, pf.fun)
+            if smb:
+                res.append( smb )
         return res
 
     def find_smbus(self, check_pci_did = True, aux_check = None):